@@ -0,0 +1,86 @@
+# app/core/assets.py
+import hashlib
+import json
+from functools import lru_cache
+from starlette.exceptions import HTTPException
+from starlette.staticfiles import StaticFiles
+from .config import settings
+from .logging_config import logger
+
+ASSETS_URL = "/assets"
+MANIFEST_NAME = "manifest.json"
+# Files under app/static that get fingerprinted, and those worth compressing
+ASSET_EXTENSIONS = {".css", ".js", ".svg", ".png", ".jpg", ".webp", ".ico"}
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".svg"}
+# Precompressed siblings in preference order: (suffix, Content-Encoding)
+ENCODINGS = ((".br", "br"), (".gz", "gzip"))
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@lru_cache()
+def load_manifest() -> dict:
+    """Logical asset name -> fingerprinted path, as written by
+    utils/build_assets.py; empty (and assets served from /static) until
+    the build has run"""
+    path = settings.ASSETS_DIR / MANIFEST_NAME
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        logger.warning(f"No asset manifest at {path}; serving unfingerprinted assets")
+        return {}
+    logger.info(f"Asset manifest loaded with {len(manifest)} files.")
+    return manifest
+
+
+@lru_cache()
+def manifest_digest() -> str:
+    """Short hash of the asset manifest; changes whenever a build renames
+    an asset"""
+    raw = json.dumps(load_manifest(), sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+def asset_url(name: str) -> str:
+    """URL of a static asset by its path under app/static, e.g.
+    asset_url("css/styles.css")"""
+    built = load_manifest().get(name)
+    if built is None:
+        return f"/static/{name}"
+    return f"{ASSETS_URL}/{built}"
+
+
+def _accepted_encodings(scope) -> set:
+    for key, value in scope["headers"]:
+        if key == b"accept-encoding":
+            return {
+                part.split(";")[0].strip()
+                for part in value.decode("latin-1").lower().split(",")
+                if not part.strip().endswith(";q=0")
+            }
+    return set()
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """Serves built assets, preferring a .br or .gz sibling the client
+    accepts over the plain file. Built names carry a content hash, so every
+    response may be cached forever."""
+
+    async def get_response(self, path: str, scope):
+        accepted = _accepted_encodings(scope)
+        for suffix, encoding in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            try:
+                response = await super().get_response(path + suffix, scope)
+            except HTTPException:
+                continue
+            response.headers["Content-Encoding"] = encoding
+            break
+        else:
+            response = await super().get_response(path, scope)
+        # Set on the plain file too, so caches keep variants apart
+        response.headers["Vary"] = "Accept-Encoding"
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = IMMUTABLE
+        return response
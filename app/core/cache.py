@@ -0,0 +1,114 @@
+# app/core/cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """In-process LRU cache of procedure results with a TTL and table-level
+    invalidation.
+
+    Every entry records the tables its procedure reads. Invalidating a table
+    drops exactly the entries that depend on it. Each table also carries a
+    version: a reader takes a snapshot before querying and its store is
+    dropped if any of its tables was invalidated meanwhile, so a slow read
+    can't put pre-write rows back after the write's invalidation.
+
+    Cached rows are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, tables, value)
+        self._by_table = {}  # table -> set of keys
+        self._versions = {}  # table -> invalidation count
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._stale_stores = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[2]
+
+    def snapshot(self, tables) -> tuple:
+        """Versions of tables, taken before a read that may be stored"""
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def put(self, key, value, tables, snapshot: tuple = None):
+        """Store value under key unless its tables changed since snapshot"""
+        with self._lock:
+            if snapshot is not None and snapshot != tuple(
+                self._versions.get(table, 0) for table in tables
+            ):
+                self._stale_stores += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, tables, value)
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            self._stores += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def invalidate(self, tables):
+        """Drop every entry that reads from any of tables"""
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+                for key in self._by_table.pop(table, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "stores": self._stores,
+                "stale_stores": self._stale_stores,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
+
+    def _remove(self, key):
+        _, tables, _ = self._entries.pop(key)
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
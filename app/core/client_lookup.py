@@ -0,0 +1,124 @@
+# app/core/client_lookup.py
+import heapq
+import threading
+import time
+from typing import NamedTuple
+from .config import settings
+from .database import commit, execute_procedure_sync, on_commit, pool
+from .logging_config import logger
+from .search_index import Postings, tokenize
+
+# Columns kept per client; the lookup never needs the sensitive ones
+CLIENT_FIELDS = ("client_id", "client_name", "client_phone", "client_email")
+
+
+class ClientSuggestion(NamedTuple):
+    client: dict
+    edits: int  # typos between the query and the matched name
+
+
+class ClientDirectory:
+    """Client names in memory for typo-tolerant lookup, keyed by client_id.
+
+    Names are tokenized into the same postings the listing index uses, so
+    each query word matches its own prefix or any name word within a few
+    edits. Loaded at startup and refreshed per client after writes commit.
+    """
+
+    def __init__(self):
+        self._clients = {}  # client_id -> (fields, name tokens)
+        self._names = Postings()
+        self._lock = threading.Lock()
+        self.ready = False
+
+    def build(self, rows):
+        clients = {}
+        names = Postings()
+        for row in rows:
+            fields = {field: row[field] for field in CLIENT_FIELDS}
+            tokens = frozenset(tokenize(row["client_name"]))
+            clients[row["client_id"]] = (fields, tokens)
+            names.add(tokens, row["client_id"], sort=False)
+        names.sort_vocabulary()
+        with self._lock:
+            self._clients, self._names = clients, names
+            self.ready = True
+
+    def upsert(self, row):
+        with self._lock:
+            self._remove(row["client_id"])
+            fields = {field: row[field] for field in CLIENT_FIELDS}
+            tokens = frozenset(tokenize(row["client_name"]))
+            self._clients[row["client_id"]] = (fields, tokens)
+            self._names.add(tokens, row["client_id"])
+
+    def remove(self, client_id: int):
+        with self._lock:
+            self._remove(client_id)
+
+    def _remove(self, client_id: int):
+        entry = self._clients.pop(client_id, None)
+        if entry is not None:
+            self._names.discard(entry[1], client_id)
+
+    def lookup(self, query: str, limit: int = 10) -> list:
+        """Clients whose names match every query word, allowing typos.
+        Closest first, then by name; edit distances are only computed
+        within FUZZY_SEARCH_BUDGET_MS."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        deadline = time.perf_counter() + settings.FUZZY_SEARCH_BUDGET_MS / 1000
+        with self._lock:
+            scores, _ = self._names.fuzzy_match(tokens, deadline)
+            ranked = heapq.nsmallest(
+                limit,
+                (
+                    (edits, self._clients[client_id][0]["client_name"].lower(), client_id)
+                    for client_id, edits in scores.items()
+                ),
+            )
+            return [
+                ClientSuggestion(self._clients[client_id][0], edits)
+                for edits, _, client_id in ranked
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "clients": len(self._clients),
+                "name_tokens": len(self._names),
+            }
+
+
+client_directory = ClientDirectory()
+
+
+def load_client_directory(conn=None):
+    """(Re)load every client name, on conn or a connection of its own"""
+    if conn is None:
+        conn = pool.checkout()
+        try:
+            load_client_directory(conn)
+            commit(conn)
+        finally:
+            pool.checkin(conn)
+        return
+
+    rows = execute_procedure_sync(conn, "get_all_clients", use_cache=False)
+    client_directory.build(rows)
+    logger.info(f"Client directory loaded with {len(rows)} clients.")
+
+
+def _reload_client(conn, client_id: int):
+    rows = execute_procedure_sync(conn, "get_client_details", (client_id,))
+    if rows:
+        client_directory.upsert(rows[0])
+    else:
+        client_directory.remove(client_id)
+
+
+def refresh_client(conn, client_id: int):
+    """Re-read one client once conn's transaction commits (also deletes)"""
+    on_commit(conn, lambda c: _reload_client(c, client_id))
@@ -0,0 +1,217 @@
+# app/core/compression.py
+import zlib
+from typing import Optional
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content types worth compressing; everything else (images, archives,
+# already-compressed data) passes through untouched
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+# Set by a route (see compression_level) to override the configured level
+STATE_KEY = "compression_level"
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        # wbits 16+: gzip framing rather than a bare zlib stream
+        self._stream = zlib.compressobj(max(1, min(level, 9)), zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, last: bool) -> bytes:
+        out = self._stream.compress(data)
+        return out + self._stream.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+class _Brotli:
+    def __init__(self, level: int):
+        self._stream = brotli.Compressor(quality=max(0, min(level, 11)))
+
+    def compress(self, data: bytes, last: bool) -> bytes:
+        out = self._stream.process(data)
+        return out + (self._stream.finish() if last else self._stream.flush())
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._stream = zstandard.ZstdCompressor(level=max(1, min(level, 22))).compressobj()
+
+    def compress(self, data: bytes, last: bool) -> bytes:
+        out = self._stream.compress(data)
+        if last:
+            return out + self._stream.flush()
+        return out + self._stream.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+
+def available_encoders() -> dict:
+    """Encoders the installed modules allow, best first"""
+    encoders = {}
+    if brotli is not None:
+        encoders["br"] = _Brotli
+    if zstandard is not None:
+        encoders["zstd"] = _Zstd
+    encoders["gzip"] = _Gzip
+    return encoders
+
+
+def compression_level(level: Optional[int]):
+    """Route dependency overriding the compression level for its responses;
+    None or 0 turns compression off.
+
+        @router.get("/big", dependencies=[Depends(compression_level(9))])
+    """
+
+    def set_level(request: Request):
+        request.state.compression_level = level or 0
+
+    return set_level
+
+
+class CompressionMiddleware:
+    """Compresses responses with the best encoding the client accepts.
+
+    Works on the ASGI messages, so StreamingResponse bodies are compressed
+    chunk by chunk and flushed as they go rather than collected first.
+    Bodies smaller than minimum_size, non-text content types and responses
+    that already carry a Content-Encoding are sent as they are. levels maps
+    an encoding name to its default level; a route can override it with the
+    compression_level dependency (the number is clamped to each codec's
+    range).
+    """
+
+    def __init__(self, app, minimum_size: int, levels: dict):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = levels
+        self.encoders = available_encoders()
+
+    def _negotiate(self, accept_encoding: str) -> Optional[str]:
+        accepted = set()
+        for part in accept_encoding.lower().split(","):
+            token, _, params = part.strip().partition(";")
+            if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            accepted.add(token.strip())
+        for name in self.encoders:
+            if name in accepted:
+                return name
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self, scope, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, scope, send, encoding: str):
+        self.middleware = middleware
+        self.scope = scope
+        self.downstream = send
+        self.encoding = encoding
+        self.start = None
+        self.buffer = bytearray()
+        self.encoder = None
+        self.passthrough = False
+
+    def _compressible(self, headers: MutableHeaders) -> bool:
+        status = self.start["status"]
+        if status < 200 or status in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", "").lower():
+            return False
+        content_type = headers.get("content-type", "").lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        length = headers.get("content-length")
+        if length is not None and int(length) < self.middleware.minimum_size:
+            return False
+        return self._level() > 0
+
+    def _level(self) -> int:
+        state = self.scope.get("state") or {}
+        if STATE_KEY in state:
+            return state[STATE_KEY]
+        return self.middleware.levels[self.encoding]
+
+    async def _begin(self, first: bytes, more_body: bool):
+        """Send the start message with the headers of the compressed
+        response, then the first compressed chunk"""
+        headers = MutableHeaders(raw=self.start["headers"])
+        self.encoder = self.middleware.encoders[self.encoding](self._level())
+        compressed = self.encoder.compress(first, last=not more_body)
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if more_body:
+            if "content-length" in headers:
+                del headers["content-length"]
+        else:
+            # The whole body was in one message, so its size is known
+            headers["Content-Length"] = str(len(compressed))
+        # The bytes differ from the uncompressed representation
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+        await self.downstream(self.start)
+        await self.downstream(
+            {"type": "http.response.body", "body": compressed, "more_body": more_body}
+        )
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.passthrough = not self._compressible(MutableHeaders(raw=message["headers"]))
+            if self.passthrough:
+                await self.downstream(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is None:
+            # Hold small first chunks until there is enough to be worth it
+            self.buffer += body
+            if more_body and len(self.buffer) < self.middleware.minimum_size:
+                return
+            if not more_body and len(self.buffer) < self.middleware.minimum_size:
+                await self.downstream(self.start)
+                await self.downstream(
+                    {"type": "http.response.body", "body": bytes(self.buffer)}
+                )
+                return
+            body = bytes(self.buffer)
+            self.buffer.clear()
+            await self._begin(body, more_body)
+            return
+
+        await self.downstream(
+            {
+                "type": "http.response.body",
+                "body": self.encoder.compress(body, last=not more_body),
+                "more_body": more_body,
+            }
+        )
@@ -0,0 +1,70 @@
+# app/core/conditional.py
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+from .assets import manifest_digest
+from .config import settings
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over the given version parts, the app version and the
+    asset manifest, so a deploy that changes the markup or the asset URLs
+    it links also changes every tag"""
+    raw = "|".join(
+        str(part) for part in (settings.VERSION, manifest_digest(), *parts)
+    )
+    return 'W/"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # TIMESTAMP columns come back naive in the server's time zone (UTC)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def validator_headers(etag: str, last_modified: datetime = None) -> dict:
+    """ETag/Last-Modified headers. no-cache lets clients store the page but
+    makes them revalidate before reusing it."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            _as_utc(last_modified).replace(microsecond=0), usegmt=True
+        )
+    return headers
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: datetime = None
+) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against the current version.
+
+    If-None-Match wins when present (RFC 7232 section 6); ETags compare
+    weakly, as GET revalidation allows.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        current = etag.removeprefix("W/")
+        return any(
+            tag.strip().removeprefix("W/") == current
+            for tag in if_none_match.split(",")
+        )
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
+def not_modified_response(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
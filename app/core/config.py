@@ -16,6 +16,8 @@ class Settings:
     BASE_DIR = APP_DIR.parent  # project root
     TEMPLATES_DIR = APP_DIR / "templates"
     STATIC_DIR = APP_DIR / "static"
+    # Fingerprinted, precompressed copies built by utils/build_assets.py
+    ASSETS_DIR = STATIC_DIR / "dist"
     
     # Logging settings
     LOG_DIR = BASE_DIR / "logs"
@@ -30,6 +32,63 @@ class Settings:
     MYSQL_USER = os.getenv("MYSQL_USER", "root")
     MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "")
     MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "real_estate")
+
+    # Connection pool sizing and backpressure
+    DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 2))
+    DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+    DB_POOL_CHECKOUT_TIMEOUT = float(os.getenv("DB_POOL_CHECKOUT_TIMEOUT", 5))
+    DB_POOL_MAX_WAITERS = int(os.getenv("DB_POOL_MAX_WAITERS", 50))
+    DB_POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", 300))
+
+    # Threads available for blocking driver calls made from async routes
+    DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", DB_POOL_MAX_SIZE))
+
+    # Deadline (seconds) for a batch of parallel procedure calls
+    DB_BATCH_TIMEOUT = float(os.getenv("DB_BATCH_TIMEOUT", 3))
+
+    # Homepage keyset pages
+    LISTINGS_PAGE_SIZE = int(os.getenv("LISTINGS_PAGE_SIZE", 24))
+    LISTINGS_MAX_PAGE_SIZE = int(os.getenv("LISTINGS_MAX_PAGE_SIZE", 100))
+
+    # Admin table pages; filtered totals stop counting at the cap
+    ADMIN_TABLE_PAGE_SIZE = int(os.getenv("ADMIN_TABLE_PAGE_SIZE", 25))
+    ADMIN_TABLE_COUNT_CAP = int(os.getenv("ADMIN_TABLE_COUNT_CAP", 1000))
+
+    # Typo-tolerant search: time allowed for edit-distance checks per query,
+    # and how many near vocabulary words each query word expands to
+    FUZZY_SEARCH_BUDGET_MS = float(os.getenv("FUZZY_SEARCH_BUDGET_MS", 50))
+    FUZZY_TERMS_PER_WORD = int(os.getenv("FUZZY_TERMS_PER_WORD", 8))
+
+    # How often each process asks the database whether listings changed
+    # under its search index (another worker's writes); a change rebuilds it
+    SEARCH_INDEX_CHECK_SECONDS = float(os.getenv("SEARCH_INDEX_CHECK_SECONDS", 5))
+
+    # Offline gazetteer used to geocode property addresses, and the cell
+    # size (degrees) of the in-memory grid area searches prune with
+    GAZETTEER_PATH = Path(os.getenv("GAZETTEER_PATH", BASE_DIR / "data" / "gazetteer.csv"))
+    GEO_CELL_DEGREES = float(os.getenv("GEO_CELL_DEGREES", 0.02))
+    GEO_MAX_RADIUS_KM = float(os.getenv("GEO_MAX_RADIUS_KM", 100))
+
+    # Worker processes that decode and thumbnail uploaded images, and how
+    # many uploads may wait for or be in processing before uploads get a 503
+    IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", 2))
+    IMAGE_QUEUE_MAX = int(os.getenv("IMAGE_QUEUE_MAX", 32))
+    # Files of one bulk upload moved into the image store at a time
+    IMAGE_UPLOAD_CONCURRENCY = int(os.getenv("IMAGE_UPLOAD_CONCURRENCY", 4))
+    # Per-property image lists behind the detail carousel
+    IMAGE_LIST_CACHE_MAX_ENTRIES = int(os.getenv("IMAGE_LIST_CACHE_MAX_ENTRIES", 1024))
+    IMAGE_LIST_CACHE_TTL = float(os.getenv("IMAGE_LIST_CACHE_TTL", 300))
+    # Content-addressed store for uploaded images, served under /media
+    MEDIA_DIR = Path(os.getenv("MEDIA_DIR", BASE_DIR / "media"))
+    # Resized derivatives served by /images, evicted least recently used
+    # first beyond IMAGE_CACHE_MAX_BYTES (one budget for all workers)
+    IMAGE_CACHE_DIR = Path(os.getenv("IMAGE_CACHE_DIR", BASE_DIR / "cache" / "images"))
+    IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+    # Procedure result cache
+    DB_CACHE_ENABLED = os.getenv("DB_CACHE_ENABLED", "true").lower() == "true"
+    DB_CACHE_TTL = float(os.getenv("DB_CACHE_TTL", 60))
+    DB_CACHE_MAX_ENTRIES = int(os.getenv("DB_CACHE_MAX_ENTRIES", 256))
     
     # Construct database URL
     @property
@@ -39,8 +98,22 @@ class Settings:
             f"@{self.MYSQL_HOST}:{self.MYSQL_PORT}/{self.MYSQL_DATABASE}"
         )
     
+    # Response compression: bodies below the minimum size go out as they
+    # are; levels are per encoding and routes may override them
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_LEVEL = int(os.getenv("COMPRESSION_BROTLI_LEVEL", 4))
+    COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
+
     # Template configuration
     TEMPLATES_AUTO_RELOAD = True
+    # Rendered row/card fragments, keyed by entity version
+    FRAGMENT_CACHE_ENABLED = (
+        os.getenv("FRAGMENT_CACHE_ENABLED", "true").lower() == "true"
+    )
+    FRAGMENT_CACHE_MAX_BYTES = int(
+        os.getenv("FRAGMENT_CACHE_MAX_BYTES", 8 * 1024 * 1024)
+    )
     
     # Security settings
     SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
@@ -1,7 +1,25 @@
 # app/core/database.py
-from mysql.connector import connect, Error, pooling
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from fastapi import HTTPException
+from mysql.connector import connect, Error
 from .config import settings
 from .logging_config import logger
+from .cache import ResultCache
+from .pool import ConnectionPool, PoolExhaustedError
+from .rows import ROW_DICT, ROW_MODES, ROW_RECORD, make_records
+from .procedures import (
+    BatchResult,
+    MultiResult,
+    ProcedureCall,
+    ProcedureShape,
+    ProcedureShapeError,
+    READ_DEPENDENCIES,
+    WRITE_TABLES,
+)
 import os
 from dotenv import load_dotenv
 
@@ -19,41 +37,296 @@ DB_CONFIG = {
     "get_warnings": True,
     "autocommit": False,  # We'll handle transactions explicitly
     "raise_on_warnings": True,
-    "pool_name": "mypool",
-    "pool_size": 5,
-    "pool_reset_session": True,
 }
 
-# Create connection pool
-try:
-    pool = pooling.MySQLConnectionPool(**DB_CONFIG)
-    logger.info("Database connection pool created successfully.")
-except Error as e:
-    logger.error(f"Error creating connection pool: {e}")
-    raise
+# Connection pool. Connections are opened lazily or by pool.warm() at startup,
+# so importing this module does not touch the database.
+pool = ConnectionPool(
+    DB_CONFIG,
+    min_size=settings.DB_POOL_MIN_SIZE,
+    max_size=settings.DB_POOL_MAX_SIZE,
+    checkout_timeout=settings.DB_POOL_CHECKOUT_TIMEOUT,
+    max_waiters=settings.DB_POOL_MAX_WAITERS,
+    idle_timeout=settings.DB_POOL_IDLE_TIMEOUT,
+)
+
+# Results of the read procedures in READ_DEPENDENCIES, invalidated by the
+# write procedures in WRITE_TABLES
+result_cache = ResultCache(
+    max_entries=settings.DB_CACHE_MAX_ENTRIES, ttl=settings.DB_CACHE_TTL
+)
+
+# Bounded executor for blocking driver calls. Sized to the pool so a burst of
+# requests queues here instead of piling up threads waiting on connections.
+db_executor = ThreadPoolExecutor(
+    max_workers=settings.DB_EXECUTOR_WORKERS, thread_name_prefix="db"
+)
 
 
 def get_db_connection():
     """Get a database connection from the pool"""
-    conn = pool.get_connection()
+    try:
+        conn = pool.checkout()
+    except PoolExhaustedError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail="Database busy, please retry")
     try:
         yield conn
-        conn.commit()
+        commit(conn)
     finally:
-        conn.close()
+        pool.checkin(conn)
+
+
+def commit(conn):
+    """Commit, then drop cached reads of the tables the transaction wrote.
+
+    Writes already invalidate when they run; doing it again after the commit
+    removes anything another connection cached from pre-commit rows.
+    """
+    conn.commit()
+    if conn.written_tables:
+        result_cache.invalidate(conn.written_tables)
+        conn.written_tables.clear()
+    if conn.after_commit:
+        callbacks, conn.after_commit = conn.after_commit, []
+        for callback in callbacks:
+            try:
+                callback(conn)
+            except Exception as e:
+                logger.error(f"After-commit callback failed: {e}", exc_info=True)
+        # Close the transaction any reads in the callbacks opened
+        conn.commit()
+
+
+def on_commit(conn, callback):
+    """Run callback(conn) after conn's transaction commits, on the thread
+    that commits it. Dropped if the transaction is rolled back instead."""
+    conn.after_commit.append(callback)
+
+
+async def run_in_db_executor(func, *args, **kwargs):
+    """Run a blocking database call on the db executor and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, partial(func, *args, **kwargs))
+
+
+async def execute_procedure(
+    conn, procedure_name: str, params: tuple = (), row_mode: str = ROW_DICT
+):
+    """Execute a stored procedure without blocking the event loop"""
+    return await run_in_db_executor(
+        execute_procedure_sync, conn, procedure_name, params, row_mode
+    )
 
 
-def execute_procedure(conn, procedure_name: str, params: tuple = ()):
-    """Execute a stored procedure"""
-    cursor = conn.cursor(dictionary=True)
+def execute_procedure_sync(
+    conn,
+    procedure_name: str,
+    params: tuple = (),
+    row_mode: str = ROW_DICT,
+    use_cache: bool = True,
+):
+    """Execute a stored procedure on the calling thread.
+
+    row_mode "dict" returns a dict per row. "record" returns compact Record
+    tuples that share one schema per result set; they read like dicts and
+    attributes in templates but are far cheaper for large result sets.
+
+    Procedures listed in READ_DEPENDENCIES are served from the result cache
+    unless use_cache is False; cached rows are shared, so don't modify them.
+    """
+    if row_mode not in ROW_MODES:
+        raise ValueError(f"Unknown row mode: {row_mode}")
+
+    def call():
+        cursor = conn.procedure_cursor(dictionary=row_mode == ROW_DICT)
+        try:
+            cursor.callproc(procedure_name, params)
+            results = []
+            for result in cursor.stored_results():
+                if row_mode == ROW_RECORD:
+                    results.extend(
+                        make_records(result.column_names, result.fetchall())
+                    )
+                else:
+                    results.extend(result.fetchall())
+            return results
+        finally:
+            cursor.close()
+
+    return _through_cache(conn, procedure_name, params, row_mode, call, use_cache)
+
+
+def _cache_key(procedure_name: str, params: tuple, variant: str):
+    """Cache key for a call, or None if its params can't be hashed"""
+    key = (procedure_name, variant, tuple(params))
     try:
-        cursor.callproc(procedure_name, params)
-        results = []
-        for result in cursor.stored_results():
-            results.extend(result.fetchall())
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _cached_tables(procedure_name: str, use_cache: bool = True):
+    if not (use_cache and settings.DB_CACHE_ENABLED):
+        return None
+    return READ_DEPENDENCIES.get(procedure_name)
+
+
+def _note_writes(conn, procedure_name: str):
+    """Invalidate cached reads of the tables a write procedure modifies"""
+    tables = WRITE_TABLES.get(procedure_name)
+    if tables:
+        result_cache.invalidate(tables)
+        conn.written_tables.update(tables)
+
+
+def _through_cache(conn, procedure_name, params, variant, call, use_cache=True):
+    """Serve call() from the result cache when the procedure is cacheable"""
+    _note_writes(conn, procedure_name)
+    tables = _cached_tables(procedure_name, use_cache)
+    key = _cache_key(procedure_name, params, variant) if tables else None
+    if key is None:
+        return call()
+    if conn.written_tables & set(tables):
+        # The cache can't hold this transaction's own uncommitted writes,
+        # and may since have been refilled from pre-commit rows elsewhere
+        return call()
+
+    cached = result_cache.get(key)
+    if cached is not None:
+        return cached
+    snapshot = result_cache.snapshot(tables)
+    results = call()
+    # Rows read after an uncommitted write may never be committed
+    if not conn.written_tables:
+        result_cache.put(key, results, tables, snapshot)
+    return results
+
+
+async def execute_procedure_sets(
+    conn, shape: ProcedureShape, params: tuple = ()
+) -> MultiResult:
+    """Execute a multi-result procedure, keeping each result set separate"""
+    return await run_in_db_executor(execute_procedure_sets_sync, conn, shape, params)
+
+
+def execute_procedure_sets_sync(
+    conn, shape: ProcedureShape, params: tuple = ()
+) -> MultiResult:
+    """Execute a multi-result procedure on the calling thread"""
+
+    def call():
+        cursor = conn.procedure_cursor(dictionary=True)
+        try:
+            cursor.callproc(shape.procedure, params)
+            sets = [result.fetchall() for result in cursor.stored_results()]
+        finally:
+            cursor.close()
+
+        if len(sets) != len(shape.result_sets):
+            raise ProcedureShapeError(
+                f"{shape.procedure} returned {len(sets)} result sets, "
+                f"expected {len(shape.result_sets)}"
+            )
+
+        results = MultiResult()
+        for spec, rows in zip(shape.result_sets, sets):
+            results[spec.name] = (rows[0] if rows else None) if spec.one else rows
         return results
+
+    return _through_cache(conn, shape.procedure, params, "sets", call)
+
+
+async def execute_batch(
+    calls: dict[str, ProcedureCall], timeout: float = None, conn=None
+) -> BatchResult:
+    """Run independent procedure calls in parallel and gather them under
+    one deadline.
+
+    The calls are shared out between conn (the request's own connection,
+    if given; otherwise one checked out for the batch) and an extra pooled
+    connection per further call, taken only while the pool can spare more
+    than one. Extras are never waited for, so concurrent batches can't tie
+    up the pool waiting on each other; when none is free the calls run one
+    after another on the connections the batch holds. A call already
+    running on conn at the deadline is still waited for, since conn can't
+    be handed back mid-query.
+
+    A call that fails or misses the deadline does not fail the batch: its
+    name maps to the call's default and the reason is recorded in
+    BatchResult.errors, so the page can degrade panel by panel.
+    """
+    batch = BatchResult()
+    if not calls:
+        return batch
+
+    timeout = settings.DB_BATCH_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    queue = deque(calls.items())
+    done = {}  # name -> rows, or the exception the call raised
+    main = asyncio.ensure_future(
+        run_in_db_executor(_drain_batch, queue, done, deadline, conn)
+    )
+    extras = [
+        asyncio.ensure_future(
+            run_in_db_executor(_drain_batch, queue, done, deadline, spare_only=True)
+        )
+        for _ in range(len(calls) - 1)
+    ]
+    await asyncio.wait([main, *extras], timeout=timeout)
+    if conn is not None:
+        await asyncio.shield(main)
+    elif main.done() and main.exception() is not None:
+        # No connection for the batch; the extras may still have run some
+        logger.warning(f"Batch could not check out a connection: {main.exception()}")
+
+    for name, call in calls.items():
+        result = done.get(name)
+        if result is None:
+            error = f"timed out after {timeout:.1f}s"
+        elif isinstance(result, Exception):
+            error = str(result)
+        else:
+            batch[name] = result
+            continue
+        logger.error(f"Batch call {call.procedure} for '{name}' failed: {error}")
+        batch[name] = [] if call.default is None else call.default
+        batch.errors[name] = error
+    return batch
+
+
+def _drain_batch(queue: deque, done: dict, deadline: float, conn=None, spare_only=False):
+    """Run queued batch calls on one connection until the queue is empty or
+    the deadline passes. Without conn, checks one out for the purpose (only
+    a spare one if spare_only) and commits and returns it."""
+    own = conn is None
+    if own:
+        if spare_only:
+            try:
+                conn = pool.try_checkout(keep=1)
+            except Exception as e:
+                logger.warning(f"Batch could not open a spare connection: {e}")
+                return
+            if conn is None:
+                return
+        else:
+            conn = pool.checkout(timeout=max(0.0, deadline - time.monotonic()))
+    try:
+        while time.monotonic() < deadline:
+            try:
+                name, call = queue.popleft()
+            except IndexError:
+                break
+            try:
+                done[name] = execute_procedure_sync(conn, call.procedure, call.params)
+            except Exception as e:
+                done[name] = e
+        if own:
+            commit(conn)
     finally:
-        cursor.close()
+        if own:
+            pool.checkin(conn)
 
 
 def create_mysql_database():
@@ -125,6 +398,7 @@ def reset_db():
                     cursor.execute(statement)
 
             conn.commit()
+            result_cache.clear()
             logger.info("Database reset successfully.")
         except Error as e:
             logger.error(f"Error resetting database: {e}")
@@ -144,3 +418,8 @@ async def check_db_connection():
             return result is not None
     except Error:
         return False
+
+
+def shutdown_db_executor():
+    """Stop accepting new database work and wait for in-flight calls"""
+    db_executor.shutdown(wait=True)
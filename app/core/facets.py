@@ -0,0 +1,247 @@
+# app/core/facets.py
+import threading
+import time
+from typing import NamedTuple, Optional
+import numpy as np
+from .search_index import ListingIndex, listing_index
+
+# Price bucket lower edges; the last bucket is open-ended
+PRICE_EDGES = (0, 100_000, 250_000, 500_000, 750_000, 1_000_000, 2_000_000)
+# Bedroom counts from here on share one "N+" bucket
+MAX_BEDROOMS = 5
+NO_BEDROOMS = MAX_BEDROOMS + 1  # commercial listings and unknown counts
+
+
+class FacetCount(NamedTuple):
+    label: str
+    count: int
+    selected: bool
+    # Filters a click applies (None clears one); None = not selectable
+    params: Optional[dict]
+
+
+def _money(amount: float) -> str:
+    if amount >= 1_000_000:
+        return f"${amount / 1_000_000:g}M"
+    return f"${amount / 1_000:g}k"
+
+
+def _price_label(low: float, high: Optional[float]) -> str:
+    if high is None:
+        return f"{_money(low)}+"
+    if low == 0:
+        return f"Under {_money(high)}"
+    return f"{_money(low)} - {_money(high)}"
+
+
+class FacetSnapshot:
+    """Columnar copy of the listing attributes facets are counted on, one
+    NumPy array per column, row i being the listing index's ordinal i.
+
+    Categorical columns hold small integer codes, so a facet count is one
+    np.bincount over the rows the other filters leave.
+    """
+
+    def __init__(self, version: int, docs: list):
+        self.version = version
+        self.statuses = sorted({doc.status for doc in docs if doc and doc.status})
+        self.types = sorted(
+            {doc.property_type for doc in docs if doc and doc.property_type}
+        )
+        status_codes = {value: code for code, value in enumerate(self.statuses)}
+        type_codes = {value: code for code, value in enumerate(self.types)}
+        missing_status, missing_type = len(self.statuses), len(self.types)
+
+        live = [doc for doc in docs if doc is not None]
+        self.alive = np.fromiter((doc is not None for doc in docs), dtype=bool, count=len(docs))
+        self.price = np.zeros(len(docs), dtype=np.float64)
+        self.status = np.full(len(docs), missing_status, dtype=np.int16)
+        self.type = np.full(len(docs), missing_type, dtype=np.int16)
+        self.bedrooms = np.full(len(docs), NO_BEDROOMS, dtype=np.int8)
+        # Fill whole columns at once; per-element assignment is far slower.
+        # Search documents are records, so columns read as attributes.
+        self.price[self.alive] = [float(doc.price or 0) for doc in live]
+        self.status[self.alive] = [
+            status_codes.get(doc.status, missing_status) for doc in live
+        ]
+        self.type[self.alive] = [
+            type_codes.get(doc.property_type, missing_type) for doc in live
+        ]
+        self.bedrooms[self.alive] = [
+            NO_BEDROOMS if doc.bedrooms is None else min(doc.bedrooms, MAX_BEDROOMS)
+            for doc in live
+        ]
+        edges = np.asarray(PRICE_EDGES, dtype=np.float64)
+        self.price_bucket = np.maximum(
+            np.searchsorted(edges, self.price, side="right") - 1, 0
+        )
+
+    def __len__(self):
+        return len(self.alive)
+
+    def _rows(self, ordinals) -> np.ndarray:
+        if ordinals is None:
+            return self.alive
+        rows = np.zeros(len(self), dtype=bool)
+        if ordinals:
+            rows[np.fromiter(ordinals, dtype=np.int64, count=len(ordinals))] = True
+        return rows & self.alive
+
+    @staticmethod
+    def _equals(column, values: list, value) -> Optional[np.ndarray]:
+        if value is None:
+            return None
+        if value not in values:
+            return np.zeros(len(column), dtype=bool)
+        return column == values.index(value)
+
+    @staticmethod
+    def _both(rows, *masks) -> np.ndarray:
+        for mask in masks:
+            if mask is not None:
+                rows = rows & mask
+        return rows
+
+    def counts(
+        self,
+        ordinals=None,
+        status: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> dict:
+        """Facet counts for a search: each facet counts the listings that
+        pass every other active filter, so the panel shows what picking a
+        different value would return. ordinals are the text matches."""
+        rows = self._rows(ordinals)
+        status_ok = self._equals(self.status, self.statuses, status)
+        type_ok = self._equals(self.type, self.types, property_type)
+        price_ok = None
+        if min_price is not None or max_price is not None:
+            low = -np.inf if min_price is None else min_price
+            high = np.inf if max_price is None else max_price
+            price_ok = (self.price >= low) & (self.price <= high)
+
+        by_status = np.bincount(
+            self.status[self._both(rows, type_ok, price_ok)],
+            minlength=len(self.statuses) + 1,
+        )
+        by_type = np.bincount(
+            self.type[self._both(rows, status_ok, price_ok)],
+            minlength=len(self.types) + 1,
+        )
+        by_bedrooms = np.bincount(
+            self.bedrooms[self._both(rows, status_ok, type_ok, price_ok)],
+            minlength=NO_BEDROOMS + 1,
+        )
+        by_price = np.bincount(
+            self.price_bucket[self._both(rows, status_ok, type_ok)],
+            minlength=len(PRICE_EDGES),
+        )
+
+        return {
+            "property_type": [
+                FacetCount(
+                    value, int(by_type[code]), value == property_type,
+                    {"property_type": None if value == property_type else value},
+                )
+                for code, value in enumerate(self.types)
+            ],
+            "status": [
+                FacetCount(
+                    value, int(by_status[code]), value == status,
+                    {"status": None if value == status else value},
+                )
+                for code, value in enumerate(self.statuses)
+            ],
+            "bedrooms": [
+                FacetCount(
+                    f"{count}+" if count == MAX_BEDROOMS else str(count),
+                    int(by_bedrooms[count]), False, None,
+                )
+                for count in range(MAX_BEDROOMS + 1)
+                if by_bedrooms[count]
+            ],
+            "price": self._price_facet(by_price, min_price, max_price),
+        }
+
+    @staticmethod
+    def _price_facet(by_price, min_price, max_price) -> list:
+        facet = []
+        for bucket, low in enumerate(PRICE_EDGES):
+            high = PRICE_EDGES[bucket + 1] if bucket + 1 < len(PRICE_EDGES) else None
+            # Bucket bounds are inclusive, and prices have two decimals
+            bounds = {
+                "min_price": low or None,
+                "max_price": None if high is None else round(high - 0.01, 2),
+            }
+            selected = (min_price, max_price) == (
+                bounds["min_price"], bounds["max_price"]
+            )
+            if not by_price[bucket] and not selected:
+                continue
+            facet.append(
+                FacetCount(
+                    _price_label(low, high),
+                    int(by_price[bucket]),
+                    selected,
+                    {"min_price": None, "max_price": None} if selected else bounds,
+                )
+            )
+        return facet
+
+
+class FacetCounter:
+    """Facet counts for /search, from a FacetSnapshot of the listing index.
+
+    The snapshot is rebuilt lazily, on the first count after the index
+    changes; searches in between share it. Builds take the lock, so
+    requests racing past the same change wait for one build and share it.
+    Counting is CPU work, so routes call counts() off the event loop.
+    """
+
+    def __init__(self, index: ListingIndex):
+        self._index = index
+        self._snapshot = FacetSnapshot(-1, [])
+        self._lock = threading.Lock()
+        self._builds = 0
+        self._last_build_ms = 0.0
+
+    def counts(
+        self,
+        query: Optional[str] = None,
+        agent_name: Optional[str] = None,
+        status: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        fuzzy: bool = False,
+    ) -> dict:
+        snapshot = self._snapshot
+        version, docs, ordinals = self._index.facet_source(
+            query, agent_name, fuzzy, snapshot.version
+        )
+        if docs is not None:
+            with self._lock:
+                if self._snapshot.version == version:
+                    snapshot = self._snapshot  # built while we waited
+                else:
+                    started = time.perf_counter()
+                    snapshot = FacetSnapshot(version, docs)
+                    if version > self._snapshot.version:
+                        self._snapshot = snapshot
+                    self._builds += 1
+                    self._last_build_ms = (time.perf_counter() - started) * 1000
+        return snapshot.counts(ordinals, status, property_type, min_price, max_price)
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version,
+            "rows": len(snapshot),
+            "builds": self._builds,
+            "last_build_ms": round(self._last_build_ms, 2),
+        }
+
+
+facet_counter = FacetCounter(listing_index)
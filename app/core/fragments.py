@@ -0,0 +1,136 @@
+# app/core/fragments.py
+import threading
+from collections import OrderedDict
+from jinja2 import pass_context
+from markupsafe import Markup
+from .config import settings
+
+# Per-entity templates whose rendered HTML is cached: template -> (context
+# variable, id column). A fragment is keyed by (template, id, updated_at), so
+# it may only depend on the entity's own columns, and every procedure that
+# feeds it must select updated_at.
+FRAGMENTS = {
+    "admin/properties/property_row.html": ("property", "property_id"),
+    "admin/clients/client_row.html": ("client", "client_id"),
+    "admin/agents/agent_row.html": ("agent", "agent_id"),
+    "components/property_card.html": ("property", "property_id"),
+}
+
+VERSION_FIELD = "updated_at"
+
+
+class FragmentCache:
+    """Rendered HTML per (template, entity id), tagged with the entity's
+    version and bounded by total size in bytes.
+
+    Only the newest version of an entity is kept: a lookup with a different
+    updated_at is a miss and the re-render replaces the old entry.
+    """
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (template, id) -> (version, html, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._uncacheable = 0
+        self._evictions = 0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry[0] != version:
+                self._stale += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key, version, html: str):
+        size = len(html.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (version, html, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._evictions += 1
+
+    def note_uncacheable(self):
+        with self._lock:
+            self._uncacheable += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "stale": self._stale,
+                "uncacheable": self._uncacheable,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+
+fragment_cache = FragmentCache(max_bytes=settings.FRAGMENT_CACHE_MAX_BYTES)
+
+
+@pass_context
+def fragment(context, name: str, entity):
+    """Render a per-entity template, reusing the cached HTML while the
+    entity's updated_at is unchanged.
+
+    Usage: {{ fragment("admin/clients/client_row.html", client) }}
+    The template sees only the entity, under its FRAGMENTS variable name.
+    """
+    variable, id_field = FRAGMENTS[name]
+    environment = context.environment
+    template = environment.get_template(name)
+    values = {variable: entity}
+
+    version = entity.get(VERSION_FIELD)
+    if not settings.FRAGMENT_CACHE_ENABLED or version is None:
+        fragment_cache.note_uncacheable()
+        if environment.is_async:
+            return _render_async(template, values)
+        return Markup(template.render(values))
+
+    key = (name, entity.get(id_field))
+    html = fragment_cache.get(key, version)
+    if html is not None:
+        return html
+    if environment.is_async:
+        return _render_async(template, values, key, version)
+    html = Markup(template.render(values))
+    fragment_cache.put(key, version, html)
+    return html
+
+
+async def _render_async(template, values, key=None, version=None):
+    # Async environments auto-await call results, so the global can hand
+    # back this coroutine
+    html = Markup(await template.render_async(values))
+    if key is not None:
+        fragment_cache.put(key, version, html)
+    return html
@@ -0,0 +1,147 @@
+# app/core/fuzzy.py
+import time
+from collections import defaultdict
+from typing import NamedTuple, Optional
+from rapidfuzz.distance import OSA
+
+GRAM = 3
+# Trigrams one edit can change: a swap of two letters touches four
+GRAMS_PER_EDIT = GRAM + 1
+
+
+def max_edits(word: str) -> int:
+    """Typos tolerated in a word of this length"""
+    if len(word) <= 2:
+        return 0
+    if len(word) <= 5:
+        return 1
+    return 2
+
+
+def _grams(word: str) -> set:
+    padded = f"^{word}$"
+    return {padded[i:i + GRAM] for i in range(len(padded) - GRAM + 1)}
+
+
+class Match(NamedTuple):
+    term: str
+    distance: int
+
+
+class NgramIndex:
+    """Vocabulary indexed by character trigrams for typo-tolerant lookups.
+
+    Edits are insertions, deletions, substitutions and swaps of adjacent
+    letters (optimal string alignment), so "mian" is one typo from "main".
+    Edit distance is only computed for words that share enough trigrams
+    with the query to be within reach: one edit changes at most four
+    trigrams, so a word k edits away keeps all but 4k of them. Words too
+    short for that bound to prune anything check the words sharing at
+    least one trigram first, and only scan the rest of that length when
+    none of those is close enough.
+    """
+
+    def __init__(self):
+        self._words = set()
+        self._grams = defaultdict(set)  # trigram -> words
+        self._by_length = defaultdict(set)
+
+    def __len__(self):
+        return len(self._words)
+
+    def add(self, word: str):
+        if word in self._words:
+            return
+        self._words.add(word)
+        self._by_length[len(word)].add(word)
+        for gram in _grams(word):
+            self._grams[gram].add(word)
+
+    def discard(self, word: str):
+        if word not in self._words:
+            return
+        self._words.discard(word)
+        self._by_length[len(word)].discard(word)
+        for gram in _grams(word):
+            words = self._grams[gram]
+            words.discard(word)
+            if not words:
+                del self._grams[gram]
+
+    def _candidates(self, word: str, k: int, deadline: Optional[float]) -> tuple:
+        """Words that may be within k edits, most shared trigrams first so a
+        deadline cuts off the unlikely ones, plus the words of similar
+        length sharing no trigram when the bound can't rule those out"""
+        grams = sorted(_grams(word), key=lambda gram: len(self._grams.get(gram, ())))
+        needed = len(grams) - GRAMS_PER_EDIT * k
+        shared = defaultdict(int)
+        if needed > 0:
+            # A word sharing `needed` of the trigrams has at least one of
+            # the rarest len - needed + 1, so only those lists are scanned;
+            # the common ones are just probed for the words found
+            split = len(grams) - needed + 1
+            for gram in grams[:split]:
+                for term in self._grams.get(gram, ()):
+                    if abs(len(term) - len(word)) <= k:
+                        shared[term] += 1
+            for gram in grams[split:]:
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+                terms = self._grams.get(gram, ())
+                for term in shared:
+                    if term in terms:
+                        shared[term] += 1
+        else:
+            for gram in grams:
+                for term in self._grams.get(gram, ()):
+                    shared[term] += 1
+
+        candidates = [
+            term
+            for term, count in shared.items()
+            if count >= needed and abs(len(term) - len(word)) <= k
+        ]
+        candidates.sort(key=shared.__getitem__, reverse=True)
+        if needed > 0:
+            return candidates, ()
+        unshared = (
+            term
+            for length in range(max(1, len(word) - k), len(word) + k + 1)
+            for term in self._by_length.get(length, ())
+            if term not in shared
+        )
+        return candidates, unshared
+
+    def similar(
+        self,
+        word: str,
+        max_distance: Optional[int] = None,
+        limit: int = 10,
+        deadline: Optional[float] = None,
+    ) -> list:
+        """Words within max_distance edits of word (default max_edits),
+        closest first. Stops verifying candidates at deadline (a
+        time.perf_counter() value) and returns what it has."""
+        k = max_edits(word) if max_distance is None else max_distance
+        if k == 0:
+            return [Match(word, 0)] if word in self._words else []
+
+        candidates, unshared = self._candidates(word, k, deadline)
+        matches = self._verify(word, k, candidates, deadline)
+        if not matches:
+            # Only scan words sharing no trigram when nothing closer exists
+            matches = self._verify(word, k, unshared, deadline)
+        matches.sort(key=lambda match: (match.distance, match.term))
+        return matches[:limit]
+
+    @staticmethod
+    def _verify(word: str, k: int, candidates, deadline: Optional[float]) -> list:
+        matches = []
+        for position, term in enumerate(candidates):
+            if deadline is not None and position % 64 == 0:
+                if time.perf_counter() > deadline:
+                    break
+            distance = OSA.distance(word, term, score_cutoff=k)
+            if distance <= k:
+                matches.append(Match(term, distance))
+        return matches
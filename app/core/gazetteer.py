@@ -0,0 +1,118 @@
+# app/core/gazetteer.py
+import csv
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Optional
+from .config import settings
+from .database import execute_procedure
+from .logging_config import logger
+
+# Street suffixes spelled out, so "Main St" and "Main Street" match
+SUFFIXES = {
+    "ave": "avenue", "av": "avenue", "blvd": "boulevard", "ct": "court",
+    "dr": "drive", "hwy": "highway", "ln": "lane", "pkwy": "parkway",
+    "pl": "place", "rd": "road", "sq": "square", "st": "street",
+    "ter": "terrace",
+}
+WORD = re.compile(r"[a-z0-9]+")
+
+
+class Location(NamedTuple):
+    latitude: float
+    longitude: float
+    precision: str  # "street" or "city"
+
+
+def _normalize(text: str) -> str:
+    return " ".join(SUFFIXES.get(word, word) for word in WORD.findall(text.lower()))
+
+
+def _street_name(part: str) -> str:
+    """Street without the house number ("12A Main St" -> "main street")"""
+    words = part.split()
+    while words and words[0][0].isdigit():
+        words.pop(0)
+    return _normalize(" ".join(words))
+
+
+def split_address(address: str) -> tuple:
+    """(street, city, state) from "123 Main St, Boston, MA 02118"; street
+    is None for a bare "City, ST"."""
+    parts = [part.strip() for part in (address or "").split(",") if part.strip()]
+    if len(parts) < 2:
+        return None, None, None
+    state = _normalize(parts[-1].split()[0])
+    city = _normalize(parts[-2])
+    street = _street_name(parts[0]) if len(parts) > 2 else None
+    return street or None, city, state
+
+
+class Gazetteer:
+    """Street and city coordinates read from a local CSV.
+
+    Lookups never leave the process: an address resolves to its street's
+    point when the street is listed for that city, otherwise to the city
+    centre, otherwise to nothing.
+    """
+
+    def __init__(self, streets: dict, cities: dict):
+        self._streets = streets
+        self._cities = cities
+
+    @classmethod
+    def load(cls, path: Path) -> "Gazetteer":
+        streets, cities = {}, {}
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = csv.DictReader(line for line in f if not line.startswith("#"))
+            for row in rows:
+                point = (float(row["latitude"]), float(row["longitude"]))
+                city, state = _normalize(row["city"]), _normalize(row["state"])
+                if row["street"].strip():
+                    streets[(_street_name(row["street"]), city, state)] = point
+                else:
+                    cities[(city, state)] = point
+        return cls(streets, cities)
+
+    def __len__(self):
+        return len(self._streets) + len(self._cities)
+
+    def geocode(self, address: str) -> Optional[Location]:
+        street, city, state = split_address(address)
+        if city is None:
+            return None
+        point = self._streets.get((street, city, state)) if street else None
+        if point is not None:
+            return Location(*point, "street")
+        point = self._cities.get((city, state))
+        if point is not None:
+            return Location(*point, "city")
+        return None
+
+
+@lru_cache()
+def get_gazetteer() -> Gazetteer:
+    """The configured gazetteer, loaded once; empty if the file is missing"""
+    try:
+        gazetteer = Gazetteer.load(settings.GAZETTEER_PATH)
+    except FileNotFoundError:
+        logger.warning(f"Gazetteer not found at {settings.GAZETTEER_PATH}")
+        return Gazetteer({}, {})
+    logger.info(f"Gazetteer loaded with {len(gazetteer)} places.")
+    return gazetteer
+
+
+async def locate_property(conn, property_id: int, address: str) -> Optional[Location]:
+    """Geocode address and store the position on the property (cleared if
+    the address can't be placed). Runs in conn's transaction."""
+    location = get_gazetteer().geocode(address)
+    await execute_procedure(
+        conn,
+        "set_property_location",
+        (
+            property_id,
+            location.latitude if location else None,
+            location.longitude if location else None,
+        ),
+    )
+    return location
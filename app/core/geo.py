@@ -0,0 +1,112 @@
+# app/core/geo.py
+import math
+from typing import NamedTuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+class BoundingBox(NamedTuple):
+    south: float
+    west: float
+    north: float
+    east: float
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        return (
+            self.south <= latitude <= self.north
+            and self.west <= longitude <= self.east
+        )
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_box(latitude: float, longitude: float, radius_km: float) -> BoundingBox:
+    """Smallest lat/lng box holding the circle (clamped at the poles)"""
+    dlat = radius_km / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(latitude))
+    dlng = 180.0 if cos_lat < 1e-6 else min(180.0, dlat / cos_lat)
+    return BoundingBox(
+        max(-90.0, latitude - dlat),
+        max(-180.0, longitude - dlng),
+        min(90.0, latitude + dlat),
+        min(180.0, longitude + dlng),
+    )
+
+
+class GeoGrid:
+    """Points bucketed into fixed lat/lng cells for area queries.
+
+    A box query only visits the cells it overlaps, so the cost follows the
+    area searched rather than the number of points indexed. Boxes covering
+    more cells than are occupied walk the occupied cells instead.
+    """
+
+    def __init__(self, cell_degrees: float):
+        self.cell_degrees = cell_degrees
+        self._cells = {}  # (row, column) -> set of keys
+        self._points = {}  # key -> (latitude, longitude)
+
+    def __len__(self):
+        return len(self._points)
+
+    def _cell(self, latitude: float, longitude: float) -> tuple:
+        return (
+            math.floor(latitude / self.cell_degrees),
+            math.floor(longitude / self.cell_degrees),
+        )
+
+    def add(self, key, latitude: float, longitude: float):
+        self.discard(key)
+        self._points[key] = (latitude, longitude)
+        self._cells.setdefault(self._cell(latitude, longitude), set()).add(key)
+
+    def discard(self, key):
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        keys = self._cells[cell]
+        keys.discard(key)
+        if not keys:
+            del self._cells[cell]
+
+    def point(self, key) -> tuple:
+        return self._points[key]
+
+    def within(self, box: BoundingBox):
+        """Keys of the points inside box"""
+        low_row, low_column = self._cell(box.south, box.west)
+        high_row, high_column = self._cell(box.north, box.east)
+        cells = (high_row - low_row + 1) * (high_column - low_column + 1)
+        if cells > len(self._cells):
+            candidates = (
+                key
+                for (row, column), keys in self._cells.items()
+                if low_row <= row <= high_row and low_column <= column <= high_column
+                for key in keys
+            )
+        else:
+            candidates = (
+                key
+                for row in range(low_row, high_row + 1)
+                for column in range(low_column, high_column + 1)
+                for key in self._cells.get((row, column), ())
+            )
+        for key in candidates:
+            if box.contains(*self._points[key]):
+                yield key
+
+    def nearby(self, latitude: float, longitude: float, radius_km: float):
+        """(distance_km, key) for the points within radius_km"""
+        for key in self.within(radius_box(latitude, longitude, radius_km)):
+            distance = haversine_km(latitude, longitude, *self._points[key])
+            if distance <= radius_km:
+                yield distance, key
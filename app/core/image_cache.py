@@ -0,0 +1,331 @@
+# app/core/image_cache.py
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple, Optional
+from urllib.parse import urlencode
+import aiofiles.os
+from .config import settings
+from .image_pipeline import image_pipeline, resize_image
+from .logging_config import logger
+
+# Widths a derivative may have; requests snap up to the next one, so the
+# cache holds a few variants per image rather than one per pixel width
+IMAGE_WIDTHS = (320, 480, 768, 1024, 1600)
+FORMATS = {"jpeg": ("JPEG", "image/jpeg"), "webp": ("WEBP", "image/webp")}
+SOURCE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+# Image URL prefixes that can be resized -> source root named in /images URLs
+SOURCE_PREFIXES = {"/static/": "static", "static/": "static", "/media/": "media"}
+# Seconds after its last use an entry is safe from eviction, so a file
+# handed to a response isn't deleted while it is being sent
+EVICTION_GRACE = 60
+# Seconds between re-reads of the directory, which pick up the files other
+# processes generated and evicted so the budget is shared between them
+RESCAN_INTERVAL = 300
+# A generation lock file older than this is presumed left by a crash
+LOCK_TIMEOUT = 60
+# Seconds between checks while another process generates a derivative
+LOCK_POLL = 0.05
+
+
+class Derivative(NamedTuple):
+    path: Path
+    media_type: str
+    key: str
+
+
+def snap_width(width: int) -> int:
+    for allowed in IMAGE_WIDTHS:
+        if width <= allowed:
+            return allowed
+    return IMAGE_WIDTHS[-1]
+
+
+def _source(url: Optional[str]) -> Optional[tuple]:
+    """(root, path) of a resizable image URL, else None"""
+    for prefix, root in SOURCE_PREFIXES.items():
+        if url and url.startswith(prefix):
+            return root, url[len(prefix):]
+    return None
+
+
+def resized_url(url: Optional[str], width: int, image_format: str = "jpeg") -> Optional[str]:
+    """URL of the width-wide derivative of a /static or /media image URL;
+    other URLs (external, missing) come back unchanged"""
+    source = _source(url)
+    if source is None:
+        return url
+    root, path = source
+    return f"/images/{root}/{path}?" + urlencode(
+        {"w": snap_width(width), "format": image_format}
+    )
+
+
+def image_srcset(url: Optional[str], image_format: str = "jpeg", widths=IMAGE_WIDTHS) -> str:
+    """srcset listing url's derivatives at widths; empty if url can't be resized"""
+    if _source(url) is None:
+        return ""
+    return ", ".join(f"{resized_url(url, width, image_format)} {width}w" for width in widths)
+
+
+def _claim(lock: Path) -> bool:
+    """Create lock exclusively; False if another process holds it. A lock
+    older than LOCK_TIMEOUT is presumed abandoned and removed, to be
+    claimed on the next try."""
+    try:
+        os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        return True
+    except FileExistsError:
+        try:
+            if time.time() - lock.stat().st_mtime > LOCK_TIMEOUT:
+                lock.unlink()
+        except FileNotFoundError:
+            pass
+        return False
+
+
+def _remove_unused(paths: list, cutoff: float) -> list:
+    """Delete each path not used (touched) since cutoff. Returns, per path,
+    None if it is gone, else its mtime: another process used it since."""
+    results = []
+    for path in paths:
+        try:
+            mtime = path.stat().st_mtime
+            if mtime > cutoff:
+                results.append(mtime)
+                continue
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        results.append(None)
+    return results
+
+
+async def _file_size(path: Path) -> Optional[int]:
+    try:
+        return (await aiofiles.os.stat(path)).st_size
+    except FileNotFoundError:
+        return None
+
+
+async def _in_thread(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+class ImageCache:
+    """Resized images kept on disk, evicted least recently used first once
+    they pass max_bytes.
+
+    A derivative is keyed by its source's path, size and mtime plus the
+    target width and format, so replacing a source simply orphans the old
+    entries until they age out. Concurrent requests for a derivative that
+    is still being generated wait on the one generation in flight; across
+    processes, a lock file beside it lets one generate while the others
+    wait for its file. Derivatives are written by atomic rename, so a
+    finished file is never partial.
+
+    Every process shares the directory and its budget. A file's mtime is
+    its recency, touched when it is served, and each process re-reads the
+    directory every RESCAN_INTERVAL to count the others' files. Files used
+    within EVICTION_GRACE are kept even over max_bytes, checked against
+    their mtime again just before deletion. Filesystem calls run in threads.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> [path, size, last used], oldest first
+        self._bytes = 0
+        self._inflight = {}  # key -> task generating it
+        self._scanned_at = None
+        self._scan_lock = asyncio.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._adopted = 0
+        self._evictions = 0
+        self._failures = 0
+
+    def _scan(self) -> OrderedDict:
+        """Derivatives on disk, least recently used first (blocking)"""
+        files = []
+        if self.directory.exists():
+            for path in self.directory.glob("*/*"):
+                if path.suffix in (".jpeg", ".webp"):
+                    try:
+                        stat = path.stat()
+                    except FileNotFoundError:
+                        continue  # evicted by another process meanwhile
+                    files.append((stat.st_mtime, path.stem, path, stat.st_size))
+        return OrderedDict(
+            (key, [path, size, mtime]) for mtime, key, path, size in sorted(files)
+        )
+
+    def _scan_due(self) -> bool:
+        return (
+            self._scanned_at is None
+            or time.monotonic() - self._scanned_at > RESCAN_INTERVAL
+        )
+
+    async def _rescan(self):
+        async with self._scan_lock:
+            if not self._scan_due():
+                return
+            first = self._scanned_at is None
+            entries = await _in_thread(self._scan)
+            self._entries = entries
+            self._bytes = sum(size for _, size, _ in entries.values())
+            self._scanned_at = time.monotonic()
+        if first:
+            logger.info(
+                f"Image cache indexed {len(entries)} files ({self._bytes} bytes)."
+            )
+
+    @staticmethod
+    def _key(source: Path, stat, width: int, image_format: str) -> str:
+        raw = f"{source}|{stat.st_size}|{stat.st_mtime_ns}|{width}|{image_format}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    async def _touch(self, key: str, entry: list) -> bool:
+        """Mark entry used, for every process; False if its file is gone.
+        The mtime is only rewritten once half the grace period has passed,
+        so most hits cost no syscall."""
+        now = time.time()
+        if now - entry[2] > EVICTION_GRACE / 2:
+            try:
+                await _in_thread(os.utime, entry[0])
+            except FileNotFoundError:
+                # Evicted by another process
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+                    self._bytes -= entry[1]
+                return False
+            entry[2] = now
+        return True
+
+    async def get(self, source: Path, width: int, image_format: str) -> Derivative:
+        """The derivative of source at width in image_format, generated on
+        first request. source must exist (FileNotFoundError otherwise)."""
+        if self._scan_due():
+            await self._rescan()
+        width = snap_width(width)
+        pil_format, media_type = FORMATS[image_format]
+        key = self._key(source, await aiofiles.os.stat(source), width, image_format)
+
+        entry = self._entries.get(key)
+        if entry is not None and await self._touch(key, entry):
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._hits += 1
+            return Derivative(entry[0], media_type, key)
+
+        task = self._inflight.get(key)
+        if task is None:
+            self._misses += 1
+            task = asyncio.ensure_future(
+                self._generate(key, source, width, image_format, pil_format)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self._coalesced += 1
+        # Shielded: a client going away mustn't cancel work others wait on
+        path = await asyncio.shield(task)
+        return Derivative(path, media_type, key)
+
+    async def _generate(self, key, source, width, image_format, pil_format) -> Path:
+        path = self.directory / key[:2] / f"{key}.{image_format}"
+        await aiofiles.os.makedirs(path.parent, exist_ok=True)
+        try:
+            size = await _file_size(path)
+            if size is None:
+                size = await self._generate_locked(path, source, width, pil_format)
+            else:
+                self._adopted += 1  # another process generated it
+        except Exception:
+            self._failures += 1
+            raise
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[1]
+        self._entries[key] = [path, size, time.time()]
+        self._bytes += size
+        await self._evict()
+        return path
+
+    async def _generate_locked(self, path, source, width, pil_format) -> int:
+        """Generate path under its lock file, or wait for the process that
+        holds the lock to finish it; returns the file's size"""
+        lock = path.with_name(path.name + ".lock")
+        while not await _in_thread(_claim, lock):
+            await asyncio.sleep(LOCK_POLL)
+            size = await _file_size(path)
+            if size is not None:
+                self._adopted += 1
+                return size
+        try:
+            # It may have been finished between our last look and the claim
+            size = await _file_size(path)
+            if size is not None:
+                self._adopted += 1
+                return size
+            return await image_pipeline.run(
+                resize_image, str(source), str(path), width, pil_format
+            )
+        finally:
+            try:
+                await aiofiles.os.remove(lock)
+            except FileNotFoundError:
+                pass
+
+    async def _evict(self):
+        if self._bytes <= self.max_bytes:
+            return
+        cutoff = time.time() - EVICTION_GRACE
+        excess = self._bytes - self.max_bytes
+        victims = []
+        # Never the newest entry: it is the one just generated
+        for key, entry in list(self._entries.items())[:-1]:
+            if excess <= 0 or entry[2] > cutoff:
+                # Everything after it was used more recently still
+                break
+            victims.append((key, entry))
+            excess -= entry[1]
+        if not victims:
+            return
+
+        results = await _in_thread(
+            _remove_unused, [entry[0] for _, entry in victims], cutoff
+        )
+        for (key, entry), used in zip(victims, results):
+            if self._entries.get(key) is not entry:
+                continue  # replaced or dropped meanwhile
+            if used is None:
+                del self._entries[key]
+                self._bytes -= entry[1]
+                self._evictions += 1
+            else:
+                entry[2] = used
+                self._entries.move_to_end(key)
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses + self._coalesced
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "adopted": self._adopted,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else None,
+            "evictions": self._evictions,
+            "failures": self._failures,
+            "generating": len(self._inflight),
+        }
+
+
+image_cache = ImageCache(settings.IMAGE_CACHE_DIR, settings.IMAGE_CACHE_MAX_BYTES)
@@ -0,0 +1,52 @@
+# app/core/image_lists.py
+from .cache import ResultCache
+from .config import settings
+from .database import execute_procedure_sync, on_commit, run_in_db_executor
+
+# Each property's image list is cached under its own invalidation tag, so an
+# upload to one listing leaves every other listing's cached list alone
+image_list_cache = ResultCache(
+    max_entries=settings.IMAGE_LIST_CACHE_MAX_ENTRIES,
+    ttl=settings.IMAGE_LIST_CACHE_TTL,
+)
+
+
+def _tags(property_id: int) -> tuple:
+    return (f"PropertyImages:{property_id}",)
+
+
+def get_property_images_sync(conn, property_id: int) -> list:
+    """get_property_images for one property, cached until its images change.
+    The rows are shared; don't modify them."""
+    if "PropertyImages" in conn.written_tables:
+        # Not this transaction's own uncommitted changes (see _through_cache)
+        return execute_procedure_sync(
+            conn, "get_property_images", (property_id,), use_cache=False
+        )
+    key = ("get_property_images", property_id)
+    images = image_list_cache.get(key)
+    if images is not None:
+        return images
+    tags = _tags(property_id)
+    snapshot = image_list_cache.snapshot(tags)
+    images = execute_procedure_sync(
+        conn, "get_property_images", (property_id,), use_cache=False
+    )
+    # Rows read after an uncommitted write may never be committed
+    if not conn.written_tables:
+        image_list_cache.put(key, images, tags, snapshot)
+    return images
+
+
+async def get_property_images(conn, property_id: int) -> list:
+    return await run_in_db_executor(get_property_images_sync, conn, property_id)
+
+
+def invalidate_image_list(conn, property_id: int):
+    """Drop property_id's cached image list now and again once conn's
+    transaction commits, so no read in between can cache pre-commit rows.
+    Call it with every write that adds, removes, reorders or reprocesses
+    a property's images."""
+    tags = _tags(property_id)
+    image_list_cache.invalidate(tags)
+    on_commit(conn, lambda _conn: image_list_cache.invalidate(tags))
@@ -0,0 +1,291 @@
+# app/core/image_pipeline.py
+import asyncio
+import base64
+import io
+import multiprocessing
+import os
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+from .config import settings
+from .database import commit, db_executor, execute_procedure_sync, on_commit, pool
+from .image_lists import invalidate_image_list
+from .logging_config import logger
+
+THUMBNAIL_SIZE = (300, 300)
+# Longest side of the blurred preview shown while an image loads
+PLACEHOLDER_SIZE = 24
+PLACEHOLDER_QUALITY = 40
+# Finished jobs are forgotten after this many seconds; the status route
+# falls back to the database for images it no longer tracks
+JOB_TTL = 600
+
+QUEUED, PROCESSING, DONE, FAILED = "queued", "processing", "done", "failed"
+
+
+def thumbnail_path_for(source: Path) -> Path:
+    """Where the thumbnail of source goes: a thumbnails/ directory beside it"""
+    return source.parent / "thumbnails" / source.name
+
+
+def process_image(source: str, target: str, thumbnail: str) -> dict:
+    """Decode source once and write its derivatives. Runs in a worker process.
+
+    The upload is written to target upright (EXIF orientation applied) and
+    without its metadata, which also drops any location the camera
+    recorded, and source is removed. The thumbnail and a tiny JPEG
+    placeholder, returned as a data: URI, are cut from the same decoded
+    image. If an earlier job for the same content already moved source,
+    target is read instead and left as it is.
+    """
+    from PIL import Image, ImageOps
+
+    moved = not os.path.exists(source)
+    with Image.open(target if moved else source) as opened:
+        image_format = opened.format
+        icc_profile = opened.info.get("icc_profile")
+        image = ImageOps.exif_transpose(opened)
+        image.load()
+
+    save_options = {"icc_profile": icc_profile} if icc_profile else {}
+    if image_format == "JPEG":
+        save_options.update(quality=90, optimize=True)
+    if not moved:
+        Path(target).parent.mkdir(parents=True, exist_ok=True)
+        stripped = f"{target}.{os.getpid()}.tmp"
+        image.save(stripped, format=image_format, **save_options)
+        os.replace(stripped, target)
+        Path(source).unlink(missing_ok=True)
+
+    Path(thumbnail).parent.mkdir(parents=True, exist_ok=True)
+    thumb = image.copy()
+    thumb.thumbnail(THUMBNAIL_SIZE)
+    thumb.save(thumbnail, format=image_format, **save_options)
+
+    preview = thumb.convert("RGB")
+    preview.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    buffer = io.BytesIO()
+    preview.save(buffer, format="JPEG", quality=PLACEHOLDER_QUALITY)
+    placeholder = "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+    return {"width": image.width, "height": image.height, "placeholder": placeholder}
+
+
+def resize_image(source: str, target: str, width: int, image_format: str) -> int:
+    """Write source scaled down to width (never up) as image_format to
+    target, atomically; returns the bytes written. Runs in a worker process."""
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as opened:
+        # Let JPEG decode at a reduced scale that still covers width either
+        # way round, since the EXIF orientation may yet swap the sides
+        opened.draft(None, (width, width))
+        image = ImageOps.exif_transpose(opened)
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        if image_format == "JPEG":
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        partial = f"{target}.{os.getpid()}.tmp"
+        image.save(partial, format=image_format, quality=80, optimize=image_format == "JPEG")
+    os.replace(partial, target)
+    return os.path.getsize(target)
+
+
+class ImageJob:
+    def __init__(self, image_id: int, source: Path, target: Path, thumbnail_url: str):
+        self.image_id = image_id
+        self.source = source
+        self.target = target
+        self.thumbnail = thumbnail_path_for(target)
+        self.thumbnail_url = thumbnail_url
+        self.future = None  # set once handed to the worker pool
+        self._status = QUEUED
+        self.created_at = time.monotonic()
+        self.result = None
+        self.error = None
+        self.finished_at = None
+
+    @property
+    def status(self) -> str:
+        """queued until a worker picks the job up (through the upload's
+        commit and the pool's backlog), then processing until its result
+        is recorded"""
+        if self._status == QUEUED and self.future is not None:
+            if self.future.running() or self.future.done():
+                return PROCESSING
+        return self._status
+
+    @status.setter
+    def status(self, value: str):
+        self._status = value
+
+    @property
+    def pending(self) -> bool:
+        return self.status in (QUEUED, PROCESSING)
+
+
+class ImagePipeline:
+    """Post-upload image processing on a pool of worker processes.
+
+    Decoding and resizing are CPU-bound and hold the GIL, so they run in
+    separate processes rather than on the event loop or the db executor.
+    Jobs are handed to the pool only once the upload's transaction commits,
+    and their results are written back on the db executor. At most
+    queue_max jobs wait or run at once, counting slots reserved for uploads
+    still in progress; uploads beyond that are refused rather than queued
+    without bound.
+    """
+
+    def __init__(self, workers: int, queue_max: int):
+        self.workers = workers
+        self.queue_max = queue_max
+        self._executor = None
+        self._jobs = {}  # image_id -> ImageJob
+        self._lock = threading.Lock()
+        self._reserved = 0
+        self._completed = 0
+        self._failed = 0
+
+    def start(self):
+        if self._executor is None:
+            # Spawned, not forked: the server process runs threads (the db
+            # executor, the pool) that a fork would copy mid-flight
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _pending_count(self) -> int:
+        return sum(job.pending for job in self._jobs.values()) + self._reserved
+
+    def _prune(self):
+        # Jobs never handed to the pool this long belong to uploads that
+        # rolled back
+        cutoff = time.monotonic() - JOB_TTL
+        for image_id in [
+            image_id
+            for image_id, job in self._jobs.items()
+            if (job.finished_at or job.created_at) < cutoff
+            and (job.finished_at is not None or job.future is None)
+        ]:
+            del self._jobs[image_id]
+
+    def is_full(self) -> bool:
+        with self._lock:
+            return self._pending_count() >= self.queue_max
+
+    @contextmanager
+    def reserve(self, count: int):
+        """Hold up to count queue slots for an upload's jobs; yields how
+        many were granted. Enqueue at most that many jobs inside the block.
+        The slots are freed at its end, by which time the jobs count
+        themselves."""
+        with self._lock:
+            self._prune()
+            granted = max(0, min(count, self.queue_max - self._pending_count()))
+            self._reserved += granted
+        try:
+            yield granted
+        finally:
+            with self._lock:
+                self._reserved -= granted
+
+    def job(self, image_id: int) -> Optional[ImageJob]:
+        with self._lock:
+            self._prune()
+            return self._jobs.get(image_id)
+
+    def enqueue_on_commit(
+        self, conn, image_id: int, source: Path, target: Path, thumbnail_url: str
+    ) -> ImageJob:
+        """Track a job for image_id, processing source into target, and
+        start it once conn commits. thumbnail_url is where
+        thumbnail_path_for(target) is served."""
+        job = ImageJob(image_id, source, target, thumbnail_url)
+        with self._lock:
+            self._prune()
+            self._jobs[image_id] = job
+        on_commit(conn, lambda _conn: self._submit(job))
+        return job
+
+    def _submit(self, job: ImageJob):
+        try:
+            self.start()
+            job.future = future = self._executor.submit(
+                process_image, str(job.source), str(job.target), str(job.thumbnail)
+            )
+        except Exception as e:
+            logger.error(f"Could not queue image {job.image_id}: {e}")
+            job.error = str(e)
+            job.status = FAILED
+            job.finished_at = time.monotonic()
+            return
+        future.add_done_callback(lambda done: db_executor.submit(self._record, job, done))
+
+    def _record(self, job: ImageJob, future):
+        """Store a finished job's derivatives (runs on the db executor)"""
+        try:
+            result = future.result()
+            thumbnail = job.thumbnail_url
+            conn = pool.checkout()
+            try:
+                changed = execute_procedure_sync(
+                    conn,
+                    "set_image_derivatives",
+                    (
+                        job.image_id,
+                        thumbnail,
+                        result["placeholder"],
+                        result["width"],
+                        result["height"],
+                    ),
+                )
+                for row in changed:
+                    invalidate_image_list(conn, row["property_id"])
+                commit(conn)
+            finally:
+                pool.checkin(conn)
+            job.result = dict(result, thumbnail_path=thumbnail)
+            job.status = DONE
+            self._completed += 1
+        except Exception as e:
+            logger.error(f"Processing image {job.image_id} failed: {e}", exc_info=True)
+            job.error = str(e)
+            job.status = FAILED
+            self._failed += 1
+        job.finished_at = time.monotonic()
+
+    async def run(self, func, *args):
+        """Run func(*args) in the pool and await it, without a tracked job.
+        func must be a module-level function so it can be pickled."""
+        self.start()
+        return await asyncio.wrap_future(self._executor.submit(func, *args))
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            return {
+                "workers": self.workers,
+                "queue_max": self.queue_max,
+                "queued": statuses.count(QUEUED),
+                "processing": statuses.count(PROCESSING),
+                "pending": self._pending_count() - self._reserved,
+                "reserved": self._reserved,
+                "tracked": len(self._jobs),
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+
+
+image_pipeline = ImagePipeline(settings.IMAGE_WORKERS, settings.IMAGE_QUEUE_MAX)
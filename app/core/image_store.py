@@ -0,0 +1,104 @@
+# app/core/image_store.py
+from pathlib import Path
+from typing import Optional
+import aiofiles.os
+from .config import settings
+from .image_pipeline import thumbnail_path_for
+from .uploads import StoredFile
+
+MEDIA_URL = "/media"
+# Spellings of one format share a stored file
+EXTENSION_ALIASES = {".jpeg": ".jpg"}
+# Uploads are received here, on the store's filesystem, so they can be
+# renamed into place
+INCOMING_DIR = "incoming"
+# Stored uploads wait here, unserved, until the image pipeline has written
+# their processed copy to the public path
+PENDING_DIR = "pending"
+
+
+class ImageStore:
+    """Image files named by the SHA-256 of their content.
+
+    A file lives at <hash[0:2]>/<hash[2:4]>/<hash><ext> under the media
+    directory, so the same photo uploaded to many listings is kept once.
+    ImageBlob rows count the
+    PropertyImages using each file; callers remove the file when the count
+    drops to zero. The database serializes the two, so it holds across
+    worker processes: an upload stores its file while its transaction
+    holds the blob row, and a removal runs only while lock_image_blob
+    finds no row, so it can't delete a file an upload has just started
+    referencing again.
+
+    The hash is of the bytes as uploaded. A new file is kept under pending/
+    until the image pipeline has written it upright and without metadata
+    to its public path, so the original (and any location it records) is
+    never served, and the bytes under a /media URL never change.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    @property
+    def incoming(self) -> Path:
+        return self.directory / INCOMING_DIR
+
+    @staticmethod
+    def extension(filename_or_path) -> str:
+        suffix = Path(filename_or_path).suffix.lower()
+        return EXTENSION_ALIASES.get(suffix, suffix)
+
+    def relative_path(self, sha256: str, extension: str) -> str:
+        return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+    def path(self, sha256: str, extension: str) -> Path:
+        return self.directory / self.relative_path(sha256, extension)
+
+    def pending_path(self, sha256: str, extension: str) -> Path:
+        return self.directory / PENDING_DIR / self.relative_path(sha256, extension)
+
+    def url(self, sha256: str, extension: str) -> str:
+        return f"{MEDIA_URL}/{self.relative_path(sha256, extension)}"
+
+    def url_for_path(self, path: Path) -> str:
+        """URL of any file under the store (stored images, thumbnails)"""
+        return f"{MEDIA_URL}/{path.relative_to(self.directory).as_posix()}"
+
+    def resolve(self, relative: str) -> Optional[Path]:
+        """File for a /media path, or None if it falls outside the store"""
+        root = self.directory.resolve()
+        path = (root / relative).resolve()
+        if not path.is_relative_to(root) or any(
+            path.is_relative_to(root / private) for private in (INCOMING_DIR, PENDING_DIR)
+        ):
+            return None
+        return path
+
+    async def put(self, stored: StoredFile) -> bool:
+        """Move a received upload to its pending path (call while
+        add_stored_image(s) holds its blob row); returns whether it was new.
+        If the content is already stored or pending, the upload is dropped
+        and the existing file kept."""
+        extension = self.extension(stored.path)
+        pending = self.pending_path(stored.sha256, extension)
+        for existing in (self.path(stored.sha256, extension), pending):
+            if await aiofiles.os.path.exists(existing):
+                await aiofiles.os.remove(stored.path)
+                return False
+        await aiofiles.os.makedirs(pending.parent, exist_ok=True)
+        await aiofiles.os.rename(stored.path, pending)
+        return True
+
+    async def remove(self, sha256: str, extension: str):
+        """Delete a stored file, pending or processed, and its thumbnail
+        (call while lock_image_blob holds that no reference is left)"""
+        path = self.path(sha256, extension)
+        pending = self.pending_path(sha256, extension)
+        for victim in (path, thumbnail_path_for(path), pending):
+            try:
+                await aiofiles.os.remove(victim)
+            except FileNotFoundError:
+                pass
+
+
+image_store = ImageStore(settings.MEDIA_DIR)
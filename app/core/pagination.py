@@ -0,0 +1,50 @@
+# app/core/pagination.py
+import base64
+import binascii
+import json
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded"""
+
+
+def encode_cursor(values: dict) -> str:
+    """Opaque, URL-safe token for the keyset position after a page"""
+    raw = json.dumps(values, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> dict:
+    """Inverse of encode_cursor. Values come back as JSON types; callers
+    convert them (Decimal prices, dates) before binding them to a query."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}") from None
+    if not isinstance(values, dict):
+        raise InvalidCursorError("Invalid cursor")
+    return values
+
+
+def clamp_page_size(limit: int, default: int, maximum: int) -> int:
+    if not limit or limit < 1:
+        return default
+    return min(limit, maximum)
+
+
+def split_page(rows: list, page_size: int, id_field: str):
+    """Trim a page fetched with page_size + 1 entities.
+
+    Joined rows can repeat an entity, so this counts distinct ids rather
+    than rows. Returns the rows for the first page_size entities and
+    whether another page follows.
+    """
+    seen = set()
+    for position, row in enumerate(rows):
+        entity_id = row[id_field]
+        if entity_id not in seen:
+            if len(seen) == page_size:
+                return rows[:position], True
+            seen.add(entity_id)
+    return rows, False
@@ -0,0 +1,304 @@
+# app/core/pool.py
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Optional
+from mysql.connector import connect, Error
+from .logging_config import logger
+
+# Upper bounds (ms) of the checkout wait-time histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolExhaustedError(Error):
+    """Raised when no connection could be checked out in time"""
+
+
+class PooledConnection:
+    """A pooled MySQL connection that remembers whether its borrower left
+    session state behind (user variables, temporary tables, session
+    settings). Everything else is delegated to the raw connection."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.session_dirty = False
+        # Tables written in the open transaction; their cached reads are
+        # invalidated again once it commits
+        self.written_tables = set()
+        # Callbacks run once the open transaction commits (see on_commit)
+        self.after_commit = []
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def cursor(self, *args, **kwargs):
+        """Cursor for ad hoc SQL; may change session state, so mark dirty"""
+        self.session_dirty = True
+        return self.raw.cursor(*args, **kwargs)
+
+    def procedure_cursor(self, *args, **kwargs):
+        """Cursor for CALLs. callproc only sets its own @_proc_argN variables,
+        which the next call overwrites, so this does not dirty the session."""
+        return self.raw.cursor(*args, **kwargs)
+
+    def close(self):
+        raise RuntimeError("Return pooled connections with pool.checkin()")
+
+
+class ConnectionPool:
+    """Connection pool with a bounded wait queue, min/max sizing, idle reaping
+    and pre-warming.
+
+    Checkouts that find no idle connection open a new one while below
+    max_size, otherwise wait up to checkout_timeout. At most max_waiters
+    threads may wait; beyond that checkouts fail immediately so a burst sheds
+    load instead of tying up every executor thread.
+    """
+
+    def __init__(
+        self,
+        connect_args: dict,
+        min_size: int = 2,
+        max_size: int = 10,
+        checkout_timeout: float = 5.0,
+        max_waiters: int = 50,
+        idle_timeout: float = 300.0,
+        ping_after: float = 30.0,
+        reap_interval: float = 60.0,
+    ):
+        if min_size > max_size:
+            raise ValueError("min_size cannot exceed max_size")
+        self.connect_args = connect_args
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.max_waiters = max_waiters
+        self.idle_timeout = idle_timeout
+        self.ping_after = ping_after
+        self.reap_interval = reap_interval
+
+        self._idle = deque()
+        self._size = 0  # open connections, idle + in use + being opened
+        self._in_use = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+        self._reaper = None
+        self._closed = False
+
+        # Gauges and counters
+        self._wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._wait_sum_ms = 0.0
+        self._checkouts = 0
+        self._checkout_failures = 0
+        self._session_resets = 0
+        self._session_resets_skipped = 0
+        self._reaped = 0
+
+    # Lifecycle
+    def warm(self):
+        """Open min_size connections up front and start the idle reaper"""
+        opened = []
+        with self._cond:
+            needed = max(0, self.min_size - self._size)
+            self._size += needed
+        try:
+            for _ in range(needed):
+                opened.append(self._open())
+        finally:
+            with self._cond:
+                self._size -= needed - len(opened)
+                self._idle.extend(opened)
+                self._cond.notify_all()
+        self._start_reaper()
+        logger.info(f"Connection pool warmed with {len(opened)} connections.")
+
+    def close(self):
+        """Close idle connections and stop handing out new ones"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+    # Checkout / checkin
+    def checkout(self, timeout: float = None) -> PooledConnection:
+        """Borrow a connection, waiting up to timeout for one to free up"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._cond:
+            conn = None
+            while True:
+                if self._closed:
+                    self._fail("pool is closed")
+                if self._idle:
+                    # LIFO keeps hot connections busy and lets cold ones age
+                    # out at the left end for the reaper
+                    conn = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                if self._waiting >= self.max_waiters:
+                    self._fail(f"{self._waiting} checkouts already waiting")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._fail(f"timed out after {timeout:.1f}s")
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._in_use += 1
+            self._record_wait((time.monotonic() - started) * 1000)
+        return self._ready(conn)
+
+    def try_checkout(self, keep: int = 0) -> Optional[PooledConnection]:
+        """Borrow a connection only if more than keep are free right now
+        (idle, or room to open one); never waits, and None isn't counted as
+        a failed checkout"""
+        with self._cond:
+            free = len(self._idle) + self.max_size - self._size
+            if self._closed or free <= keep:
+                return None
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                conn = None
+                self._size += 1
+            self._in_use += 1
+            self._record_wait(0.0)
+        return self._ready(conn)
+
+    def _ready(self, conn: Optional[PooledConnection]) -> PooledConnection:
+        """Open the slot a checkout reserved (conn None) or ping a
+        connection idle long enough to have gone stale"""
+        try:
+            if conn is None:
+                conn = self._open()
+            elif time.monotonic() - conn.last_used > self.ping_after:
+                conn.raw.ping(reconnect=True, attempts=1)
+        except Exception:
+            if conn is not None:
+                self._discard(conn)
+            with self._cond:
+                self._in_use -= 1
+                self._size -= 1
+                self._checkout_failures += 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def checkin(self, conn: PooledConnection):
+        """Return a connection, resetting its session only if it was dirtied"""
+        healthy = True
+        conn.written_tables.clear()
+        conn.after_commit.clear()
+        try:
+            if conn.raw.in_transaction:
+                conn.raw.rollback()
+                conn.session_dirty = True
+            if conn.session_dirty:
+                conn.raw.reset_session()
+                conn.session_dirty = False
+                self._session_resets += 1
+            else:
+                self._session_resets_skipped += 1
+        except Exception as e:
+            logger.warning(f"Discarding connection that failed to reset: {e}")
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            if healthy and not self._closed:
+                conn.last_used = time.monotonic()
+                self._idle.append(conn)
+            else:
+                self._size -= 1
+            self._cond.notify()
+        if not healthy or self._closed:
+            self._discard(conn)
+
+    # Idle reaping
+    def reap(self):
+        """Close connections idle longer than idle_timeout, down to min_size"""
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            # Oldest connections sit at the left of the deque
+            while (
+                self._idle
+                and self._size > self.min_size
+                and now - self._idle[0].last_used > self.idle_timeout
+            ):
+                expired.append(self._idle.popleft())
+                self._size -= 1
+            self._reaped += len(expired)
+        for conn in expired:
+            self._discard(conn)
+        return len(expired)
+
+    def _start_reaper(self):
+        if self._reaper is not None:
+            return
+
+        def run():
+            while not self._closed:
+                time.sleep(self.reap_interval)
+                try:
+                    self.reap()
+                except Exception as e:
+                    logger.error(f"Connection reaper failed: {e}")
+
+        self._reaper = threading.Thread(target=run, name="db-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    # Metrics
+    def stats(self) -> dict:
+        """Snapshot of pool gauges and counters"""
+        with self._cond:
+            buckets = {}
+            cumulative = 0
+            for bound, count in zip(WAIT_BUCKETS_MS + ("+Inf",), self._wait_buckets):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "checkouts": self._checkouts,
+                "checkout_failures": self._checkout_failures,
+                "wait_ms_sum": round(self._wait_sum_ms, 3),
+                "wait_ms_buckets": buckets,
+                "session_resets": self._session_resets,
+                "session_resets_skipped": self._session_resets_skipped,
+                "reaped": self._reaped,
+            }
+
+    # Internals
+    def _open(self) -> PooledConnection:
+        return PooledConnection(connect(**self.connect_args))
+
+    def _discard(self, conn: PooledConnection):
+        try:
+            conn.raw.close()
+        except Exception:
+            pass
+
+    def _record_wait(self, wait_ms: float):
+        self._checkouts += 1
+        self._wait_sum_ms += wait_ms
+        self._wait_buckets[bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def _fail(self, reason: str):
+        self._checkout_failures += 1
+        raise PoolExhaustedError(msg=f"Could not check out a connection: {reason}")
@@ -0,0 +1,149 @@
+# app/core/procedures.py
+from typing import Any, NamedTuple, Tuple
+
+
+class ResultSet(NamedTuple):
+    """One result set of a stored procedure.
+
+    name: key the rows are returned under
+    one: the set holds a single row; return it (or None) instead of a list
+    """
+
+    name: str
+    one: bool = False
+
+
+class ProcedureShape(NamedTuple):
+    """The ordered result sets a multi-result procedure produces"""
+
+    procedure: str
+    result_sets: Tuple[ResultSet, ...]
+
+
+class ProcedureShapeError(ValueError):
+    """Raised when a procedure returns a different number of result sets"""
+
+
+class ProcedureCall(NamedTuple):
+    """One call in a batch. default is used for the panel if the call fails
+    (an empty list when not given)."""
+
+    procedure: str
+    params: tuple = ()
+    default: Any = None
+
+
+class MultiResult(dict):
+    """Result sets keyed by name, also readable as attributes"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+class BatchResult(dict):
+    """Rows for each call in a batch, keyed by name. Failed or timed-out
+    calls hold their default and are listed in errors."""
+
+    def __init__(self):
+        super().__init__()
+        self.errors = {}
+
+
+# Composite pages served by a single CALL
+
+PROPERTY_DETAIL_PAGE = ProcedureShape(
+    "get_property_detail_page",
+    (
+        ResultSet("property", one=True),
+        ResultSet("images"),
+    ),
+)
+
+PROPERTY_FORM_PAGE = ProcedureShape(
+    "get_property_form_page",
+    (
+        ResultSet("property", one=True),
+        ResultSet("images"),
+        ResultSet("agents"),
+        ResultSet("clients"),
+    ),
+)
+
+AGENT_DASHBOARD = ProcedureShape(
+    "get_agent_dashboard",
+    (
+        ResultSet("listings"),
+        ResultSet("totals", one=True),
+        ResultSet("upcoming_showings"),
+    ),
+)
+
+
+# Result cache dependencies. Only the read procedures listed here are served
+# from the cache; each maps to every table it selects from. (Per-property
+# image lists have their own cache: see image_lists.)
+
+_PROPERTY_TABLES = ("Property", "ResidentialProperty", "CommercialProperty")
+
+READ_DEPENDENCIES = {
+    "get_all_agent_listings_with_details": _PROPERTY_TABLES
+    + ("AgentListing", "Agent", "PropertyImages"),
+    "get_agent_listings_page": _PROPERTY_TABLES
+    + ("AgentListing", "Agent", "PropertyImages"),
+    "get_all_properties": ("Property",),
+    "get_all_properties_with_images": ("Property", "PropertyImages"),
+    "get_all_properties_with_details": _PROPERTY_TABLES + ("AgentListing", "Agent"),
+    "get_property_details": _PROPERTY_TABLES + ("AgentListing", "Agent"),
+    "get_property_details_with_images": _PROPERTY_TABLES + ("PropertyImages",),
+    "get_property_detail_page": _PROPERTY_TABLES
+    + ("AgentListing", "Agent", "PropertyImages"),
+    "get_property_form_page": _PROPERTY_TABLES
+    + ("AgentListing", "Agent", "Client", "PropertyImages"),
+    "get_property_stats": ("Property",),
+    # Reads ListingsVersion, which triggers bump on every Property write
+    "get_listings_version": ("Property",),
+    "search_properties": _PROPERTY_TABLES
+    + ("AgentListing", "Agent", "PropertyImages"),
+    "search_properties_count": _PROPERTY_TABLES,
+    "admin_properties_page": ("Property",),
+    "admin_properties_count": ("Property",),
+    "admin_clients_page": ("Client",),
+    "admin_clients_count": ("Client",),
+    "admin_agents_page": ("Agent",),
+    "admin_agents_count": ("Agent",),
+    "get_property_version": ("Property",),
+    "get_all_clients": ("Client",),
+    "get_client_details": ("Client",),
+    "get_all_agents": ("Agent",),
+    "get_admin_dashboard_stats": ("Agent", "Property", "Transaction"),
+}
+
+# Tables each write procedure modifies, including rows removed through
+# ON DELETE CASCADE and Property rows whose updated_at it bumps. Running one
+# invalidates every cached read of them.
+WRITE_TABLES = {
+    "create_property": _PROPERTY_TABLES,
+    "update_property": _PROPERTY_TABLES,
+    "update_residential_property": ("ResidentialProperty", "Property"),
+    "update_commercial_property": ("CommercialProperty", "Property"),
+    "set_property_location": ("Property",),
+    "delete_property": _PROPERTY_TABLES + ("AgentListing", "PropertyImages"),
+    "create_agent_listing": ("AgentListing",),
+    "update_agent_listing": ("AgentListing", "Property"),
+    "add_property_image": ("PropertyImages", "Property"),
+    "add_stored_image": ("ImageBlob", "PropertyImages", "Property"),
+    "add_stored_images": ("ImageBlob", "PropertyImages", "Property"),
+    "set_image_derivatives": ("PropertyImages", "Property"),
+    "set_primary_image": ("PropertyImages", "Property"),
+    "delete_property_image": ("ImageBlob", "PropertyImages", "Property"),
+    "create_client": ("Client",),
+    "update_client": ("Client",),
+    "update_client_types": ("Client", "ClientRoles"),
+    "delete_client": ("Client",),
+    "create_agent": ("Agent",),
+    "update_agent": ("Agent", "Property"),
+    "delete_agent": ("Agent", "AgentShowing", "User"),
+}
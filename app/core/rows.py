@@ -0,0 +1,89 @@
+# app/core/rows.py
+from functools import lru_cache
+
+try:
+    # The C accessor namedtuple uses; reads the slot without going through
+    # Record.__getitem__
+    from _collections import _tuplegetter
+except ImportError:
+
+    def _tuplegetter(index, doc):
+        return property(lambda self: tuple.__getitem__(self, index), doc=doc)
+
+
+ROW_DICT = "dict"
+ROW_RECORD = "record"
+ROW_MODES = (ROW_DICT, ROW_RECORD)
+
+
+class Record(tuple):
+    """Compact, read-only result row.
+
+    Values are stored in a plain tuple. Column names live once on the
+    per-result-set subclass built by record_type, so a row costs one tuple
+    instead of a dict. Columns read as attributes (what Jinja's
+    ``row.column`` uses) and by name like a dict row.
+    """
+
+    __slots__ = ()
+    _fields = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                key = self._index[key]
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self._fields, self)
+
+    def _asdict(self):
+        return dict(zip(self._fields, self))
+
+    def __repr__(self):
+        return f"Record({self._asdict()!r})"
+
+
+_RESERVED = frozenset(
+    ("get", "keys", "values", "items", "_asdict", "_fields", "_index")
+)
+
+
+@lru_cache(maxsize=256)
+def record_type(columns: tuple) -> type:
+    """Record subclass for one result-set schema, shared by all its rows.
+
+    Each column becomes a class-level property, so attribute reads never go
+    through __getattr__ and columns named like tuple methods (count, index)
+    still resolve to the column. Columns that clash with the Record API
+    (get, keys, ...) are only reachable by name. Duplicate names keep the
+    last column, as a dictionary cursor does.
+    """
+    index = {name: position for position, name in enumerate(columns)}
+    namespace = {"__slots__": (), "_fields": tuple(columns), "_index": index}
+    for name, position in index.items():
+        if name not in _RESERVED and not name.startswith("__"):
+            namespace[name] = _tuplegetter(position, name)
+    return type("Record", (Record,), namespace)
+
+
+def make_records(columns, rows) -> list:
+    """Wrap raw row tuples in the shared Record type for their columns"""
+    cls = record_type(tuple(columns))
+    return [cls(row) for row in rows]
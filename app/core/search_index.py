@@ -0,0 +1,752 @@
+# app/core/search_index.py
+import heapq
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from typing import NamedTuple, Optional
+from .config import settings
+from .database import commit, db_executor, execute_procedure_sync, on_commit, pool
+from .fuzzy import NgramIndex
+from .geo import BoundingBox, GeoGrid
+from .logging_config import logger
+from .rows import ROW_RECORD
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+# Rebuild the in-memory structures once this share of ordinals are holes
+# left by removed documents
+COMPACT_RATIO = 0.5
+
+
+def tokenize(text) -> list:
+    """Lowercase alphanumeric words, in order"""
+    if not text:
+        return []
+    return TOKEN.findall(str(text).lower())
+
+
+class Postings:
+    """Token -> set of document ordinals for one text field, with a sorted
+    vocabulary so the word being typed can match as a prefix, and a
+    trigram index of the same words for typo-tolerant matching"""
+
+    def __init__(self):
+        self._postings = {}
+        self._vocabulary = []
+        self.fuzzy = NgramIndex()
+
+    def __len__(self):
+        return len(self._postings)
+
+    def add(self, tokens, ordinal: int, sort: bool = True):
+        """Post ordinal under tokens. Bulk loads pass sort=False and call
+        sort_vocabulary() once at the end."""
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = set()
+                self.fuzzy.add(token)
+                if sort:
+                    insort(self._vocabulary, token)
+            posting.add(ordinal)
+
+    def sort_vocabulary(self):
+        self._vocabulary = sorted(self._postings)
+
+    def discard(self, tokens, ordinal: int):
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.discard(ordinal)
+            if not posting:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+                self.fuzzy.discard(token)
+
+    def _prefixed(self, prefix: str) -> set:
+        start = bisect_left(self._vocabulary, prefix)
+        matches = set()
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matches |= self._postings[token]
+        return matches
+
+    def match(self, tokens: list) -> set:
+        """Ordinals containing every token; the last one may be a prefix"""
+        postings = [self._postings.get(token, ()) for token in tokens[:-1]]
+        postings.append(self._prefixed(tokens[-1]))
+        postings.sort(key=len)
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            if not matches:
+                break
+            matches &= posting if isinstance(posting, set) else set(posting)
+        return matches
+
+    def fuzzy_match(self, tokens: list, deadline: Optional[float] = None) -> tuple:
+        """Like match, but each word also matches vocabulary words a few
+        typos away. Returns ({ordinal: total edits}, corrected words)."""
+        scores = None
+        corrected = []
+        for position, token in enumerate(tokens):
+            best = {}
+            if position == len(tokens) - 1:
+                # Still being typed: plain prefix matches cost nothing
+                best = dict.fromkeys(self._prefixed(token), 0)
+            typed_prefix = bool(best)
+            similar = self.fuzzy.similar(
+                token, limit=settings.FUZZY_TERMS_PER_WORD, deadline=deadline
+            )
+            for term, distance in similar:
+                for ordinal in self._postings[term]:
+                    if distance < best.get(ordinal, distance + 1):
+                        best[ordinal] = distance
+            corrected.append(similar[0].term if similar and not typed_prefix else token)
+            if scores is None:
+                scores = best
+            else:
+                scores = {
+                    ordinal: edits + best[ordinal]
+                    for ordinal, edits in scores.items()
+                    if ordinal in best
+                }
+            if not scores:
+                break
+        return scores or {}, corrected
+
+
+class _Entry(NamedTuple):
+    doc: object
+    key: tuple  # (price, property_id), the result order
+    status: Optional[str]
+    property_type: Optional[str]
+    address_tokens: frozenset
+    agent_tokens: frozenset
+
+
+class SearchResult(NamedTuple):
+    total: int
+    listings: list
+    has_more: bool
+    # Fuzzy searches: field -> the query words each typo was matched to
+    corrections: Optional[dict] = None
+    # Radius searches: km from the centre, per listing
+    distances: Optional[list] = None
+
+
+# Price bounds that let every listing through _passes
+ANY_PRICE = ((float("-inf"),), (float("inf"),))
+
+
+def _sort_key(doc) -> tuple:
+    return (float(doc["price"] or 0), doc["property_id"])
+
+
+def _make_entry(doc) -> _Entry:
+    agent_tokens = set()
+    for name in (doc["agent_names"] or doc["agent_name"] or "").split("|"):
+        agent_tokens.update(tokenize(name))
+    return _Entry(
+        doc,
+        _sort_key(doc),
+        doc["status"],
+        doc["property_type"],
+        frozenset(tokenize(doc["property_address"])),
+        frozenset(agent_tokens),
+    )
+
+
+class _IndexState:
+    """The index structures. Not thread-safe on its own; ListingIndex
+    guards it and swaps in a fresh one on rebuild.
+
+    Documents get dense ordinals so status and type membership can be kept
+    as int bitsets. Address and agent-name words map to posting sets.
+    Prices are kept as sorted (price, property_id) arrays per status/type
+    combination, so a filter-only search is a pair of bisects and a slice.
+    Geocoded documents are also bucketed in a lat/lng grid for area search.
+    """
+
+    def __init__(self):
+        self.entries = []  # ordinal -> _Entry, None for removed documents
+        self.ordinals = {}  # property_id -> ordinal
+        self.address = Postings()
+        self.agents = Postings()
+        self.status_bits = {}
+        self.type_bits = {}
+        self.by_price = {}  # (status, property_type), None = any -> sorted keys
+        self._masks = {}  # (status, property_type) -> bitset bytes
+        self.geo = GeoGrid(settings.GEO_CELL_DEGREES)  # ordinal -> position
+
+    @property
+    def holes(self) -> int:
+        return len(self.entries) - len(self.ordinals)
+
+    def _locate(self, doc, ordinal: int):
+        if doc["latitude"] is not None and doc["longitude"] is not None:
+            self.geo.add(ordinal, float(doc["latitude"]), float(doc["longitude"]))
+
+    def _price_lists(self, entry: _Entry):
+        combinations = {
+            (status, property_type)
+            for status in (None, entry.status)
+            for property_type in (None, entry.property_type)
+        }
+        for combination in combinations:
+            yield self.by_price.setdefault(combination, [])
+
+    @classmethod
+    def from_docs(cls, docs) -> "_IndexState":
+        """Bulk build. Bitsets are assembled from byte arrays and the price
+        arrays sorted once, rather than paying for an insert per document."""
+        state = cls()
+        status_ordinals = {}
+        type_ordinals = {}
+        for doc in docs:
+            if doc["property_id"] in state.ordinals:
+                continue
+            entry = _make_entry(doc)
+            ordinal = len(state.entries)
+            state.entries.append(entry)
+            state.ordinals[doc["property_id"]] = ordinal
+            status_ordinals.setdefault(entry.status, []).append(ordinal)
+            type_ordinals.setdefault(entry.property_type, []).append(ordinal)
+            state.address.add(entry.address_tokens, ordinal, sort=False)
+            state.agents.add(entry.agent_tokens, ordinal, sort=False)
+            state._locate(doc, ordinal)
+            for keys in state._price_lists(entry):
+                keys.append(entry.key)
+
+        state.address.sort_vocabulary()
+        state.agents.sort_vocabulary()
+        for keys in state.by_price.values():
+            keys.sort()
+        size = len(state.entries) // 8 + 1
+        for bitsets, grouped in (
+            (state.status_bits, status_ordinals),
+            (state.type_bits, type_ordinals),
+        ):
+            for value, ordinals in grouped.items():
+                bits = bytearray(size)
+                for ordinal in ordinals:
+                    bits[ordinal >> 3] |= 1 << (ordinal & 7)
+                bitsets[value] = int.from_bytes(bits, "little")
+        return state
+
+    def add(self, doc):
+        property_id = doc["property_id"]
+        if property_id in self.ordinals:
+            self.remove(property_id)
+
+        entry = _make_entry(doc)
+        ordinal = len(self.entries)
+        self.entries.append(entry)
+        self.ordinals[property_id] = ordinal
+
+        bit = 1 << ordinal
+        self.status_bits[entry.status] = self.status_bits.get(entry.status, 0) | bit
+        self.type_bits[entry.property_type] = (
+            self.type_bits.get(entry.property_type, 0) | bit
+        )
+        self.address.add(entry.address_tokens, ordinal)
+        self.agents.add(entry.agent_tokens, ordinal)
+        self._locate(doc, ordinal)
+        for keys in self._price_lists(entry):
+            insort(keys, entry.key)
+        self._masks.clear()
+
+    def remove(self, property_id: int) -> bool:
+        ordinal = self.ordinals.pop(property_id, None)
+        if ordinal is None:
+            return False
+        entry = self.entries[ordinal]
+        self.entries[ordinal] = None
+
+        bit = 1 << ordinal
+        self.status_bits[entry.status] &= ~bit
+        self.type_bits[entry.property_type] &= ~bit
+        self.address.discard(entry.address_tokens, ordinal)
+        self.agents.discard(entry.agent_tokens, ordinal)
+        self.geo.discard(ordinal)
+        for keys in self._price_lists(entry):
+            del keys[bisect_left(keys, entry.key)]
+        self._masks.clear()
+        return True
+
+    def _mask(self, status, property_type) -> Optional[bytes]:
+        """Filter bitset as bytes, for O(1) membership tests; None = any"""
+        if status is None and property_type is None:
+            return None
+        cached = self._masks.get((status, property_type))
+        if cached is None:
+            bits = -1
+            if status is not None:
+                bits &= self.status_bits.get(status, 0)
+            if property_type is not None:
+                bits &= self.type_bits.get(property_type, 0)
+            cached = bits.to_bytes(len(self.entries) // 8 + 1, "little")
+            self._masks[(status, property_type)] = cached
+        return cached
+
+    def _passes(self, ordinal, mask, low, high) -> bool:
+        if mask is not None and not mask[ordinal >> 3] >> (ordinal & 7) & 1:
+            return False
+        return low <= self.entries[ordinal].key <= high
+
+    def search(
+        self, query, agent, status, property_type, min_price, max_price, after,
+        limit, fuzzy=False, deadline=None,
+    ) -> SearchResult:
+        low = (float("-inf"),) if min_price is None else (float(min_price),)
+        high = (float("inf"),) if max_price is None else (float(max_price), float("inf"))
+
+        tokens = tokenize(query)
+        agent_tokens = tokenize(agent)
+        if not tokens and not agent_tokens:
+            # Filters only: the matching keys are one contiguous slice
+            keys = self.by_price.get((status, property_type), [])
+            start = bisect_left(keys, low)
+            end = bisect_right(keys, high)
+            total = max(0, end - start)
+            if after is not None:
+                end = min(end, bisect_left(keys, after))
+            page = keys[max(start, end - limit):end][::-1]
+            has_more = end - start > limit
+        elif fuzzy:
+            return self._fuzzy_search(
+                tokens, agent_tokens, self._mask(status, property_type),
+                low, high, limit, deadline,
+            )
+        else:
+            candidates = self._text_matches(tokens, agent_tokens)
+            mask = self._mask(status, property_type)
+            keys = [
+                self.entries[ordinal].key
+                for ordinal in candidates
+                if self._passes(ordinal, mask, low, high)
+            ]
+            total = len(keys)
+            keys.sort(reverse=True)
+            if after is not None:
+                keys = [key for key in keys if key < after]
+            page = keys[:limit]
+            has_more = len(keys) > limit
+
+        listings = [self.entries[self.ordinals[key[1]]].doc for key in page]
+        return SearchResult(total, listings, has_more)
+
+    def within_area(self, box, status, property_type, limit) -> SearchResult:
+        mask = self._mask(status, property_type)
+        keys = [
+            self.entries[ordinal].key
+            for ordinal in self.geo.within(box)
+            if self._passes(ordinal, mask, *ANY_PRICE)
+        ]
+        page = heapq.nlargest(limit, keys)
+        listings = [self.entries[self.ordinals[key[1]]].doc for key in page]
+        return SearchResult(len(keys), listings, len(keys) > limit)
+
+    def nearby(
+        self, latitude, longitude, radius_km, status, property_type, limit
+    ) -> SearchResult:
+        mask = self._mask(status, property_type)
+        ranked = [
+            (distance, self.entries[ordinal].key[1], ordinal)
+            for distance, ordinal in self.geo.nearby(latitude, longitude, radius_km)
+            if self._passes(ordinal, mask, *ANY_PRICE)
+        ]
+        page = heapq.nsmallest(limit, ranked)
+        return SearchResult(
+            len(ranked),
+            [self.entries[ordinal].doc for _, _, ordinal in page],
+            len(ranked) > limit,
+            distances=[round(distance, 2) for distance, _, _ in page],
+        )
+
+    def _text_matches(self, tokens, agent_tokens) -> set:
+        """Ordinals whose address and agent words match every query word"""
+        candidates = None
+        for postings, words in ((self.address, tokens), (self.agents, agent_tokens)):
+            if words:
+                matched = postings.match(words)
+                candidates = matched if candidates is None else candidates & matched
+        return candidates
+
+    def _fuzzy_scores(self, tokens, agent_tokens, deadline) -> tuple:
+        """Typo-tolerant _text_matches: ({ordinal: total edits}, the query
+        words each field was matched to)"""
+        scores = None
+        corrections = {}
+        for field, postings, words in (
+            ("query", self.address, tokens),
+            ("agent_name", self.agents, agent_tokens),
+        ):
+            if not words:
+                continue
+            matched, corrected = postings.fuzzy_match(words, deadline)
+            corrections[field] = " ".join(corrected)
+            if scores is None:
+                scores = matched
+            else:
+                scores = {
+                    ordinal: edits + matched[ordinal]
+                    for ordinal, edits in scores.items()
+                    if ordinal in matched
+                }
+        return scores, corrections
+
+    def text_matches(self, query, agent, fuzzy=False, deadline=None) -> Optional[set]:
+        """Ordinals matching the text part of a search, None if it has none"""
+        tokens = tokenize(query)
+        agent_tokens = tokenize(agent)
+        if not tokens and not agent_tokens:
+            return None
+        if fuzzy:
+            return set(self._fuzzy_scores(tokens, agent_tokens, deadline)[0])
+        return self._text_matches(tokens, agent_tokens)
+
+    def _fuzzy_search(
+        self, tokens, agent_tokens, mask, low, high, limit, deadline
+    ) -> SearchResult:
+        """Typo-tolerant text match, ranked by total edits and then price.
+        Returns one ranked page, with the query as it was understood."""
+        scores, corrections = self._fuzzy_scores(tokens, agent_tokens, deadline)
+        ranked = []
+        for ordinal, edits in scores.items():
+            if self._passes(ordinal, mask, low, high):
+                price, property_id = self.entries[ordinal].key
+                ranked.append((edits, -price, -property_id, ordinal))
+        listings = [
+            self.entries[rank[-1]].doc for rank in heapq.nsmallest(limit, ranked)
+        ]
+        return SearchResult(len(ranked), listings, False, corrections)
+
+
+class ListingIndex:
+    """In-process inverted index over property listings for /search.
+
+    Built from get_search_documents at startup and kept current one
+    property at a time as write routes commit (refresh_listing); other
+    processes' writes are picked up by a periodic version probe
+    (ensure_listing_index). Searches answer from memory with the cached
+    card columns, without a database round trip.
+    """
+
+    def __init__(self):
+        self._state = _IndexState()
+        self._lock = threading.Lock()
+        self._build_lock = threading.RLock()
+        self.ready = False
+        self.version = 0  # bumped on every change, for derived snapshots
+        # Writes made while a rebuild runs, replayed onto its structures
+        self._journal = None
+        # get_listings_version as of the last load from the database, and
+        # when this process last compared it with the database's
+        self.db_version = None
+        self._checked_at = 0.0
+
+        self._builds = 0
+        self._last_build_ms = 0.0
+        self._updates = 0
+        self._searches = 0
+        self._search_ms = 0.0
+
+    def rebuild(self, load) -> int:
+        """Replace the index with one built from the documents load()
+        returns; returns how many there were. Searches keep using the old
+        structures until the swap. Writes that land meanwhile are replayed
+        onto the new ones before it, so an update committed while load()
+        was reading isn't lost. One rebuild runs at a time."""
+        with self._build_lock:
+            started = time.perf_counter()
+            with self._lock:
+                self._journal = []
+            try:
+                docs = load()
+                state = _IndexState.from_docs(docs)
+                with self._lock:
+                    for apply, arg in self._journal:
+                        apply(state, arg)
+                    self._state = state
+                    self.ready = True
+                    self.version += 1
+                    self._builds += 1
+                    self._last_build_ms = (time.perf_counter() - started) * 1000
+            finally:
+                with self._lock:
+                    self._journal = None
+        return len(docs)
+
+    def needs_check(self) -> bool:
+        """Whether the index is unbuilt or due a freshness probe. Cheap
+        enough to call on the event loop."""
+        return (
+            not self.ready
+            or time.monotonic() - self._checked_at >= settings.SEARCH_INDEX_CHECK_SECONDS
+        )
+
+    def _claim_check(self) -> bool:
+        # One caller per interval probes; the rest keep searching
+        with self._lock:
+            if not self.needs_check():
+                return False
+            self._checked_at = time.monotonic()
+            return True
+
+    def upsert(self, doc):
+        with self._lock:
+            self._state.add(doc)
+            if self._journal is not None:
+                self._journal.append((_IndexState.add, doc))
+            self.version += 1
+            self._updates += 1
+            compact = self._needs_compaction()
+        if compact:
+            self._compact()
+
+    def remove(self, property_id: int):
+        with self._lock:
+            if self._journal is not None:
+                # The rebuild may have read it even if the live state lacks it
+                self._journal.append((_IndexState.remove, property_id))
+            if not self._state.remove(property_id):
+                return
+            self.version += 1
+            self._updates += 1
+            compact = self._needs_compaction()
+        if compact:
+            self._compact()
+
+    def _needs_compaction(self) -> bool:
+        # Ordinals are never reused, so frequent updates leave holes that
+        # widen every bitset; re-pack once they dominate
+        state = self._state
+        return (
+            self._journal is None
+            and state.holes > 64
+            and state.holes > len(state.entries) * COMPACT_RATIO
+        )
+
+    def _documents(self) -> list:
+        with self._lock:
+            return [entry.doc for entry in self._state.entries if entry is not None]
+
+    def _compact(self):
+        """Re-pack the current documents as a rebuild, so the structures are
+        built outside the lock and searches only wait for the swap"""
+        if not self._build_lock.acquire(blocking=False):
+            return  # a rebuild is already under way and re-packs anyway
+        try:
+            self.rebuild(self._documents)
+        finally:
+            self._build_lock.release()
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        agent_name: Optional[str] = None,
+        status: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        after: Optional[tuple] = None,
+        limit: int = 24,
+        fuzzy: bool = False,
+    ) -> SearchResult:
+        """Listings matching every given filter, most expensive first.
+
+        query matches address words and agent_name matches listing agents'
+        names; all words must match and the last may be partly typed.
+        after is the (price, property_id) of the previous page's last result.
+
+        fuzzy also accepts words a few typos off and ranks the closest
+        matches first, as a single page. Edit distances are only computed
+        within FUZZY_SEARCH_BUDGET_MS; past it the best matches so far win.
+        """
+        started = time.perf_counter()
+        deadline = started + settings.FUZZY_SEARCH_BUDGET_MS / 1000
+        with self._lock:
+            result = self._state.search(
+                query, agent_name, status, property_type,
+                min_price, max_price, after, limit, fuzzy, deadline,
+            )
+            self._searches += 1
+            self._search_ms += (time.perf_counter() - started) * 1000
+        return result
+
+    def within_area(
+        self,
+        box: BoundingBox,
+        status: Optional[str] = None,
+        property_type: Optional[str] = None,
+        limit: int = 24,
+    ) -> SearchResult:
+        """Geocoded listings inside box, most expensive first. Only the
+        grid cells the box overlaps are visited."""
+        started = time.perf_counter()
+        with self._lock:
+            result = self._state.within_area(box, status, property_type, limit)
+            self._searches += 1
+            self._search_ms += (time.perf_counter() - started) * 1000
+        return result
+
+    def nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        status: Optional[str] = None,
+        property_type: Optional[str] = None,
+        limit: int = 24,
+    ) -> SearchResult:
+        """Geocoded listings within radius_km of a point, nearest first,
+        with their distances. Candidates come from the grid cells under
+        the circle's bounding box."""
+        started = time.perf_counter()
+        with self._lock:
+            result = self._state.nearby(
+                latitude, longitude, radius_km, status, property_type, limit
+            )
+            self._searches += 1
+            self._search_ms += (time.perf_counter() - started) * 1000
+        return result
+
+    def facet_source(
+        self,
+        query: Optional[str] = None,
+        agent_name: Optional[str] = None,
+        fuzzy: bool = False,
+        known_version: Optional[int] = None,
+    ) -> tuple:
+        """What a columnar snapshot needs to count facets for a search,
+        read together: (version, entries, text matches).
+
+        entries are the documents by ordinal (None for holes), or None
+        when known_version is still current. text matches are the
+        ordinals the query and agent_name words match, None without any.
+        """
+        deadline = time.perf_counter() + settings.FUZZY_SEARCH_BUDGET_MS / 1000
+        with self._lock:
+            state = self._state
+            matches = state.text_matches(query, agent_name, fuzzy, deadline)
+            entries = None
+            if known_version != self.version:
+                entries = [entry and entry.doc for entry in state.entries]
+            return self.version, entries, matches
+
+    def stats(self) -> dict:
+        with self._lock:
+            state = self._state
+            return {
+                "ready": self.ready,
+                "documents": len(state.ordinals),
+                "ordinals": len(state.entries),
+                "address_tokens": len(state.address),
+                "agent_tokens": len(state.agents),
+                "located": len(state.geo),
+                "builds": self._builds,
+                "last_build_ms": round(self._last_build_ms, 2),
+                "updates": self._updates,
+                "searches": self._searches,
+                "avg_search_ms": (
+                    round(self._search_ms / self._searches, 4) if self._searches else 0.0
+                ),
+            }
+
+
+listing_index = ListingIndex()
+
+
+def _listings_version(conn):
+    # Bypass the result cache: it only hears about this process's writes
+    rows = execute_procedure_sync(conn, "get_listings_version", use_cache=False)
+    return rows[0]["version"] if rows else None
+
+
+def load_listing_index(conn=None):
+    """(Re)build the index from the database, on conn or a connection of
+    its own. Writes committed while it reads are kept (ListingIndex.rebuild)."""
+    if conn is None:
+        conn = pool.checkout()
+        try:
+            load_listing_index(conn)
+            commit(conn)
+        finally:
+            pool.checkin(conn)
+        return
+
+    version = None
+
+    def load():
+        nonlocal version
+        # Read first, so the documents come from the same snapshot
+        version = _listings_version(conn)
+        return execute_procedure_sync(
+            conn, "get_search_documents", row_mode=ROW_RECORD
+        )
+
+    with listing_index._build_lock:
+        count = listing_index.rebuild(load)
+        listing_index.db_version = version
+    logger.info(f"Search index built with {count} listings.")
+
+
+def _reload_stale_index():
+    if not listing_index._build_lock.acquire(blocking=False):
+        return  # already rebuilding
+    try:
+        load_listing_index()
+    except Exception as e:
+        logger.error(f"Rebuilding the search index failed: {e}", exc_info=True)
+    finally:
+        listing_index._build_lock.release()
+
+
+def ensure_listing_index():
+    """Build the index if startup couldn't (e.g. the database was down),
+    and rebuild it once listings changed in another process. Those changes
+    are found by comparing get_listings_version, at most every
+    SEARCH_INDEX_CHECK_SECONDS; the rebuild runs on the db executor while
+    searches carry on with the current index. This process's own writes
+    reach the index as they commit (refresh_listing), and only cost a
+    rebuild at the next probe."""
+    if not listing_index.ready:
+        with listing_index._build_lock:
+            if not listing_index.ready:
+                load_listing_index()
+        return
+    if not listing_index._claim_check():
+        return
+    conn = pool.checkout()
+    try:
+        version = _listings_version(conn)
+        commit(conn)
+    finally:
+        pool.checkin(conn)
+    if version != listing_index.db_version:
+        db_executor.submit(_reload_stale_index)
+
+
+def _reindex_listing(conn, property_id: int):
+    rows = execute_procedure_sync(
+        conn, "get_search_document", (property_id,), row_mode=ROW_RECORD
+    )
+    if rows:
+        listing_index.upsert(rows[0])
+    else:
+        listing_index.remove(property_id)
+
+
+def refresh_listing(conn, property_id: int):
+    """Re-index one property once conn's transaction commits. Works for
+    creates, updates and deletes alike."""
+    on_commit(conn, lambda c: _reindex_listing(c, property_id))
+
+
+def rebuild_listing_index(conn):
+    """Rebuild everything once conn's transaction commits, for writes that
+    touch an unknown set of listings (e.g. renaming an agent)"""
+    on_commit(conn, load_listing_index)
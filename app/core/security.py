@@ -40,7 +40,7 @@ async def get_current_user(
         
         # Handle admin from environment
         if username == os.getenv("ADMIN_USERNAME"):
-            admin_role = execute_procedure(conn, 'get_or_create_admin_role')
+            admin_role = await execute_procedure(conn, 'get_or_create_admin_role')
             if admin_role:
                 return {
                     "username": username,
@@ -50,7 +50,7 @@ async def get_current_user(
                 }
 
         # Get database user
-        user = execute_procedure(conn, 'get_user_by_username', (username,))
+        user = await execute_procedure(conn, 'get_user_by_username', (username,))
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -77,7 +77,7 @@ async def get_current_admin(
             return current_user
         
         # Otherwise check database role
-        role = execute_procedure(conn, 'check_user_role', (current_user["username"], "admin"))
+        role = await execute_procedure(conn, 'check_user_role', (current_user["username"], "admin"))
         if not role or not role[0].get("is_role"):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -99,12 +99,12 @@ async def get_current_agent(
     """Get current agent user"""
     try:
         # Check agent role
-        role = execute_procedure(conn, 'check_user_role', (current_user["username"], "agent"))
+        role = await execute_procedure(conn, 'check_user_role', (current_user["username"], "agent"))
         if not role or not role[0].get("is_role"):
             return RedirectResponse(url="/login", status_code=303)
 
         # Get agent details
-        agent_details = execute_procedure(conn, 'get_agent_details', (current_user["user_id"],))
+        agent_details = await execute_procedure(conn, 'get_agent_details', (current_user["user_id"],))
         if not agent_details:
             return RedirectResponse(url="/login", status_code=303)
 
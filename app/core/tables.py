@@ -0,0 +1,279 @@
+# app/core/tables.py
+from decimal import Decimal, InvalidOperation
+from typing import NamedTuple, Optional
+from urllib.parse import urlencode
+from .config import settings
+from .database import execute_procedure
+from .pagination import InvalidCursorError, decode_cursor, encode_cursor, split_page
+from .rows import ROW_RECORD
+
+FILTER_EXACT = "exact"
+FILTER_PREFIX = "prefix"
+FILTER_DECIMAL = "decimal"
+
+
+class SortKey(NamedTuple):
+    """A sortable column. field is the row column the cursor is taken from;
+    the page procedure maps the key to the same column."""
+
+    field: str
+    label: str
+    desc: bool = False  # direction used when the column is first clicked
+
+
+class TableSpec(NamedTuple):
+    """A server-side paginated admin table backed by a keyset procedure"""
+
+    name: str  # URL segment under /admin and element id prefix
+    page_procedure: str
+    count_procedure: str
+    id_field: str
+    sort_keys: dict
+    default_sort: str
+    filters: dict  # query parameter -> FILTER_EXACT or FILTER_PREFIX
+
+    @property
+    def url(self) -> str:
+        return f"/admin/{self.name}"
+
+    @property
+    def element_id(self) -> str:
+        return f"{self.name}-table"
+
+
+def _decimal(value: str) -> Decimal:
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Invalid number: {value}") from None
+    if not number.is_finite():
+        raise ValueError(f"Invalid number: {value}")
+    return number
+
+
+def _like_prefix(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+class TableQuery:
+    """Sort, direction, filters and keyset position for one table request.
+
+    Built from query parameters for the first page, or from the cursor of
+    the previous page, which carries the whole query so later pages need
+    nothing else.
+    """
+
+    def __init__(self, spec: TableSpec, sort: str, desc: bool, filters: dict,
+                 after_value=None, after_id: Optional[int] = None):
+        self.spec = spec
+        self.sort = sort
+        self.desc = desc
+        self.filters = filters
+        self.after_value = after_value
+        self.after_id = after_id
+
+    @classmethod
+    def from_params(cls, spec: TableSpec, sort: Optional[str] = None,
+                    direction: Optional[str] = None, **filters):
+        """Validate request parameters against the spec's whitelist"""
+        sort = sort or spec.default_sort
+        if sort not in spec.sort_keys:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if direction not in (None, "", "asc", "desc"):
+            raise ValueError(f"Unknown sort direction: {direction}")
+        desc = spec.sort_keys[sort].desc if not direction else direction == "desc"
+        values = {
+            name: filters[name].strip()
+            for name in spec.filters
+            if filters.get(name) and filters[name].strip()
+        }
+        for name, value in values.items():
+            if spec.filters[name] == FILTER_DECIMAL:
+                _decimal(value)
+        return cls(spec, sort, desc, values)
+
+    @classmethod
+    def from_cursor(cls, spec: TableSpec, token: str):
+        position = decode_cursor(token)
+        try:
+            query = cls.from_params(
+                spec,
+                position["sort"],
+                "desc" if position["desc"] else "asc",
+                **position["filters"],
+            )
+            query.after_value = position["value"]
+            query.after_id = int(position["id"])
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise InvalidCursorError(f"Invalid cursor: {e}") from None
+        return query
+
+    def _filter_params(self) -> tuple:
+        params = []
+        for name, kind in self.spec.filters.items():
+            value = self.filters.get(name)
+            if value is not None and kind == FILTER_PREFIX:
+                value = _like_prefix(value)
+            elif value is not None and kind == FILTER_DECIMAL:
+                value = _decimal(value)
+            params.append(value)
+        return tuple(params)
+
+    def page_params(self, limit: int) -> tuple:
+        after_value = None if self.after_value is None else str(self.after_value)
+        return (
+            self.sort, self.desc, after_value, self.after_id, limit,
+        ) + self._filter_params()
+
+    def count_params(self, cap: int) -> tuple:
+        return self._filter_params() + (cap,)
+
+    def cursor_after(self, row) -> str:
+        return encode_cursor({
+            "sort": self.sort,
+            "desc": self.desc,
+            "filters": self.filters,
+            "value": row[self.spec.sort_keys[self.sort].field],
+            "id": row[self.spec.id_field],
+        })
+
+    # Template helpers
+
+    def url(self, **overrides) -> str:
+        """Table URL for this query with some parameters replaced"""
+        params = {
+            "sort": self.sort,
+            "direction": "desc" if self.desc else "asc",
+            **self.filters,
+            **overrides,
+        }
+        query = urlencode({k: v for k, v in params.items() if v not in (None, "")})
+        return f"{self.spec.url}/table?{query}"
+
+    def sort_url(self, key: str) -> str:
+        """Clicking the current column flips its direction; any other
+        column starts in its own default direction"""
+        if key == self.sort:
+            return self.url(direction="asc" if self.desc else "desc")
+        return self.url(sort=key, direction=None)
+
+    def sort_indicator(self, key: str) -> str:
+        if key != self.sort:
+            return ""
+        return "▼" if self.desc else "▲"
+
+    def rows_url(self, cursor: str) -> str:
+        return f"{self.spec.url}/rows?{urlencode({'cursor': cursor})}"
+
+
+class PropertySearchQuery(TableQuery):
+    """TableQuery for the public /properties search, where one route
+    serves the page, its refreshes and the pages after a cursor"""
+
+    def url(self, **overrides) -> str:
+        params = {
+            "sort": self.sort,
+            "direction": "desc" if self.desc else "asc",
+            **self.filters,
+            **overrides,
+        }
+        query = urlencode({k: v for k, v in params.items() if v not in (None, "")})
+        return f"/properties?{query}"
+
+    def rows_url(self, cursor: str) -> str:
+        return f"/properties?{urlencode({'cursor': cursor})}"
+
+
+class TablePage(NamedTuple):
+    query: TableQuery
+    rows: list
+    next_cursor: Optional[str]
+
+
+async def fetch_table_page(conn, query: TableQuery, page_size: int = None) -> TablePage:
+    """One keyset page of rows, plus the cursor for the next (None if last)"""
+    page_size = page_size or settings.ADMIN_TABLE_PAGE_SIZE
+    rows = await execute_procedure(
+        conn,
+        query.spec.page_procedure,
+        query.page_params(page_size + 1),
+        row_mode=ROW_RECORD,
+    )
+    rows, has_more = split_page(rows, page_size, query.spec.id_field)
+    next_cursor = query.cursor_after(rows[-1]) if has_more else None
+    return TablePage(query, rows, next_cursor)
+
+
+async def fetch_table_total(conn, query: TableQuery) -> dict:
+    """Header total: an InnoDB estimate when unfiltered, otherwise a count
+    capped at ADMIN_TABLE_COUNT_CAP. Only run when the table (re)loads, not
+    on page flips."""
+    rows = await execute_procedure(
+        conn,
+        query.spec.count_procedure,
+        query.count_params(settings.ADMIN_TABLE_COUNT_CAP),
+    )
+    if not rows:
+        return {"total": 0, "precision": "exact"}
+    return {"total": int(rows[0]["total"] or 0), "precision": rows[0]["precision"]}
+
+
+PROPERTIES_TABLE = TableSpec(
+    name="properties",
+    page_procedure="admin_properties_page",
+    count_procedure="admin_properties_count",
+    id_field="property_id",
+    sort_keys={
+        "created": SortKey("created_at", "Added", desc=True),
+        "price": SortKey("price", "Price", desc=True),
+        "address": SortKey("property_address", "Address"),
+    },
+    default_sort="created",
+    filters={"status": FILTER_EXACT, "address": FILTER_PREFIX},
+)
+
+CLIENTS_TABLE = TableSpec(
+    name="clients",
+    page_procedure="admin_clients_page",
+    count_procedure="admin_clients_count",
+    id_field="client_id",
+    sort_keys={
+        "name": SortKey("client_name", "Client Name"),
+        "created": SortKey("created_at", "Added", desc=True),
+    },
+    default_sort="name",
+    filters={"name": FILTER_PREFIX},
+)
+
+AGENTS_TABLE = TableSpec(
+    name="agents",
+    page_procedure="admin_agents_page",
+    count_procedure="admin_agents_count",
+    id_field="agent_id",
+    sort_keys={
+        "name": SortKey("agent_name", "Agent Name"),
+        "created": SortKey("created_at", "Added", desc=True),
+    },
+    default_sort="name",
+    filters={"name": FILTER_PREFIX},
+)
+
+PROPERTY_SEARCH = TableSpec(
+    name="property-search",
+    page_procedure="search_properties",
+    count_procedure="search_properties_count",
+    id_field="property_id",
+    sort_keys={
+        "price": SortKey("price", "Price", desc=True),
+        "newest": SortKey("created_at", "Newest", desc=True),
+        "address": SortKey("property_address", "Address"),
+    },
+    default_sort="price",
+    filters={
+        "status": FILTER_EXACT,
+        "property_type": FILTER_EXACT,
+        "min_price": FILTER_DECIMAL,
+        "max_price": FILTER_DECIMAL,
+    },
+)
@@ -0,0 +1,18 @@
+# app/core/templating.py
+from fastapi.templating import Jinja2Templates
+from .assets import asset_url
+from .config import settings
+from .fragments import fragment
+from .image_cache import image_srcset, resized_url
+
+
+def create_templates(**env_options) -> Jinja2Templates:
+    """Jinja2Templates for the app's template directory with the shared
+    globals registered. Every router builds its templates here."""
+    templates = Jinja2Templates(directory=str(settings.TEMPLATES_DIR), **env_options)
+    templates.env.globals["fragment"] = fragment
+    templates.env.globals["asset_url"] = asset_url
+    templates.env.globals["resized_url"] = resized_url
+    templates.env.globals["image_srcset"] = image_srcset
+    return templates
+
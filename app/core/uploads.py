@@ -0,0 +1,224 @@
+# app/core/uploads.py
+import hashlib
+from pathlib import Path
+from typing import NamedTuple, Optional
+from uuid import uuid4
+import aiofiles
+import aiofiles.os
+from fastapi import Request
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+
+# Bytes written per file write
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Allowance for multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+class UploadError(Exception):
+    """An upload rejected before it was stored; maps to an HTTP error"""
+
+    def __init__(self, status_code: int, detail: str, filename: Optional[str] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.filename = filename  # set for a file rejected within a bulk upload
+
+
+class StoredFile(NamedTuple):
+    path: Path
+    filename: str  # what the client called it; never used on disk
+    content_type: str
+    size: int
+    sha256: str
+
+
+class _PartEvents:
+    """Collects MultipartParser callbacks, which are synchronous, so the
+    receiving coroutine can act on them (and await writes) between chunks"""
+
+    def __init__(self):
+        self.events = []
+        self._headers = {}
+        self._field = self._value = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        }
+
+    def drain(self) -> list:
+        events, self.events = self.events, []
+        return events
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data, start, end):
+        self._field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._field.lower()] = self._value
+        self._field = self._value = b""
+
+    def _on_headers_finished(self):
+        self.events.append(("begin", self._headers))
+
+    def _on_part_data(self, data, start, end):
+        self.events.append(("data", bytes(data[start:end])))
+
+    def _on_part_end(self):
+        self.events.append(("end", None))
+
+
+async def _remove(path: Path):
+    try:
+        await aiofiles.os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def receive_files(
+    request: Request,
+    directory: Path,
+    field: str,
+    max_size: int,
+    allowed_extensions: set,
+    content_type_prefix: str = "",
+    max_files: int = 1,
+) -> list:
+    """Stream every file of the multipart field `field` to directory.
+
+    The body is parsed as it arrives rather than spooled first: file data
+    is written in UPLOAD_CHUNK_SIZE pieces without blocking the event loop
+    and hashed on the way. Files are stored under random names with the
+    client's (allowed) extension; the client's filename is only reported
+    back.
+
+    Returns one entry per file, in upload order: a StoredFile, or an
+    UploadError (with the file's name) for a file rejected on its own -
+    wrong type, empty, past max_files, or over max_size, where reading
+    that file stops immediately and what was written is discarded. Only a
+    problem with the request as a whole raises, including a body longer
+    than max_files files of max_size could need.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in options:
+        raise UploadError(400, "Expected a multipart/form-data upload")
+    # Checked up front when the client declares a length, and against the
+    # bytes actually read otherwise (a chunked body has no Content-Length)
+    body_limit = max_files * (max_size + MULTIPART_OVERHEAD)
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > body_limit:
+        raise UploadError(413, "Upload is too large")
+
+    await aiofiles.os.makedirs(directory, exist_ok=True)
+    part_events = _PartEvents()
+    parser = MultipartParser(options[b"boundary"], part_events.callbacks())
+    results = []
+    out = partial = digest = None
+    buffer = bytearray()
+    size = received = 0
+    filename = part_type = extension = None
+
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > body_limit:
+                raise UploadError(413, "Upload is too large")
+            parser.write(chunk)
+            for event, payload in part_events.drain():
+                if event == "begin":
+                    _, params = parse_options_header(
+                        payload.get(b"content-disposition", b"")
+                    )
+                    if params.get(b"name", b"").decode("latin-1") != field:
+                        continue
+                    filename = params.get(b"filename", b"").decode("utf-8", "replace")
+                    extension = Path(filename).suffix.lower()
+                    part_type = payload.get(b"content-type", b"").decode("latin-1")
+                    if len(results) >= max_files:
+                        results.append(
+                            UploadError(413, f"At most {max_files} files per upload", filename)
+                        )
+                    elif extension not in allowed_extensions:
+                        results.append(UploadError(400, "Unsupported file type", filename))
+                    elif not part_type.startswith(content_type_prefix):
+                        results.append(UploadError(400, "Invalid file type", filename))
+                    else:
+                        # Data of a rejected part is skipped, as out stays None
+                        partial = directory / f".{uuid4().hex}.part"
+                        out = await aiofiles.open(partial, "wb")
+                        digest = hashlib.sha256()
+                        size = 0
+                elif event == "data" and out is not None:
+                    size += len(payload)
+                    if size > max_size:
+                        await out.close()
+                        out = None
+                        buffer.clear()
+                        await _remove(partial)
+                        results.append(
+                            UploadError(
+                                413,
+                                f"File exceeds the {max_size / (1024 * 1024):g}MB limit",
+                                filename,
+                            )
+                        )
+                        continue
+                    digest.update(payload)
+                    buffer += payload
+                    if len(buffer) >= UPLOAD_CHUNK_SIZE:
+                        await out.write(bytes(buffer))
+                        buffer.clear()
+                elif event == "end" and out is not None:
+                    if buffer:
+                        await out.write(bytes(buffer))
+                        buffer.clear()
+                    await out.close()
+                    out = None
+                    if size == 0:
+                        await _remove(partial)
+                        results.append(UploadError(400, "Empty file", filename))
+                        continue
+                    stored = directory / f"{uuid4().hex}{extension}"
+                    await aiofiles.os.rename(partial, stored)
+                    results.append(
+                        StoredFile(stored, filename, part_type, size, digest.hexdigest())
+                    )
+        parser.finalize()
+    except BaseException as e:
+        if out is not None:
+            await out.close()
+            await _remove(partial)
+        await _remove_stored(results)
+        if isinstance(e, MultipartParseError):
+            raise UploadError(400, "Malformed multipart body") from None
+        raise
+
+    if out is not None:
+        # The body ended inside a file part
+        await out.close()
+        await _remove(partial)
+        await _remove_stored(results)
+        raise UploadError(400, "Malformed multipart body")
+    if not results:
+        raise UploadError(400, f"No '{field}' file in the upload")
+    return results
+
+
+async def _remove_stored(results: list):
+    """Discard the files receive_files stored"""
+    for result in results:
+        if isinstance(result, StoredFile):
+            await _remove(result.path)
+
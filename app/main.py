@@ -1,5 +1,4 @@
 from fastapi import FastAPI, Request, Depends
-from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 from sqlalchemy.orm import Session
@@ -8,6 +7,15 @@ from app.routes.admin import router as admin_router
 from app.routes.main import router as main_router
 from app.routes.auth import router as auth_router
 from app.routes.agents import router as agents_router
+from app.core.database import pool, run_in_db_executor, shutdown_db_executor
+from app.core.logging_config import logger
+from app.core.search_index import load_listing_index
+from app.core.client_lookup import load_client_directory
+from app.core.image_pipeline import image_pipeline
+from app.core.assets import PrecompressedStaticFiles
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.templating import create_templates
 
 app = FastAPI(title="Real Estate Management System")
 
@@ -21,6 +29,17 @@ app.add_middleware(
     https_only=False,  # Set to True in production
 )
 
+# Outermost, so it compresses whatever the session layer and routes send
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    levels={
+        "br": settings.COMPRESSION_BROTLI_LEVEL,
+        "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+        "gzip": settings.COMPRESSION_GZIP_LEVEL,
+    },
+)
+
 # Mount static files
 app.mount(
     "/static",
@@ -28,8 +47,16 @@ app.mount(
     name="static",
 )
 
+# Fingerprinted builds of the same files (utils/build_assets.py), served
+# precompressed and cached forever; templates link them via asset_url()
+app.mount(
+    "/assets",
+    PrecompressedStaticFiles(directory=str(settings.ASSETS_DIR), check_dir=False),
+    name="assets",
+)
+
 # Setup templates
-templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "app", "templates"))
+templates = create_templates()
 
 # Include routers with prefixes
 app.include_router(auth_router, tags=["auth"])
@@ -38,6 +65,35 @@ app.include_router(agents_router, prefix="/agent")
 app.include_router(main_router)  # No prefix for main routes
 
 
+@app.on_event("startup")
+async def startup():
+    try:
+        await run_in_db_executor(pool.warm)
+    except Exception as e:
+        # Connections will be opened on demand once the database is reachable
+        logger.error(f"Error warming connection pool: {e}")
+    try:
+        await run_in_db_executor(load_listing_index)
+    except Exception as e:
+        # /search builds it on first use instead
+        logger.error(f"Error building search index: {e}")
+    try:
+        await run_in_db_executor(load_client_directory)
+    except Exception as e:
+        # Client lookup loads it on first use instead
+        logger.error(f"Error loading client directory: {e}")
+    image_pipeline.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Let running image jobs finish; their results are recorded on the db
+    # executor, so it shuts down after them
+    image_pipeline.shutdown()
+    shutdown_db_executor()
+    pool.close()
+
+
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc):
@@ -5,17 +5,58 @@ from fastapi import (
     HTTPException,
     Query,
     Form,
-    File,
-    UploadFile,
 )
 from typing import Optional, List
+import asyncio
 import json
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 from starlette.routing import websocket_session
+from ..core.config import settings
 from ..core.logging_config import logger
-from ..core.database import get_db_connection, execute_procedure
-from ..core.image_utils import save_property_image, delete_property_images, validate_image
+from ..core.database import (
+    commit,
+    get_db_connection,
+    execute_batch,
+    execute_procedure,
+    execute_procedure_sets,
+    pool,
+    result_cache,
+    run_in_db_executor,
+)
+from ..core.fragments import fragment_cache
+from ..core.procedures import PROPERTY_FORM_PAGE, ProcedureCall
+from ..core.pagination import InvalidCursorError
+from ..core.search_index import listing_index, rebuild_listing_index, refresh_listing
+from ..core.client_lookup import client_directory, load_client_directory, refresh_client
+from ..core.facets import facet_counter
+from ..core.gazetteer import locate_property
+from ..core.tables import (
+    AGENTS_TABLE,
+    CLIENTS_TABLE,
+    PROPERTIES_TABLE,
+    TableQuery,
+    TableSpec,
+    fetch_table_page,
+    fetch_table_total,
+)
+from ..core.rows import ROW_RECORD
+from ..core.templating import create_templates
+from ..core.image_utils import (
+    ALLOWED_EXTENSIONS,
+    MAX_IMAGE_SIZE,
+    MAX_IMAGES_PER_UPLOAD,
+    delete_property_images,
+    validate_image,
+)
+from ..core.image_cache import image_cache
+from ..core.image_lists import (
+    get_property_images,
+    image_list_cache,
+    invalidate_image_list,
+)
+from ..core.image_pipeline import image_pipeline, thumbnail_path_for
+from ..core.image_store import image_store
+from ..core.uploads import UploadError, receive_files
 from ..core.security import get_current_admin
 from datetime import date
 import os
@@ -23,7 +64,7 @@ import os
 UPLOAD_DIR = "app/static/property_images"
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+templates = create_templates()
 
 
 # GET Routes
@@ -35,17 +76,24 @@ async def admin_dashboard(
 ):
     """Main admin dashboard view"""
     try:
-        # Get all clients
-        clients = execute_procedure(conn, "get_all_clients")
-
-        # Get properties with their images
-        properties = execute_procedure(conn, "get_all_properties_with_images")
+        # The panels are independent, so fetch them in parallel, starting on
+        # the request's connection. A panel whose query fails or times out
+        # renders empty with a notice.
+        panels = await execute_batch(
+            {
+                "clients": ProcedureCall("get_all_clients"),
+                "properties": ProcedureCall("get_all_properties_with_images"),
+                "stats": ProcedureCall("get_admin_dashboard_stats"),
+                "agents": ProcedureCall("get_all_agents"),
+            },
+            conn=conn,
+        )
 
         context = {
             "request": request,
             "current_user": current_user,
-            "agents": [],
-            "properties": properties,
+            "agents": panels["agents"],
+            "properties": panels["properties"],
             "property": {},  # Add empty property for new property form
             "total_agents": 0,
             "total_listings": 0,
@@ -53,16 +101,13 @@ async def admin_dashboard(
             "total_sales": 0,
             "total_commissions": 0,
             "today": date.today(),
-            "clients": clients,
+            "clients": panels["clients"],
+            "panel_errors": panels.errors,
         }
 
-        # Fetch dashboard stats
-        dashboard_stats = execute_procedure(conn, "get_admin_dashboard_stats")
-        if dashboard_stats:
-            context.update(dashboard_stats[0])
-
-        # Fetch agents
-        context["agents"] = execute_procedure(conn, "get_all_agents")
+        # Dashboard stats
+        if panels["stats"]:
+            context.update(panels["stats"][0])
 
         return templates.TemplateResponse("admin/dashboard.html", context)
     except Exception as e:
@@ -70,65 +115,255 @@ async def admin_dashboard(
         raise HTTPException(status_code=500, detail="Failed to load dashboard data")
 
 
+async def _table_context(request: Request, conn, spec: TableSpec, **params) -> dict:
+    """First page and header total for a paginated admin table"""
+    try:
+        query = TableQuery.from_params(spec, **params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page = await fetch_table_page(conn, query)
+    return {
+        "request": request,
+        "table": query,
+        "rows": page.rows,
+        "next_cursor": page.next_cursor,
+        "total": await fetch_table_total(conn, query),
+    }
+
+
+async def _table_rows(request: Request, conn, spec: TableSpec, cursor: str):
+    """Rows after cursor, appended in place of the table's load-more button"""
+    try:
+        query = TableQuery.from_cursor(spec, cursor)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    page = await fetch_table_page(conn, query)
+    return templates.TemplateResponse(
+        f"admin/{spec.name}/page_rows.html",
+        {
+            "request": request,
+            "table": query,
+            "rows": page.rows,
+            "next_cursor": page.next_cursor,
+        },
+    )
+
+
+def _is_table_refresh(request: Request, spec: TableSpec) -> bool:
+    """Sort and filter controls swap just the paged table"""
+    return request.headers.get("HX-Target") == spec.element_id
+
+
 @router.get("/clients")
 async def list_clients(
     request: Request,
+    sort: Optional[str] = None,
+    direction: Optional[str] = None,
+    name: Optional[str] = None,
     current_user: dict = Depends(get_current_admin),
     conn=Depends(get_db_connection),
 ):
-    """List all clients"""
+    """Clients page with the first page of the paginated clients table"""
     try:
-        clients = execute_procedure(conn, "get_all_clients")
-        return templates.TemplateResponse(
-            "admin/clients/list.html",
-            {"request": request, "clients": clients, "current_user": current_user},
+        context = await _table_context(
+            request, conn, CLIENTS_TABLE, sort=sort, direction=direction, name=name
         )
+        context["current_user"] = current_user
+        return templates.TemplateResponse("admin/clients/list.html", context)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching clients: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to fetch clients")
 
 
+@router.get("/clients/table", response_class=HTMLResponse)
+async def clients_table(
+    request: Request,
+    sort: Optional[str] = None,
+    direction: Optional[str] = None,
+    name: Optional[str] = None,
+    current_user: dict = Depends(get_current_admin),
+    conn=Depends(get_db_connection),
+):
+    """Paginated clients table, re-rendered on sort or filter changes"""
+    try:
+        context = await _table_context(
+            request, conn, CLIENTS_TABLE, sort=sort, direction=direction, name=name
+        )
+        return templates.TemplateResponse("admin/clients/paged_table.html", context)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to fetch clients table: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to load clients")
+
+
+@router.get("/clients/typeahead", response_class=HTMLResponse)
+async def client_typeahead(
+    request: Request,
+    q: str = "",
+    limit: int = Query(8, ge=1, le=50),
+    current_user: dict = Depends(get_current_admin),
+    conn=Depends(get_db_connection),
+):
+    """Top clients matching q by name, phone or email, best match first.
+    A name with no indexed match falls back to typo-tolerant suggestions."""
+    try:
+        query = q.strip()
+        matches, suggestions = [], []
+        if query:
+            matches = await execute_procedure(
+                conn, "search_clients", (query, limit), row_mode=ROW_RECORD
+            )
+            if not matches and any(ch.isalpha() for ch in query):
+                if not client_directory.ready:
+                    await run_in_db_executor(load_client_directory)
+                suggestions = client_directory.lookup(query, limit)
+        return templates.TemplateResponse(
+            "admin/clients/typeahead.html",
+            {
+                "request": request,
+                "query": query,
+                "matches": matches,
+                "suggestions": suggestions,
+            },
+        )
+    except Exception as e:
+        logger.error(f"Client typeahead failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to search clients")
+
+
+@router.get("/clients/lookup", response_class=HTMLResponse)
+async def client_lookup(
+    request: Request,
+    q: str = "",
+    limit: int = Query(8, ge=1, le=50),
+    current_user: dict = Depends(get_current_admin),
+):
+    """Clients whose names are close to q, typos allowed, closest first"""
+    try:
+        if not client_directory.ready:
+            await run_in_db_executor(load_client_directory)
+        return templates.TemplateResponse(
+            "admin/clients/lookup_results.html",
+            {
+                "request": request,
+                "query": q.strip(),
+                "suggestions": client_directory.lookup(q, limit),
+            },
+        )
+    except Exception as e:
+        logger.error(f"Client lookup failed: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to look up clients")
+
+
+@router.get("/clients/rows", response_class=HTMLResponse)
+async def clients_rows(
+    request: Request,
+    cursor: str,
+    current_user: dict = Depends(get_current_admin),
+    conn=Depends(get_db_connection),
+):
+    """Next page of client rows"""
+    try:
+        return await _table_rows(request, conn, CLIENTS_TABLE, cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to fetch client rows: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to load clients")
+
+
 @router.get("/properties/table", response_class=HTMLResponse)
-async def properties_table(request: Request, conn=Depends(get_db_connection)):
+async def properties_table(
+    request: Request,
+    sort: Optional[str] = None,
+    direction: Optional[str] = None,
+    status: Optional[str] = None,
+    address: Optional[str] = None,
+    conn=Depends(get_db_connection),
+):
     """Properties table component using stored procedure"""
     try:
-        context = {
-            "request": request,
-            "properties": [],
-            "total_properties": 0,
-            "active_listings": 0,
-            "total_value": 0,
-            "avg_price": 0,
-        }
+        context = await _table_context(
+            request,
+            conn,
+            PROPERTIES_TABLE,
+            sort=sort,
+            direction=direction,
+            status=status,
+            address=address,
+        )
+        if _is_table_refresh(request, PROPERTIES_TABLE):
+            return templates.TemplateResponse(
+                "admin/properties/paged_table.html", context
+            )
 
-        context["properties"] = execute_procedure(conn, "get_all_properties")
-        stats = execute_procedure(conn, "get_property_stats")
+        context.update(
+            {
+                "total_properties": 0,
+                "active_listings": 0,
+                "total_value": 0,
+                "avg_price": 0,
+            }
+        )
+        stats = await execute_procedure(conn, "get_property_stats")
         if stats:
             context.update(stats[0])
 
         return templates.TemplateResponse("admin/properties/table.html", context)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to fetch properties table: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to load properties")
 
 
+@router.get("/properties/rows", response_class=HTMLResponse)
+async def properties_rows(
+    request: Request,
+    cursor: str,
+    current_user: dict = Depends(get_current_admin),
+    conn=Depends(get_db_connection),
+):
+    """Next page of property rows"""
+    try:
+        return await _table_rows(request, conn, PROPERTIES_TABLE, cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to fetch property rows: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to load properties")
+
+
 @router.get("/agents/table", response_class=HTMLResponse)
-async def agents_table(request: Request, conn=Depends(get_db_connection)):
+async def agents_table(
+    request: Request,
+    sort: Optional[str] = None,
+    direction: Optional[str] = None,
+    name: Optional[str] = None,
+    conn=Depends(get_db_connection),
+):
     """Agents table component using stored procedure"""
     try:
-        context = {
-            "request": request,
-            "agents": [],
-            "total_agents": 0,
-            "total_listings": 0,
-            "total_sales": 0,
-            "total_commissions": 0,
-            "today": date.today(),
-        }
+        context = await _table_context(
+            request, conn, AGENTS_TABLE, sort=sort, direction=direction, name=name
+        )
+        if _is_table_refresh(request, AGENTS_TABLE):
+            return templates.TemplateResponse("admin/agents/paged_table.html", context)
 
-        context["agents"] = execute_procedure(conn, "get_all_agents")
-        stats = execute_procedure(conn, "get_agent_stats")
-        sales_data = execute_procedure(conn, "get_sales_stats")
+        context.update(
+            {
+                "total_agents": 0,
+                "total_listings": 0,
+                "total_sales": 0,
+                "total_commissions": 0,
+                "today": date.today(),
+            }
+        )
+        stats = await execute_procedure(conn, "get_agent_stats")
+        sales_data = await execute_procedure(conn, "get_sales_stats")
 
         if stats:
             context.update(
@@ -146,11 +381,68 @@ async def agents_table(request: Request, conn=Depends(get_db_connection)):
             )
 
         return templates.TemplateResponse("admin/agents/table.html", context)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to fetch agents table: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to load agents")
 
 
+@router.get("/agents/rows", response_class=HTMLResponse)
+async def agents_rows(
+    request: Request,
+    cursor: str,
+    current_user: dict = Depends(get_current_admin),
+    conn=Depends(get_db_connection),
+):
+    """Next page of agent rows"""
+    try:
+        return await _table_rows(request, conn, AGENTS_TABLE, cursor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to fetch agent rows: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to load agents")
+
+
+@router.get("/stats/pool")
+async def pool_stats(current_user: dict = Depends(get_current_admin)):
+    """Connection pool gauges: in-use, waiting, wait-time histogram, failures"""
+    return pool.stats()
+
+
+@router.get("/stats/cache")
+async def cache_stats(current_user: dict = Depends(get_current_admin)):
+    """Procedure result cache: size, hit rate, evictions, invalidations"""
+    return result_cache.stats()
+
+
+@router.get("/stats/fragments")
+async def fragment_stats(current_user: dict = Depends(get_current_admin)):
+    """Rendered fragment cache: entries, bytes used, hit rate, evictions"""
+    return fragment_cache.stats()
+
+
+@router.get("/stats/search")
+async def search_index_stats(current_user: dict = Depends(get_current_admin)):
+    """In-memory search indexes: documents, vocabulary, build and search times"""
+    return {
+        "listings": listing_index.stats(),
+        "facets": facet_counter.stats(),
+        "clients": client_directory.stats(),
+    }
+
+
+@router.get("/stats/images")
+async def image_pipeline_stats(current_user: dict = Depends(get_current_admin)):
+    """Image pipeline queue, resized-image disk cache and image list cache"""
+    return {
+        "pipeline": image_pipeline.stats(),
+        "cache": image_cache.stats(),
+        "lists": image_list_cache.stats(),
+    }
+
+
 @router.get("/clients/form", response_class=HTMLResponse)
 async def client_form(
     request: Request,
@@ -163,7 +455,7 @@ async def client_form(
         context = {"request": request}
 
         if form_type == "edit" and client_id:
-            client_details = execute_procedure(conn, "get_client_details", (client_id,))
+            client_details = await execute_procedure(conn, "get_client_details", (client_id,))
             if not client_details:
                 raise HTTPException(status_code=404, detail="Client not found")
 
@@ -187,19 +479,19 @@ async def property_form(
     try:
         context = {"request": request}
 
-        # If it's an edit form, get the property details
+        # If it's an edit form, get the property, images and select options
+        # in a single round trip
         if form_type == "edit" and property_id:
-            property_details = execute_procedure(
-                conn, "get_property_details_with_images", (property_id,)
+            page = await execute_procedure_sets(
+                conn, PROPERTY_FORM_PAGE, (property_id,)
             )
-            if not property_details:
+            if not page.property:
                 raise HTTPException(status_code=404, detail="Property not found")
-            property_data = property_details[0]
-            # Return updated image list
-            images = execute_procedure(conn, "get_property_images", (property_id,))
             context = {"request": request,
-                       "property": property_data,
-                       "images": images}
+                       "property": page.property,
+                       "images": page.images,
+                       "agents": page.agents,
+                       "clients": page.clients}
         return templates.TemplateResponse(
             "admin/properties/property_form.html", context
         )
@@ -220,7 +512,7 @@ async def agent_form(
         context = {"request": request}
 
         if form_type == "edit" and agent_id:
-            agent_details = execute_procedure(conn, "get_agent_details", (agent_id,))
+            agent_details = await execute_procedure(conn, "get_agent_details", (agent_id,))
             if not agent_details:
                 raise HTTPException(status_code=404, detail="Agent not found")
 
@@ -234,39 +526,147 @@ async def agent_form(
 
 
 # POST routes
+async def _store_images(conn, property_id: int, files: list) -> dict:
+    """Add received files (distinct hashes) to property_id with one
+    add_stored_images call and move them into the image store while its
+    transaction holds their blob rows; returns the pipeline jobs by
+    image_id"""
+    batch = []
+    for stored in files:
+        extension = image_store.extension(stored.path)
+        batch.append({
+            "sha256": stored.sha256,
+            "extension": extension,
+            "size_bytes": stored.size,
+            "file_path": image_store.url(stored.sha256, extension),
+        })
+    added = await execute_procedure(
+        conn, "add_stored_images", (property_id, json.dumps(batch))
+    )
+    invalidate_image_list(conn, property_id)
+
+    limit = asyncio.Semaphore(settings.IMAGE_UPLOAD_CONCURRENCY)
+
+    async def put(stored):
+        async with limit:
+            return await image_store.put(stored)
+
+    placed = await asyncio.gather(*map(put, files), return_exceptions=True)
+    try:
+        for result in placed:
+            if isinstance(result, BaseException):
+                raise result
+        rows = {row["sha256"]: row for row in added}
+        jobs = {}
+        for stored in files:
+            row = rows[stored.sha256]
+            # A repeat of an already processed upload inherits its thumbnail
+            if row["thumbnail_path"] is None:
+                extension = image_store.extension(stored.path)
+                path = image_store.path(stored.sha256, extension)
+                jobs[row["image_id"]] = image_pipeline.enqueue_on_commit(
+                    conn,
+                    row["image_id"],
+                    image_store.pending_path(stored.sha256, extension),
+                    path,
+                    image_store.url_for_path(thumbnail_path_for(path)),
+                )
+        # Commit only once the files are in place: until then the blob rows
+        # stay locked, so a delete of the last other reference keeps them
+        await run_in_db_executor(commit, conn)
+    except Exception:
+        # Still locked, so no one else can have started using these
+        for stored, created in zip(files, placed):
+            if created is True:
+                await image_store.remove(stored.sha256, image_store.extension(stored.path))
+        raise
+    for stored in files:
+        row = rows[stored.sha256]
+        logger.info(
+            f"Stored upload {stored.filename!r} for property {property_id} as "
+            f"image {row['image_id']} ({stored.size} bytes, "
+            f"{row['ref_count']} reference(s))"
+        )
+    return jobs
+
+
 @router.post("/properties/{property_id}/images")
-async def upload_property_image(
+async def upload_property_images(
     request: Request,
     property_id: int,
-    file: UploadFile = File(...),
     conn=Depends(get_db_connection),
 ):
-    """Upload a new property image."""
-    if not file.content_type.startswith("image/"):
-        raise HTTPException(status_code=400, detail="Invalid file type")
+    """Upload one or more property images.
+
+    The multipart body is streamed straight to disk (receive_files) rather
+    than parsed into memory first, so an oversized file is cut off at
+    MAX_IMAGE_SIZE. Each file succeeds or fails on its own; the updated
+    image list is rendered once, with a line per file. Accepted files are
+    added in one batch (_store_images), and thumbnailing is left to the
+    image pipeline, whose workers bound how many are processed at once:
+    new images are listed straight away and poll their status until done.
+    Files past the pipeline's free queue slots are reported as busy.
+    """
+    if image_pipeline.is_full():
+        raise HTTPException(
+            status_code=503, detail="Image processing is busy, please retry"
+        )
+    try:
+        received = await receive_files(
+            request,
+            image_store.incoming,
+            "file",
+            MAX_IMAGE_SIZE,
+            ALLOWED_EXTENSIONS,
+            content_type_prefix="image/",
+            max_files=MAX_IMAGES_PER_UPLOAD,
+        )
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    results = []
+    files = {}  # sha256 -> (first file with that content, its result)
+    for item in received:
+        if isinstance(item, UploadError):
+            results.append({"filename": item.filename, "error": item.detail})
+        elif item.sha256 in files:
+            item.path.unlink(missing_ok=True)
+            results.append({
+                "filename": item.filename,
+                "error": f"Same image as {files[item.sha256][0].filename}",
+            })
+        else:
+            files[item.sha256] = item, {"filename": item.filename, "error": None}
+            results.append(files[item.sha256][1])
+
+    # A job slot per file, so one bulk upload can't overrun the queue
+    with image_pipeline.reserve(len(files)) as granted:
+        accepted = [stored for stored, _ in list(files.values())[:granted]]
+        for stored, result in list(files.values())[granted:]:
+            stored.path.unlink(missing_ok=True)
+            result["error"] = "Image processing is busy, please retry"
+        try:
+            jobs = await _store_images(conn, property_id, accepted) if accepted else {}
+        except Exception as e:
+            logger.error(f"Error uploading images: {e}")
+            for stored in accepted:
+                stored.path.unlink(missing_ok=True)
+            raise HTTPException(status_code=500, detail="Failed to upload images")
 
     try:
-        # Save the uploaded file
-        web_location = f"/static/uploads/properties/{property_id}/{file.filename}"
-        file_location = "./app" + web_location
-        os.makedirs(os.path.dirname(file_location), exist_ok=True)
-        with open(file_location, "wb") as f:
-            f.write(await file.read())
-
-        # Add the file path to the database
-        execute_procedure(conn, "add_property_image", (property_id, web_location, False))
-        
         # Return updated image list
-        updated_images = execute_procedure(conn, "get_property_images", (property_id,))
+        updated_images = await get_property_images(conn, property_id)
         context = {"request": request,
-                   "images": updated_images}
+                   "images": updated_images,
+                   "jobs": jobs,
+                   "results": results}
         return templates.TemplateResponse(
             "admin/properties/image_list.html",
             context,
         )
     except Exception as e:
-        logger.error(f"Error uploading image: {e}")
-        raise HTTPException(status_code=500, detail="Failed to upload image")
+        logger.error(f"Error loading images after upload: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load images")
 
 
 @router.post("/clients")
@@ -291,16 +691,17 @@ async def create_client(
         ssn = SSN.replace("-", "")
 
         # Create client using stored procedure
-        execute_procedure(
+        await execute_procedure(
             conn,
             "create_client",
             (client_name, phone, client_email, mailing_address, ssn),
         )
 
         # Get the newly created client
-        client = execute_procedure(conn, "get_all_clients")[
+        client = (await execute_procedure(conn, "get_all_clients"))[
             -1
         ]  # Get most recently added client
+        refresh_client(conn, client["client_id"])
 
         # Return the new row HTML
         return templates.TemplateResponse(
@@ -349,7 +750,7 @@ async def admin_add_property(
         )
 
         # Execute stored procedure to create property
-        property_result = execute_procedure(
+        property_result = await execute_procedure(
             conn,
             "create_property",
             (
@@ -386,7 +787,9 @@ async def admin_add_property(
 
         # Get the created property details for the response
         property_id = property_result[0]["property_id"]
-        property_details = execute_procedure(
+        await locate_property(conn, property_id, property_address)
+        refresh_listing(conn, property_id)
+        property_details = await execute_procedure(
             conn, "get_property_details", (property_id,)
         )
 
@@ -410,6 +813,33 @@ async def admin_add_property(
 
 
 # PUT Routes
+@router.get("/properties/images/{image_id}/status", response_class=HTMLResponse)
+async def image_status(
+    request: Request,
+    image_id: int,
+    conn=Depends(get_db_connection),
+):
+    """One image of the admin list, polled while the pipeline processes it;
+    swaps in the thumbnail once the job is done."""
+    try:
+        images = await execute_procedure(conn, "get_image_by_id", (image_id,))
+        if not images:
+            raise HTTPException(status_code=404, detail="Image not found")
+        return templates.TemplateResponse(
+            "admin/properties/image_item.html",
+            {
+                "request": request,
+                "image": images[0],
+                "job": image_pipeline.job(image_id),
+            },
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error loading image status: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load image status")
+
+
 @router.put("/properties/images/{image_id}/primary")
 async def set_primary_image(
     request: Request,
@@ -419,7 +849,11 @@ async def set_primary_image(
     """Set an image as the primary image for its property"""
     try:
         # Execute the procedure to set primary image
-        execute_procedure(conn, "set_primary_image", (image_id,))
+        images = await execute_procedure(conn, "get_image_by_id", (image_id,))
+        await execute_procedure(conn, "set_primary_image", (image_id,))
+        if images:
+            refresh_listing(conn, images[0]["property_id"])
+            invalidate_image_list(conn, images[0]["property_id"])
         
         return templates.TemplateResponse(
             "admin/components/toast.html",
@@ -465,19 +899,20 @@ async def update_client(
         )
 
         # Update client using stored procedure
-        execute_procedure(
+        await execute_procedure(
             conn,
             "update_client",
             (client_id, client_name, phone, client_email, mailing_address),
         )
 
         # Update client types
-        execute_procedure(
+        await execute_procedure(
             conn, "update_client_types", (client_id, ",".join(client_types))
         )
+        refresh_client(conn, client_id)
 
         # Get updated client for response
-        updated_client = execute_procedure(conn, "get_client_details", (client_id,))
+        updated_client = await execute_procedure(conn, "get_client_details", (client_id,))
         if not updated_client:
             raise HTTPException(status_code=404, detail="Client not found after update")
 
@@ -528,7 +963,7 @@ async def update_property(
         logger.debug(f"Updating property {property_id}")
 
         # First update base property
-        execute_procedure(
+        await execute_procedure(
             conn,
             "update_property",
             (
@@ -557,9 +992,11 @@ async def update_property(
             ),
         )
 
+        await locate_property(conn, property_id, property_address)
+
         # Update agent listing with asking price
         exclusive = 1
-        execute_procedure(
+        await execute_procedure(
             conn,
             "update_agent_listing",
             (
@@ -574,7 +1011,7 @@ async def update_property(
 
         # Update type-specific details
         if property_type == "RESIDENTIAL":
-            execute_procedure(
+            await execute_procedure(
                 conn,
                 "update_residential_property",
                 (
@@ -589,7 +1026,7 @@ async def update_property(
                 ),
             )
         elif property_type == "COMMERCIAL":
-            execute_procedure(
+            await execute_procedure(
                 conn,
                 "update_commercial_property",
                 (
@@ -603,8 +1040,10 @@ async def update_property(
                 ),
             )
 
+        refresh_listing(conn, property_id)
+
         # Get updated property for response
-        updated_property = execute_procedure(
+        updated_property = await execute_procedure(
             conn, "get_property_details_with_images", (property_id,)
         )
 
@@ -640,7 +1079,7 @@ async def update_agent(
         expiration_date = datetime.strptime(license_expiration, "%Y-%m-%d").date()
 
         # Execute the procedure with all 8 parameters
-        execute_procedure(
+        await execute_procedure(
             conn,
             "update_agent",
             (
@@ -653,9 +1092,11 @@ async def update_agent(
                 1,
             ),
         )
+        # The name shows on every listing of this agent
+        rebuild_listing_index(conn)
 
         # Fetch the updated agent for rendering
-        updated_agent = execute_procedure(conn, "get_agent_details", (agent_id,))
+        updated_agent = await execute_procedure(conn, "get_agent_details", (agent_id,))
         if not updated_agent:
             raise HTTPException(status_code=404, detail="Agent not found")
 
@@ -682,22 +1123,41 @@ async def delete_image(
     """Delete a property image"""
     try:
         # Get image path before deleting
-        images = execute_procedure(conn, "get_image_by_id", (image_id,))
+        images = await execute_procedure(conn, "get_image_by_id", (image_id,))
 
         if not images:
             raise HTTPException(status_code=404, detail="Image not found")
 
-        # Delete from database
-        execute_procedure(conn, "delete_property_image", (image_id,))
-
-        # Delete physical files
-        if images[0]["file_path"]:
-            try:
-                file_path = os.path.join("app", "static", images[0]["file_path"])
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            except Exception as e:
-                logger.error(f"Error deleting physical file: {str(e)}")
+        image = images[0]
+        if image["sha256"]:
+            # Stored by content: the file goes with its last reference
+            deleted = await execute_procedure(conn, "delete_property_image", (image_id,))
+            refresh_listing(conn, image["property_id"])
+            invalidate_image_list(conn, image["property_id"])
+            await run_in_db_executor(commit, conn)
+            if deleted and deleted[0]["ref_count"] is not None and deleted[0]["ref_count"] <= 0:
+                # Only if no upload has referenced it again since; the lock
+                # holds any new one off until the file is gone
+                blob = await execute_procedure(conn, "lock_image_blob", (image["sha256"],))
+                try:
+                    if not blob:
+                        await image_store.remove(image["sha256"], deleted[0]["extension"])
+                finally:
+                    await run_in_db_executor(commit, conn)
+        else:
+            # Delete from database
+            await execute_procedure(conn, "delete_property_image", (image_id,))
+            refresh_listing(conn, image["property_id"])
+            invalidate_image_list(conn, image["property_id"])
+
+            # Delete physical files (file_path is a /static URL)
+            if image["file_path"]:
+                try:
+                    file_path = os.path.join("app", image["file_path"].lstrip("/"))
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                except Exception as e:
+                    logger.error(f"Error deleting physical file: {str(e)}")
 
         # Return a toast notification
         return templates.TemplateResponse(
@@ -725,7 +1185,8 @@ async def delete_image(
 async def delete_client(client_id: int, conn=Depends(get_db_connection)):
     """Delete a client"""
     try:
-        execute_procedure(conn, "delete_client", (client_id,))
+        await execute_procedure(conn, "delete_client", (client_id,))
+        refresh_client(conn, client_id)
         return JSONResponse(
             content={"success": True, "message": "Client deleted successfully"}
         )
@@ -738,7 +1199,9 @@ async def delete_client(client_id: int, conn=Depends(get_db_connection)):
 async def delete_property(property_id: int, conn=Depends(get_db_connection)):
     """Delete a property using stored procedure"""
     try:
-        execute_procedure(conn, "delete_property", (property_id,))
+        await execute_procedure(conn, "delete_property", (property_id,))
+        refresh_listing(conn, property_id)
+        invalidate_image_list(conn, property_id)
         return Response("")
     except Exception as e:
         logger.error(
@@ -753,7 +1216,7 @@ async def delete_property(property_id: int, conn=Depends(get_db_connection)):
 async def delete_agent(agent_id: int, conn=Depends(get_db_connection)):
     """Delete an agent using stored procedure"""
     try:
-        execute_procedure(conn, "delete_agent", (agent_id,))
+        await execute_procedure(conn, "delete_agent", (agent_id,))
         return JSONResponse(
             content={"success": True, "message": "Agent deleted successfully"}
         )
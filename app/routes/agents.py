@@ -1,14 +1,17 @@
 from fastapi import APIRouter, Request, Depends, HTTPException, Form
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, RedirectResponse
 from typing import Optional
 from datetime import date, datetime
-from ..core.database import get_db_connection, execute_procedure
+from ..core.database import get_db_connection, execute_procedure, execute_procedure_sets
+from ..core.procedures import AGENT_DASHBOARD
+from ..core.gazetteer import locate_property
+from ..core.search_index import refresh_listing
 from ..core.logging_config import logger
+from ..core.templating import create_templates
 from ..core.security import get_current_agent
 
 router = APIRouter(tags=["agents"])
-templates = Jinja2Templates(directory="app/templates")
+templates = create_templates()
 
 
 @router.get("", response_class=HTMLResponse)
@@ -21,23 +24,19 @@ async def agent_dashboard(
     try:
         agent = current_user["agent"]
 
-        # Fetch data using stored procedures
-        listings = execute_procedure(conn, "get_agent_listings", (agent["agent_id"],))
-        active_listings = execute_procedure(
-            conn, "get_active_listings_count", (agent["agent_id"],)
-        )
-        total_sales = execute_procedure(conn, "get_total_sales", (agent["agent_id"],))
-        upcoming_showings = execute_procedure(
-            conn, "get_upcoming_showings", (agent["agent_id"],)
+        # Listings, totals and showings in a single round trip
+        dashboard = await execute_procedure_sets(
+            conn, AGENT_DASHBOARD, (agent["agent_id"],)
         )
+        totals = dashboard.totals or {}
 
         context = {
             "request": request,
             "agent": agent,
-            "listings": listings,
-            "active_listings": active_listings[0]["count"] if active_listings else 0,
-            "total_sales": total_sales[0]["total"] if total_sales else 0,
-            "upcoming_showings": upcoming_showings,
+            "listings": dashboard.listings,
+            "active_listings": totals.get("active_listings", 0),
+            "total_sales": totals.get("total_sales", 0),
+            "upcoming_showings": dashboard.upcoming_showings,
         }
 
         return templates.TemplateResponse("agents/dashboard.html", context)
@@ -58,7 +57,7 @@ async def edit_property_form(
         agent = current_user["agent"]
 
         # Ensure the agent is the listing agent for this property
-        listing = execute_procedure(
+        listing = await execute_procedure(
             conn, "get_agent_property", (agent["agent_id"], property_id)
         )
         if not listing:
@@ -90,11 +89,13 @@ async def update_property(
         agent = current_user["agent"]
 
         # Update property details
-        execute_procedure(
+        await execute_procedure(
             conn,
             "update_property",
             (property_id, agent["agent_id"], address, price, status),
         )
+        await locate_property(conn, property_id, address)
+        refresh_listing(conn, property_id)
 
         return RedirectResponse(url="/agent/listings", status_code=303)
     except Exception as e:
@@ -117,7 +118,7 @@ async def create_showing(
         agent = current_user["agent"]
         showing_datetime = datetime.strptime(showing_date, "%Y-%m-%d %H:%M")
 
-        execute_procedure(
+        await execute_procedure(
             conn,
             "create_showing",
             (property_id, agent["agent_id"], client_id, showing_datetime, notes),
@@ -151,7 +152,7 @@ async def cancel_showing(
 ):
     """Cancel a showing using stored procedure"""
     try:
-        execute_procedure(
+        await execute_procedure(
             conn, "cancel_showing", (showing_id, current_user["agent"]["agent_id"])
         )
         return {"message": "Showing cancelled successfully"}
@@ -169,7 +170,7 @@ async def agent_listings(
     """View all properties the agent is listing using stored procedure"""
     try:
         agent = current_user["agent"]
-        listings = execute_procedure(conn, "get_agent_listings", (agent["agent_id"],))
+        listings = await execute_procedure(conn, "get_agent_listings", (agent["agent_id"],))
 
         return templates.TemplateResponse(
             "agents/listings.html",
@@ -193,7 +194,7 @@ async def agent_transactions(
     """View agent's transactions using stored procedure"""
     try:
         agent = current_user["agent"]
-        transactions = execute_procedure(
+        transactions = await execute_procedure(
             conn, "get_agent_transactions", (agent["agent_id"],)
         )
 
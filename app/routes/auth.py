@@ -1,10 +1,10 @@
 # app/routes/auth.py
 from fastapi import APIRouter, Request, Depends, Form, HTTPException, status
 from fastapi.responses import RedirectResponse, HTMLResponse
-from fastapi.templating import Jinja2Templates
 from ..core.security import verify_password, get_password_hash
 from ..core.logging_config import logger
 from ..core.database import get_db_connection, execute_procedure
+from ..core.templating import create_templates
 from datetime import datetime
 import os
 from dotenv import load_dotenv
@@ -12,7 +12,7 @@ from mysql.connector import Error
 
 load_dotenv()
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+templates = create_templates()
 
 class AuthError(Exception):
     def __init__(self, message: str, status_code: int = 400):
@@ -27,7 +27,7 @@ async def authenticate_user(conn, username: str, password: str) -> dict:
         if username == os.getenv("ADMIN_USERNAME"):
             if password == os.getenv("ADMIN_PASSWORD"):
                 # Get admin role
-                admin_role = execute_procedure(conn, 'get_or_create_admin_role')
+                admin_role = await execute_procedure(conn, 'get_or_create_admin_role')
                 if admin_role:
                     return {
                         "username": username,
@@ -38,19 +38,19 @@ async def authenticate_user(conn, username: str, password: str) -> dict:
             raise AuthError("Invalid credentials", 400)
 
         # Get user details
-        user_result = execute_procedure(conn, 'get_user_by_username', (username,))
+        user_result = await execute_procedure(conn, 'get_user_by_username', (username,))
         if not user_result or not verify_password(password, user_result[0]['password_hash']):
             raise AuthError("Invalid credentials", 400)
 
         user = user_result[0]
         
         # Get user role details
-        user_info = execute_procedure(conn, 'get_user_role_and_details', (user['user_id'],))
+        user_info = await execute_procedure(conn, 'get_user_role_and_details', (user['user_id'],))
         if not user_info:
             raise AuthError("User role not found", 500)
         
         # Log successful login
-        execute_procedure(conn, 'log_user_login', (user['user_id'], user_info[0]['role_name']))
+        await execute_procedure(conn, 'log_user_login', (user['user_id'], user_info[0]['role_name']))
         
         return user_info[0]
 
@@ -97,7 +97,7 @@ async def login(
         
         # Log additional login details if not env admin
         if not user.get("is_env_admin"):
-            execute_procedure(conn, 'log_successful_login', (user["user_id"],))
+            await execute_procedure(conn, 'log_successful_login', (user["user_id"],))
         
         logger.info(f"Successful login for user: {username}")
         
@@ -1,17 +1,55 @@
-from fastapi import APIRouter, Request, Depends, HTTPException
-from fastapi.templating import Jinja2Templates
+from fastapi import APIRouter, Request, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from decimal import Decimal
 from typing import Optional
+from urllib.parse import urlencode
+import asyncio
+import math
 from ..core.logging_config import logger
-from app.core.database import get_db_connection, execute_procedure
+from app.core.database import (
+    get_db_connection,
+    execute_procedure,
+    execute_procedure_sets,
+    run_in_db_executor,
+)
+from app.core.conditional import (
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    validator_headers,
+)
+from app.core.config import settings
+from app.core.facets import facet_counter
+from app.core.geo import BoundingBox
+from app.core.image_cache import FORMATS, SOURCE_EXTENSIONS, image_cache
+from app.core.image_store import image_store
+from app.core.image_lists import get_property_images
+from app.core.pagination import (
+    InvalidCursorError,
+    clamp_page_size,
+    decode_cursor,
+    encode_cursor,
+    split_page,
+)
+from app.core.procedures import PROPERTY_DETAIL_PAGE
+from app.core.rows import ROW_RECORD
+from app.core.search_index import ensure_listing_index, listing_index
+from app.core.tables import (
+    PROPERTY_SEARCH,
+    PropertySearchQuery,
+    fetch_table_page,
+    fetch_table_total,
+)
+from app.core.templating import create_templates
 
 router = APIRouter(tags=["main"])
-templates = Jinja2Templates(directory="app/templates")
+templates = create_templates()
 
 
 async def is_db_empty(conn) -> bool:
     """Check if the database is empty using stored procedure"""
     try:
-        result = execute_procedure(conn, "get_property_count")
+        result = await execute_procedure(conn, "get_property_count")
         return result[0]["count"] == 0 if result else True
     except Exception as e:
         logger.error(f"Error checking if database is empty: {str(e)}")
@@ -22,20 +60,26 @@ async def is_db_empty(conn) -> bool:
 async def index(request: Request, conn=Depends(get_db_connection)):
     """Homepage route"""
     try:
-        # Fetch all properties with their agent listings and details
-        logger.debug("Fetching listings...")
-        listings = execute_procedure(conn, "get_all_agent_listings_with_details")
-        logger.debug(f"Found {len(listings) if listings else 0} listings")
-        logger.debug(listings)
-        if not listings:
-            logger.warning("No listings found in the database")
+        # Cheap version probe first; a client holding the current page gets
+        # a 304 without the listings join or the render
+        version = (await execute_procedure(conn, "get_listings_version"))[0]
+        etag = make_etag("listings", version["version"], version["last_modified"])
+        headers = validator_headers(etag, version["last_modified"])
+        if is_not_modified(request, etag, version["last_modified"]):
+            return not_modified_response(headers)
 
+        # First keyset page; the rest are appended by /listings on scroll
+        page_size = settings.LISTINGS_PAGE_SIZE
+        listings, next_cursor = await fetch_listings_page(conn, None, page_size)
         return templates.TemplateResponse(
             "index.html",
             {
                 "request": request,
                 "listings": listings,
+                "next_cursor": next_cursor,
+                "page_size": page_size,
             },
+            headers=headers,
         )
     except Exception as e:
         logger.error(f"Error fetching listings: {str(e)}", exc_info=True)
@@ -48,36 +92,170 @@ async def index(request: Request, conn=Depends(get_db_connection)):
             },
         )
 
+async def fetch_listings_page(conn, cursor: Optional[str], page_size: int):
+    """One page of listings after cursor, plus the cursor for the next page
+    (None on the last page). Seeks on (price, property_id), so every page
+    costs the same however deep it is."""
+    after_price = after_id = None
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            after_price = Decimal(position["price"])
+            after_id = int(position["id"])
+            if not after_price.is_finite():
+                raise ValueError("Non-finite cursor price")
+        except (InvalidCursorError, KeyError, TypeError, ValueError, ArithmeticError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rows = await execute_procedure(
+        conn,
+        "get_agent_listings_page",
+        (after_price, after_id, page_size + 1),
+        row_mode=ROW_RECORD,
+    )
+    listings, has_more = split_page(rows, page_size, "property_id")
+    next_cursor = None
+    if has_more:
+        last = listings[-1]
+        next_cursor = encode_cursor({"price": last.price, "id": last.property_id})
+    return listings, next_cursor
+
+
+@router.get("/listings")
+async def listings_page(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    conn=Depends(get_db_connection),
+):
+    """Next page of homepage cards, requested by the infinite-scroll sentinel"""
+    try:
+        page_size = clamp_page_size(
+            limit, settings.LISTINGS_PAGE_SIZE, settings.LISTINGS_MAX_PAGE_SIZE
+        )
+        listings, next_cursor = await fetch_listings_page(conn, cursor, page_size)
+        return templates.TemplateResponse(
+            "partials/listing_page.html",
+            {
+                "request": request,
+                "listings": listings,
+                "next_cursor": next_cursor,
+                "page_size": page_size,
+            },
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching listings page: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to load listings")
+
+
+@router.get("/properties")
+async def browse_properties(
+    request: Request,
+    sort: Optional[str] = None,
+    direction: Optional[str] = None,
+    status: Optional[str] = None,
+    property_type: Optional[str] = None,
+    min_price: Optional[str] = None,
+    max_price: Optional[str] = None,
+    cursor: Optional[str] = None,
+    conn=Depends(get_db_connection),
+):
+    """Browse listings through the search_properties keyset procedure,
+    sorted by a whitelisted key. HTMX filter and sort changes get the
+    results block; a cursor gets just the next page of cards."""
+    try:
+        try:
+            if cursor:
+                query = PropertySearchQuery.from_cursor(PROPERTY_SEARCH, cursor)
+            else:
+                query = PropertySearchQuery.from_params(
+                    PROPERTY_SEARCH,
+                    sort=sort,
+                    direction=direction,
+                    status=status,
+                    property_type=property_type,
+                    min_price=min_price,
+                    max_price=max_price,
+                )
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        page = await fetch_table_page(conn, query, settings.LISTINGS_PAGE_SIZE)
+        context = {
+            "request": request,
+            "table": query,
+            "listings": page.rows,
+            "next_cursor": page.next_cursor,
+            "cursor": cursor,
+        }
+        if cursor:
+            return templates.TemplateResponse(
+                "partials/property_search_rows.html", context
+            )
+        context["total"] = await fetch_table_total(conn, query)
+        if request.headers.get("HX-Request"):
+            return templates.TemplateResponse(
+                "partials/property_search.html", context
+            )
+        return templates.TemplateResponse("properties/list.html", context)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error browsing properties: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to load properties")
+
+
 @router.get("/properties/{property_id}")
 async def property_detail(request: Request, property_id: int, conn=Depends(get_db_connection)):
     """Get detailed property information"""
     try:
-        # Get property details with agent info and residential/commercial details
-        property_details = execute_procedure(
-            conn, "get_property_details", (property_id,)
-        )
+        version = await execute_procedure(conn, "get_property_version", (property_id,))
+        if not version:
+            raise HTTPException(status_code=404, detail="Property not found")
 
-        # Get all images for this property
-        property_images = execute_procedure(conn, "get_property_images", (property_id,))
+        last_modified = version[0]["last_modified"]
+        etag = make_etag("property", property_id, last_modified)
+        headers = validator_headers(etag, last_modified)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(headers)
 
-        if not property_details:
+        # Property details, agent info and images in a single round trip
+        page = await execute_procedure_sets(conn, PROPERTY_DETAIL_PAGE, (property_id,))
+
+        if not page.property:
             raise HTTPException(status_code=404, detail="Property not found")
 
-        logger.debug(f"Found property details: {property_details[0]}")
+        logger.debug(f"Found property details: {page.property}")
 
         return templates.TemplateResponse(
             "properties/detail.html",
             {
                 "request": request, 
-                "property": property_details[0],
-                "property_id": property_details[0]["property_id"],
-                "images": property_images
-            }
+                "property": page.property,
+                "property_id": page.property["property_id"],
+                "images": page.images
+            },
+            headers=headers,
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching property details: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _carousel_neighbors(images: list, index: int) -> dict:
+    """The slides the carousel's Previous/Next buttons lead to, for preload
+    hints (None at either end, where the button is disabled)"""
+    return {
+        "previous_image": images[index - 1] if index > 0 else None,
+        "next_image": images[index + 1] if index + 1 < len(images) else None,
+    }
+
+
 @router.get("/properties/{property_id}/image/{index}")
 async def change_property_image(
     request: Request, 
@@ -85,8 +263,10 @@ async def change_property_image(
     index: int,
     conn=Depends(get_db_connection)
 ):
-    property_images = execute_procedure(conn, "get_property_images", (property_id,))
-    if not property_images or index >= len(property_images):
+    """One carousel slide. The image list is cached per property, so paging
+    through a listing's photos doesn't re-query it on every click."""
+    property_images = await get_property_images(conn, property_id)
+    if not property_images or not 0 <= index < len(property_images):
         raise HTTPException(status_code=404, detail="Image not found")
         
     return templates.TemplateResponse(
@@ -96,48 +276,303 @@ async def change_property_image(
             "image": property_images[index],
             "current_index": index,
             "total_images": len(property_images),
-            "property_id": property_id
+            "property_id": property_id,
+            **_carousel_neighbors(property_images, index),
         }
     )
 
+# Derivatives of /media files never change under a URL, since the stored
+# files don't, so browsers may keep them for a year. A /static image can be
+# replaced in place, so its derivatives are rechecked hourly against the
+# ETag (the cache key covers the source's mtime).
+IMAGE_CACHE_CONTROL = "public, max-age=31536000"
+STATIC_IMAGE_CACHE_CONTROL = "public, max-age=3600"
+# /media URLs name their content, so what a browser has is never stale
+MEDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _static_file(path: str):
+    static_dir = settings.STATIC_DIR.resolve()
+    source = (static_dir / path).resolve()
+    return source if source.is_relative_to(static_dir) else None
+
+
+def _resizable_source(root: str, path: str):
+    """Source file for an /images URL, or None (blocking: resolves and
+    checks the path on disk)"""
+    if root == "static":
+        source = _static_file(path)
+    elif root == "media":
+        source = image_store.resolve(path)
+    else:
+        return None
+    if (
+        source is None
+        or source.suffix.lower() not in SOURCE_EXTENSIONS
+        or not source.is_file()
+    ):
+        return None
+    return source
+
+
+@router.get("/images/{root}/{path:path}")
+async def resized_image(
+    request: Request,
+    root: str,
+    path: str,
+    w: int = Query(..., ge=1, le=4096),
+    format: str = Query("jpeg"),
+):
+    """A /static or /media image scaled to width w as JPEG or WebP, for
+    srcset.
+
+    Derivatives are generated on first request in the image worker pool and
+    kept in the disk cache (app.core.image_cache).
+    """
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported image format")
+    source = await asyncio.get_running_loop().run_in_executor(
+        None, _resizable_source, root, path
+    )
+    if source is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    try:
+        derivative = await image_cache.get(source, w, format)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Image not found")
+    except Exception as e:
+        logger.error(f"Error resizing image {path}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to resize image")
+
+    etag = make_etag(derivative.key)
+    cache_control = STATIC_IMAGE_CACHE_CONTROL if root == "static" else IMAGE_CACHE_CONTROL
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if is_not_modified(request, etag):
+        return not_modified_response(headers)
+    return FileResponse(derivative.path, media_type=derivative.media_type, headers=headers)
+
+
+@router.get("/media/{path:path}")
+async def media_file(path: str):
+    """A processed file from the content-addressed image store. Uploads
+    are only published here once processed and never rewritten after, so
+    it can be cached forever; pending uploads 404."""
+    source = image_store.resolve(path)
+    if source is None or not source.is_file():
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(source, headers={"Cache-Control": MEDIA_CACHE_CONTROL})
+
+
+def _parse_price(value: Optional[str]) -> Optional[float]:
+    """Price filter from a form field; blank means no bound"""
+    if value is None or not value.strip():
+        return None
+    try:
+        price = float(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid price")
+    if not math.isfinite(price):
+        raise HTTPException(status_code=400, detail="Invalid price")
+    return price
+
+
+def _facet_url(filters: dict, fuzzy: bool, params: dict) -> str:
+    """Search URL with a facet's filters applied on top of the current ones"""
+    merged = {k: v for k, v in {**filters, **params}.items() if v is not None}
+    if fuzzy:
+        merged["fuzzy"] = "true"
+    return f"/search?{urlencode(merged)}"
+
+
+def _search_listings(filters: dict, after, limit: int, fuzzy: bool, fallback: bool):
+    """Search the index, retrying a text search that finds nothing exactly
+    as a fuzzy one when fallback is set. Blocking: fuzzy matching is CPU
+    work done under the index lock, so the route runs it on the db executor."""
+    if listing_index.needs_check():
+        ensure_listing_index()
+    result = listing_index.search(**filters, after=after, limit=limit, fuzzy=fuzzy)
+    if not result.total and not fuzzy and fallback and (
+        filters["query"] or filters["agent_name"]
+    ):
+        result = listing_index.search(**filters, limit=limit, fuzzy=True)
+    return result
+
+
 @router.get("/search")
 async def search(
     request: Request,
     query: Optional[str] = None,
     property_type: Optional[str] = None,
-    min_price: Optional[float] = None,
-    max_price: Optional[float] = None,
+    status: Optional[str] = None,
+    min_price: Optional[str] = None,
+    max_price: Optional[str] = None,
     agent_name: Optional[str] = None,
-    conn=Depends(get_db_connection),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fuzzy: bool = False,
 ):
-    """Search listings route with extended filters"""
+    """Search listings with extended filters, answered from the in-memory
+    search index, with facet counts for the filters in use. HTMX requests
+    get just the result cards (and the facet panel, swapped out of band).
+
+    fuzzy ranks typo-tolerant matches instead; a text search that finds
+    nothing exactly falls back to it.
+    """
+    filters = {
+        "query": (query or "").strip() or None,
+        "agent_name": (agent_name or "").strip() or None,
+        "property_type": property_type or None,
+        "status": status or None,
+        "min_price": _parse_price(min_price),
+        "max_price": _parse_price(max_price),
+    }
+    context = {
+        "request": request, "filters": filters, "cursor": cursor, "fuzzy": fuzzy
+    }
     try:
-        # Search listings using stored procedure with extended parameters
-        listings = execute_procedure(
-            conn,
-            "search_agent_listings_with_filters",
-            (query, property_type, min_price, max_price, agent_name),
+        page_size = clamp_page_size(
+            limit, settings.LISTINGS_PAGE_SIZE, settings.LISTINGS_MAX_PAGE_SIZE
         )
+        after = None
+        if cursor:
+            try:
+                position = decode_cursor(cursor)
+                after = (float(position["price"]), int(position["id"]))
+            except (InvalidCursorError, KeyError, TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
 
-        if request.headers.get("HX-Request"):
-            return templates.TemplateResponse(
-                "partials/listings.html", {"request": request, "listings": listings}
+        result = await run_in_db_executor(
+            _search_listings, filters, after, page_size, fuzzy, not cursor
+        )
+
+        next_cursor = next_url = None
+        if result.has_more:
+            last = result.listings[-1]
+            next_cursor = encode_cursor({"price": last.price, "id": last.property_id})
+            params = {k: v for k, v in filters.items() if v is not None}
+            params.update(cursor=next_cursor, limit=page_size)
+            next_url = f"/search?{urlencode(params)}"
+
+        if not cursor:
+            context.update(
+                facets=await run_in_db_executor(
+                    facet_counter.counts,
+                    **filters,
+                    fuzzy=result.corrections is not None,
+                ),
+                facet_url=lambda params: _facet_url(filters, fuzzy, params),
+                facets_oob=bool(request.headers.get("HX-Request")),
             )
+        context.update(
+            listings=result.listings,
+            total=result.total,
+            corrections=result.corrections,
+            next_cursor=next_cursor,
+            next_url=next_url,
+        )
+        if request.headers.get("HX-Request"):
+            return templates.TemplateResponse("partials/search_results.html", context)
+        return templates.TemplateResponse("search.html", context)
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching listings: {str(e)}", exc_info=True)
+        context.update(listings=[], total=0, error="Failed to search listings")
+        return templates.TemplateResponse("search.html", context)
+
+def _geo_context(request: Request, result, limit: int, **extra) -> dict:
+    return {
+        "request": request,
+        "listings": result.listings,
+        "distances": result.distances,
+        "total": result.total,
+        "has_more": result.has_more,
+        "limit": limit,
+        **extra,
+    }
+
+
+@router.get("/search/area")
+async def search_area(
+    request: Request,
+    south: float,
+    west: float,
+    north: float,
+    east: float,
+    status: Optional[str] = None,
+    property_type: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    """Listing cards inside a map's bounding box, most expensive first,
+    answered from the search index's geo grid"""
+    try:
+        if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+            raise HTTPException(status_code=400, detail="Invalid bounding box")
+        page_size = clamp_page_size(
+            limit, settings.LISTINGS_PAGE_SIZE, settings.LISTINGS_MAX_PAGE_SIZE
+        )
+        if listing_index.needs_check():
+            await run_in_db_executor(ensure_listing_index)
+        result = listing_index.within_area(
+            BoundingBox(south, west, north, east),
+            status=status or None,
+            property_type=property_type or None,
+            limit=page_size,
+        )
         return templates.TemplateResponse(
-            "search.html", {"request": request, "listings": listings}
+            "partials/geo_results.html", _geo_context(request, result, page_size)
         )
-
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error searching listings: {str(e)}")
+        logger.error(f"Error searching listings by area: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to search listings")
+
+
+@router.get("/search/nearby")
+async def search_nearby(
+    request: Request,
+    lat: float,
+    lng: float,
+    radius_km: float = 2.0,
+    status: Optional[str] = None,
+    property_type: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    """Listing cards within radius_km of a point, nearest first"""
+    try:
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise HTTPException(status_code=400, detail="Invalid coordinates")
+        if not 0 < radius_km <= settings.GEO_MAX_RADIUS_KM:
+            raise HTTPException(
+                status_code=400,
+                detail=f"radius_km must be between 0 and {settings.GEO_MAX_RADIUS_KM:g}",
+            )
+        page_size = clamp_page_size(
+            limit, settings.LISTINGS_PAGE_SIZE, settings.LISTINGS_MAX_PAGE_SIZE
+        )
+        if listing_index.needs_check():
+            await run_in_db_executor(ensure_listing_index)
+        result = listing_index.nearby(
+            lat,
+            lng,
+            radius_km,
+            status=status or None,
+            property_type=property_type or None,
+            limit=page_size,
+        )
         return templates.TemplateResponse(
-            "search.html",
-            {
-                "request": request,
-                "listings": [],
-                "error": "Failed to search listings",
-            },
+            "partials/geo_results.html",
+            _geo_context(request, result, page_size, radius_km=radius_km),
         )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching nearby listings: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to search listings")
+
 
 @router.get("/about")
 async def about(request: Request):
@@ -0,0 +1,238 @@
+DELIMITER //
+
+-- Paginated admin tables.
+--
+-- Each *_page procedure returns one keyset page: rows strictly after
+-- (p_after_value, p_after_id) in the requested order, at most p_limit of
+-- them. Sort keys are whitelisted here and map to fixed columns, each
+-- backed by a (column, id) index, so the statement assembled below only
+-- ever contains known identifiers; every value is bound through a user
+-- variable. p_after_id NULL means the first page.
+--
+-- Each *_count procedure returns the total for the table header without a
+-- full COUNT: the InnoDB row estimate when unfiltered, otherwise an exact
+-- count that stops at p_cap. precision is 'estimate', 'exact' or 'at_least'.
+
+DROP PROCEDURE IF EXISTS admin_properties_page //
+CREATE PROCEDURE admin_properties_page(
+    IN p_sort VARCHAR(20),
+    IN p_desc BOOLEAN,
+    IN p_after_value VARCHAR(255),
+    IN p_after_id INT,
+    IN p_limit INT,
+    IN p_status VARCHAR(20),
+    IN p_address VARCHAR(255)
+)
+BEGIN
+    DECLARE v_column VARCHAR(64);
+    DECLARE v_value VARCHAR(64);
+    DECLARE v_cmp CHAR(1) DEFAULT IF(p_desc, '<', '>');
+    DECLARE v_dir VARCHAR(4) DEFAULT IF(p_desc, 'DESC', 'ASC');
+
+    CASE p_sort
+        WHEN 'price' THEN
+            SET v_column = 'price';
+            SET v_value = 'CAST(@after_value AS DECIMAL(15, 2))';
+        WHEN 'created' THEN
+            SET v_column = 'created_at';
+            SET v_value = 'CAST(@after_value AS DATETIME(6))';
+        WHEN 'address' THEN
+            SET v_column = 'property_address';
+            SET v_value = '@after_value';
+        ELSE
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Invalid sort key';
+    END CASE;
+
+    SET @after_value = p_after_value;
+    SET @after_id = p_after_id;
+    SET @status = p_status;
+    SET @address = p_address;
+
+    SET @page_sql = CONCAT(
+        'SELECT property_id, tax_id, property_address, status, price, ',
+        'lot_size, year_built, zoning, property_tax, created_at, updated_at ',
+        'FROM Property WHERE 1 = 1',
+        IF(p_status IS NULL, '', ' AND status = @status'),
+        IF(p_address IS NULL, '', ' AND property_address LIKE @address'),
+        IF(p_after_id IS NULL, '', CONCAT(
+            ' AND ', v_column, ' ', v_cmp, '= ', v_value,
+            ' AND (', v_column, ' ', v_cmp, ' ', v_value,
+            ' OR property_id ', v_cmp, ' @after_id)'
+        )),
+        ' ORDER BY ', v_column, ' ', v_dir, ', property_id ', v_dir,
+        ' LIMIT ', p_limit
+    );
+
+    PREPARE page_stmt FROM @page_sql;
+    EXECUTE page_stmt;
+    DEALLOCATE PREPARE page_stmt;
+    SET @page_sql = NULL, @after_value = NULL, @after_id = NULL,
+        @status = NULL, @address = NULL;
+END //
+
+DROP PROCEDURE IF EXISTS admin_properties_count //
+CREATE PROCEDURE admin_properties_count(
+    IN p_status VARCHAR(20),
+    IN p_address VARCHAR(255),
+    IN p_cap INT
+)
+BEGIN
+    IF p_status IS NULL AND p_address IS NULL THEN
+        SELECT TABLE_ROWS as total, 'estimate' as `precision`
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Property';
+    ELSE
+        SELECT
+            COUNT(*) as total,
+            IF(COUNT(*) < p_cap, 'exact', 'at_least') as `precision`
+        FROM (
+            SELECT 1
+            FROM Property
+            WHERE (p_status IS NULL OR status = p_status)
+              AND (p_address IS NULL OR property_address LIKE p_address)
+            LIMIT p_cap
+        ) capped;
+    END IF;
+END //
+
+DROP PROCEDURE IF EXISTS admin_clients_page //
+CREATE PROCEDURE admin_clients_page(
+    IN p_sort VARCHAR(20),
+    IN p_desc BOOLEAN,
+    IN p_after_value VARCHAR(255),
+    IN p_after_id INT,
+    IN p_limit INT,
+    IN p_name VARCHAR(255)
+)
+BEGIN
+    DECLARE v_column VARCHAR(64);
+    DECLARE v_value VARCHAR(64);
+    DECLARE v_cmp CHAR(1) DEFAULT IF(p_desc, '<', '>');
+    DECLARE v_dir VARCHAR(4) DEFAULT IF(p_desc, 'DESC', 'ASC');
+
+    CASE p_sort
+        WHEN 'name' THEN
+            SET v_column = 'client_name';
+            SET v_value = '@after_value';
+        WHEN 'created' THEN
+            SET v_column = 'created_at';
+            SET v_value = 'CAST(@after_value AS DATETIME(6))';
+        ELSE
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Invalid sort key';
+    END CASE;
+
+    SET @after_value = p_after_value;
+    SET @after_id = p_after_id;
+    SET @name = p_name;
+
+    SET @page_sql = CONCAT(
+        'SELECT client_id, client_name, client_phone, client_email, ',
+        'mailing_address, created_at, updated_at ',
+        'FROM Client WHERE 1 = 1',
+        IF(p_name IS NULL, '', ' AND client_name LIKE @name'),
+        IF(p_after_id IS NULL, '', CONCAT(
+            ' AND ', v_column, ' ', v_cmp, '= ', v_value,
+            ' AND (', v_column, ' ', v_cmp, ' ', v_value,
+            ' OR client_id ', v_cmp, ' @after_id)'
+        )),
+        ' ORDER BY ', v_column, ' ', v_dir, ', client_id ', v_dir,
+        ' LIMIT ', p_limit
+    );
+
+    PREPARE page_stmt FROM @page_sql;
+    EXECUTE page_stmt;
+    DEALLOCATE PREPARE page_stmt;
+    SET @page_sql = NULL, @after_value = NULL, @after_id = NULL, @name = NULL;
+END //
+
+DROP PROCEDURE IF EXISTS admin_clients_count //
+CREATE PROCEDURE admin_clients_count(
+    IN p_name VARCHAR(255),
+    IN p_cap INT
+)
+BEGIN
+    IF p_name IS NULL THEN
+        SELECT TABLE_ROWS as total, 'estimate' as `precision`
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Client';
+    ELSE
+        SELECT
+            COUNT(*) as total,
+            IF(COUNT(*) < p_cap, 'exact', 'at_least') as `precision`
+        FROM (
+            SELECT 1 FROM Client WHERE client_name LIKE p_name LIMIT p_cap
+        ) capped;
+    END IF;
+END //
+
+DROP PROCEDURE IF EXISTS admin_agents_page //
+CREATE PROCEDURE admin_agents_page(
+    IN p_sort VARCHAR(20),
+    IN p_desc BOOLEAN,
+    IN p_after_value VARCHAR(255),
+    IN p_after_id INT,
+    IN p_limit INT,
+    IN p_name VARCHAR(255)
+)
+BEGIN
+    DECLARE v_column VARCHAR(64);
+    DECLARE v_value VARCHAR(64);
+    DECLARE v_cmp CHAR(1) DEFAULT IF(p_desc, '<', '>');
+    DECLARE v_dir VARCHAR(4) DEFAULT IF(p_desc, 'DESC', 'ASC');
+
+    CASE p_sort
+        WHEN 'name' THEN
+            SET v_column = 'agent_name';
+            SET v_value = '@after_value';
+        WHEN 'created' THEN
+            SET v_column = 'created_at';
+            SET v_value = 'CAST(@after_value AS DATETIME(6))';
+        ELSE
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Invalid sort key';
+    END CASE;
+
+    SET @after_value = p_after_value;
+    SET @after_id = p_after_id;
+    SET @name = p_name;
+
+    SET @page_sql = CONCAT(
+        'SELECT agent_id, NRDS, agent_name, agent_email, agent_phone, ',
+        'broker_id, license_number, license_expiration, created_at, updated_at ',
+        'FROM Agent WHERE 1 = 1',
+        IF(p_name IS NULL, '', ' AND agent_name LIKE @name'),
+        IF(p_after_id IS NULL, '', CONCAT(
+            ' AND ', v_column, ' ', v_cmp, '= ', v_value,
+            ' AND (', v_column, ' ', v_cmp, ' ', v_value,
+            ' OR agent_id ', v_cmp, ' @after_id)'
+        )),
+        ' ORDER BY ', v_column, ' ', v_dir, ', agent_id ', v_dir,
+        ' LIMIT ', p_limit
+    );
+
+    PREPARE page_stmt FROM @page_sql;
+    EXECUTE page_stmt;
+    DEALLOCATE PREPARE page_stmt;
+    SET @page_sql = NULL, @after_value = NULL, @after_id = NULL, @name = NULL;
+END //
+
+DROP PROCEDURE IF EXISTS admin_agents_count //
+CREATE PROCEDURE admin_agents_count(
+    IN p_name VARCHAR(255),
+    IN p_cap INT
+)
+BEGIN
+    IF p_name IS NULL THEN
+        SELECT TABLE_ROWS as total, 'estimate' as `precision`
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Agent';
+    ELSE
+        SELECT
+            COUNT(*) as total,
+            IF(COUNT(*) < p_cap, 'exact', 'at_least') as `precision`
+        FROM (
+            SELECT 1 FROM Agent WHERE agent_name LIKE p_name LIMIT p_cap
+        ) capped;
+    END IF;
+END //
+
+DELIMITER ;
@@ -36,6 +36,10 @@ BEGIN
         agent_role = p_agent_role,
         asking_price = p_asking_price,
         exclusive = p_exclusive;  -- Update 'exclusive' value
+
+    -- Bump the property's version so cached fragments re-render
+    UPDATE Property SET updated_at = CURRENT_TIMESTAMP(6)
+    WHERE property_id = p_property_id;
 END //
 
 -- First, a procedure to check what's in each table
@@ -235,7 +239,8 @@ BEGIN
         broker_id,
         license_number,
         license_expiration,
-        created_at
+        created_at,
+        updated_at
     FROM Agent
     ORDER BY agent_name ASC;
 END //
@@ -352,6 +357,12 @@ BEGIN
         broker_id = COALESCE(p_broker_id, broker_id)
     WHERE agent_id = p_agent_id;
 
+    -- Listing cards show the agent's name; bump their versions too
+    UPDATE Property p
+    JOIN AgentListing al ON al.property_id = p.property_id
+    SET p.updated_at = CURRENT_TIMESTAMP(6)
+    WHERE al.agent_id = p_agent_id;
+
     COMMIT;
 
     -- Return updated agent details
@@ -463,4 +474,110 @@ BEGIN
     ORDER BY month;
 END //
 
+-- Agent dashboard: listings, totals and upcoming showings in one round trip
+DROP PROCEDURE IF EXISTS get_agent_dashboard;
+CREATE PROCEDURE get_agent_dashboard(IN p_agent_id INT)
+BEGIN
+    -- Listings with primary image
+    SELECT 
+        p.*,
+        al.asking_price,
+        al.listing_date,
+        al.expiration_date,
+        pi.file_path AS image_url
+    FROM AgentListing al
+    JOIN Property p ON al.property_id = p.property_id
+    LEFT JOIN PropertyImages pi ON p.property_id = pi.property_id 
+        AND pi.is_primary = TRUE
+    WHERE al.agent_id = p_agent_id
+    ORDER BY al.listing_date DESC;
+
+    -- Totals
+    SELECT 
+        (
+            SELECT COUNT(*)
+            FROM AgentListing al
+            JOIN Property p ON al.property_id = p.property_id
+            WHERE al.agent_id = p_agent_id
+            AND p.status IN ('For Sale', 'For Lease')
+        ) AS active_listings,
+        (
+            SELECT COALESCE(SUM(t.amount), 0)
+            FROM Transaction t
+            WHERE t.agent_id = p_agent_id
+            AND t.transaction_type = 'Sale'
+        ) AS total_sales;
+
+    -- Upcoming showings
+    SELECT 
+        s.showing_id,
+        s.showing_date,
+        s.feedback,
+        p.property_id,
+        p.property_address,
+        c.client_id,
+        c.client_name
+    FROM AgentShowing s
+    JOIN Property p ON s.property_id = p.property_id
+    JOIN Client c ON s.client_id = c.client_id
+    WHERE s.agent_id = p_agent_id
+    AND s.showing_date >= CURDATE()
+    ORDER BY s.showing_date ASC;
+END //
+
+-- One keyset page of homepage listings, ordered by (price, property_id)
+-- descending. The inner seek reads only idx_price_property and never
+-- scans past the cursor; details are joined onto that page alone.
+DROP PROCEDURE IF EXISTS get_agent_listings_page //
+CREATE PROCEDURE get_agent_listings_page(
+    IN p_after_price DECIMAL(15, 2),
+    IN p_after_id INT,
+    IN p_limit INT
+)
+BEGIN
+    -- First page: start above the largest possible key, so the seek
+    -- predicate stays a plain range on the index
+    IF p_after_price IS NULL THEN
+        SET p_after_price = 9999999999999.99;
+        SET p_after_id = 2147483647;
+    END IF;
+
+    SELECT 
+        p.*,
+        al.agent_id,
+        a.agent_name,
+        a.agent_phone,
+        rp.bedrooms,
+        rp.bathrooms,
+        rp.r_type,
+        rp.square_feet,
+        rp.garage_spaces,
+        rp.has_basement,
+        rp.has_pool,
+        c.sqft,
+        c.industry,
+        c.c_type,
+        c.num_units,
+        c.parking_spaces,
+        c.zoning_type,
+        pi.file_path as image_url,
+        pi.image_id
+    FROM (
+        SELECT property_id, price
+        FROM Property
+        WHERE price <= p_after_price
+          AND (price < p_after_price OR property_id < p_after_id)
+        ORDER BY price DESC, property_id DESC
+        LIMIT p_limit
+    ) page
+    JOIN Property p ON p.property_id = page.property_id
+    LEFT JOIN AgentListing al ON p.property_id = al.property_id
+    LEFT JOIN Agent a ON al.agent_id = a.agent_id
+    LEFT JOIN ResidentialProperty rp ON p.property_id = rp.property_id
+    LEFT JOIN CommercialProperty c ON p.property_id = c.property_id
+    LEFT JOIN PropertyImages pi ON p.property_id = pi.property_id 
+        AND pi.is_primary = 1
+    ORDER BY page.price DESC, page.property_id DESC;
+END //
+
 DELIMITER ;
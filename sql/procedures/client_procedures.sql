@@ -38,7 +38,7 @@ BEGIN
         client_phone = COALESCE(p_client_phone, client_phone),
         client_email = COALESCE(p_client_email, client_email),
         mailing_address = COALESCE(p_mailing_address, mailing_address),
-        last_modified = NOW()
+        updated_at = CURRENT_TIMESTAMP(6)
     WHERE client_id = p_client_id;
 
     COMMIT;
@@ -63,7 +63,8 @@ BEGIN
         client_name,
         client_phone,
         client_email,
-        mailing_address
+        mailing_address,
+        updated_at
     FROM Client
     ORDER BY client_name ASC;
 END //
@@ -87,24 +88,98 @@ BEGIN
 END //
 
 -- Search Clients
+--
+-- Typeahead search over names, phones and emails, top p_limit ranked.
+-- Every branch is an index lookup capped at p_limit rows:
+--   1. exact email or phone (email_normalized / phone_digits)
+--   2. name prefix (idx_client_name)
+--   3. email or phone prefix
+--   4. name substring through the ngram FULLTEXT index
+-- Results are ordered by the best branch that matched, then FULLTEXT
+-- relevance, then name.
 DROP PROCEDURE IF EXISTS search_clients;
 CREATE PROCEDURE search_clients(
-    IN p_search_query VARCHAR(255)
+    IN p_search_query VARCHAR(255),
+    IN p_limit INT
 )
 BEGIN
-    SELECT 
-        client_id,
-        client_name,
-        client_phone,
-        client_email,
-        mailing_address,
-        created_at,
-        last_modified
-    FROM Client
-    WHERE client_name LIKE CONCAT('%', p_search_query, '%')
-       OR client_phone LIKE CONCAT('%', p_search_query, '%')
-       OR client_email LIKE CONCAT('%', p_search_query, '%')
-    ORDER BY client_name ASC;
+    DECLARE v_query VARCHAR(255) DEFAULT TRIM(p_search_query);
+    DECLARE v_prefix VARCHAR(520);
+    DECLARE v_email VARCHAR(255) DEFAULT LOWER(TRIM(p_search_query));
+    DECLARE v_digits VARCHAR(255) DEFAULT REGEXP_REPLACE(p_search_query, '[^0-9]', '');
+    DECLARE v_is_phone BOOLEAN DEFAULT
+        TRIM(p_search_query) REGEXP '^[0-9 ()+.-]+$' AND CHAR_LENGTH(v_digits) >= 3;
+
+    -- LIKE prefix with the wildcards in the query escaped
+    SET v_prefix = CONCAT(
+        REPLACE(REPLACE(REPLACE(v_query, '\\', '\\\\'), '%', '\\%'), '_', '\\_'),
+        '%'
+    );
+
+    IF v_query = '' THEN
+        SELECT client_id, client_name, client_phone, client_email,
+               mailing_address, created_at, updated_at
+        FROM Client WHERE FALSE;
+    ELSE
+        SELECT
+            c.client_id,
+            c.client_name,
+            c.client_phone,
+            c.client_email,
+            c.mailing_address,
+            c.created_at,
+            c.updated_at,
+            hits.tier as match_tier,
+            hits.relevance
+        FROM (
+            SELECT client_id, MIN(tier) as tier, MAX(relevance) as relevance
+            FROM (
+                (SELECT client_id, 1 as tier, 0 as relevance
+                 FROM Client
+                 WHERE email_normalized = v_email
+                 LIMIT p_limit)
+                UNION ALL
+                (SELECT client_id, 1, 0
+                 FROM Client
+                 WHERE v_is_phone AND phone_digits = v_digits
+                 LIMIT p_limit)
+                UNION ALL
+                (SELECT client_id, 2, 0
+                 FROM Client
+                 WHERE client_name LIKE v_prefix
+                 ORDER BY client_name, client_id
+                 LIMIT p_limit)
+                UNION ALL
+                (SELECT client_id, 3, 0
+                 FROM Client
+                 WHERE v_query NOT LIKE '% %' AND email_normalized LIKE LOWER(v_prefix)
+                 ORDER BY email_normalized
+                 LIMIT p_limit)
+                UNION ALL
+                (SELECT client_id, 3, 0
+                 FROM Client
+                 WHERE v_is_phone AND phone_digits LIKE CONCAT(v_digits, '%')
+                 ORDER BY phone_digits
+                 LIMIT p_limit)
+                UNION ALL
+                (SELECT client_id, 4,
+                        MATCH(client_name) AGAINST (
+                            CONCAT('"', REPLACE(v_query, '"', ''), '"') IN BOOLEAN MODE
+                        )
+                 FROM Client
+                 WHERE CHAR_LENGTH(v_query) >= 2
+                   AND MATCH(client_name) AGAINST (
+                       CONCAT('"', REPLACE(v_query, '"', ''), '"') IN BOOLEAN MODE
+                   )
+                 ORDER BY 3 DESC
+                 LIMIT p_limit)
+            ) candidates
+            GROUP BY client_id
+        ) hits
+        JOIN Client c ON c.client_id = hits.client_id
+        ORDER BY hits.tier, hits.relevance DESC, c.client_name, c.client_id
+        LIMIT p_limit;
+    END IF;
 END //
 
 DELIMITER ;
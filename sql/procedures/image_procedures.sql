@@ -38,11 +38,134 @@ BEGIN
     -- Insert new image
     INSERT INTO PropertyImages (property_id, file_path, is_primary)
     VALUES (p_property_id, p_file_path, p_is_primary);
+
+    -- Bump the property's version so cached fragments re-render
+    UPDATE Property SET updated_at = CURRENT_TIMESTAMP(6)
+    WHERE property_id = p_property_id;
     
     -- Return the new image id
     SELECT LAST_INSERT_ID() as image_id;
 END //
 
+-- Add an image whose file is in the content-addressed store, counting one
+-- more reference to it. A repeat upload of a processed file inherits the
+-- thumbnail and placeholder made for the first copy.
+DROP PROCEDURE IF EXISTS add_stored_image //
+CREATE PROCEDURE add_stored_image(
+    IN p_property_id INT,
+    IN p_sha256 CHAR(64),
+    IN p_extension VARCHAR(8),
+    IN p_size_bytes INT,
+    IN p_file_path VARCHAR(255),
+    IN p_is_primary BOOLEAN
+)
+BEGIN
+    DECLARE v_image_id INT;
+
+    IF p_is_primary THEN
+        UPDATE PropertyImages
+        SET is_primary = FALSE
+        WHERE property_id = p_property_id;
+    END IF;
+
+    -- The upsert locks the blob row until commit; the caller stores the
+    -- file meanwhile, so a delete can't remove it underneath (see
+    -- lock_image_blob)
+    INSERT INTO ImageBlob (sha256, extension, size_bytes, ref_count)
+    VALUES (p_sha256, p_extension, p_size_bytes, 1)
+    ON DUPLICATE KEY UPDATE ref_count = ref_count + 1;
+
+    INSERT INTO PropertyImages (
+        property_id, file_path, sha256, is_primary,
+        thumbnail_path, placeholder, width, height
+    )
+    SELECT
+        p_property_id, p_file_path, p_sha256, p_is_primary,
+        done.thumbnail_path, done.placeholder, done.width, done.height
+    FROM (SELECT 1) AS one
+    LEFT JOIN (
+        SELECT thumbnail_path, placeholder, width, height
+        FROM PropertyImages
+        WHERE sha256 = p_sha256 AND thumbnail_path IS NOT NULL
+        LIMIT 1
+    ) AS done ON TRUE;
+    SET v_image_id = LAST_INSERT_ID();
+
+    -- Bump the property's version so cached fragments re-render
+    UPDATE Property SET updated_at = CURRENT_TIMESTAMP(6)
+    WHERE property_id = p_property_id;
+
+    SELECT pi.image_id, pi.thumbnail_path, b.ref_count
+    FROM PropertyImages pi
+    JOIN ImageBlob b ON b.sha256 = pi.sha256
+    WHERE pi.image_id = v_image_id;
+END //
+
+-- add_stored_image for a batch of stored files, with one INSERT for all
+-- of their PropertyImages rows. p_images is a JSON array of
+-- {"sha256", "extension", "size_bytes", "file_path"} objects with distinct
+-- hashes; returns image_id, sha256, thumbnail_path and ref_count for each.
+DROP PROCEDURE IF EXISTS add_stored_images //
+CREATE PROCEDURE add_stored_images(
+    IN p_property_id INT,
+    IN p_images JSON
+)
+BEGIN
+    DECLARE v_first_id INT;
+
+    -- Locks each blob row until commit, as in add_stored_image; in hash
+    -- order, so concurrent batches sharing images take them alike
+    INSERT INTO ImageBlob (sha256, extension, size_bytes, ref_count)
+    SELECT batch.sha256, batch.extension, batch.size_bytes, 1
+    FROM JSON_TABLE(p_images, '$[*]' COLUMNS (
+        sha256 CHAR(64) PATH '$.sha256',
+        extension VARCHAR(8) PATH '$.extension',
+        size_bytes INT PATH '$.size_bytes'
+    )) AS batch
+    ORDER BY batch.sha256
+    ON DUPLICATE KEY UPDATE ref_count = ImageBlob.ref_count + 1;
+
+    INSERT INTO PropertyImages (
+        property_id, file_path, sha256, is_primary,
+        thumbnail_path, placeholder, width, height
+    )
+    SELECT
+        p_property_id, batch.file_path, batch.sha256, FALSE,
+        done.thumbnail_path, done.placeholder, done.width, done.height
+    FROM JSON_TABLE(p_images, '$[*]' COLUMNS (
+        position FOR ORDINALITY,
+        sha256 CHAR(64) PATH '$.sha256',
+        file_path VARCHAR(255) PATH '$.file_path'
+    )) AS batch
+    -- Repeats of already processed uploads inherit their derivatives
+    LEFT JOIN PropertyImages done ON done.image_id = (
+        SELECT MIN(processed.image_id)
+        FROM PropertyImages processed
+        WHERE processed.sha256 = batch.sha256
+          AND processed.thumbnail_path IS NOT NULL
+    )
+    ORDER BY batch.position;
+    -- The first id of the batch; the rest follow it
+    SET v_first_id = LAST_INSERT_ID();
+
+    -- Bump the property's version so cached fragments re-render
+    UPDATE Property SET updated_at = CURRENT_TIMESTAMP(6)
+    WHERE property_id = p_property_id;
+
+    SELECT pi.image_id, pi.sha256, pi.thumbnail_path, b.ref_count
+    FROM PropertyImages pi
+    JOIN ImageBlob b ON b.sha256 = pi.sha256
+    WHERE pi.property_id = p_property_id
+      AND pi.image_id >= v_first_id
+      AND pi.sha256 IN (
+          SELECT sha256
+          FROM JSON_TABLE(p_images, '$[*]' COLUMNS (
+              sha256 CHAR(64) PATH '$.sha256'
+          )) AS batch
+      )
+    ORDER BY pi.image_id;
+END //
+
 CREATE PROCEDURE get_property_images(
     IN p_property_id INT
 )
@@ -52,7 +175,11 @@ BEGIN
         property_id,
         file_path,
         is_primary,
-        uploaded_at
+        uploaded_at,
+        thumbnail_path,
+        placeholder,
+        width,
+        height
     FROM PropertyImages
     WHERE property_id = p_property_id
     ORDER BY is_primary DESC, uploaded_at DESC;
@@ -77,6 +204,10 @@ BEGIN
     UPDATE PropertyImages 
     SET is_primary = TRUE 
     WHERE image_id = p_image_id;
+
+    -- Bump the property's version so cached fragments re-render
+    UPDATE Property SET updated_at = CURRENT_TIMESTAMP(6)
+    WHERE property_id = v_property_id;
     
     -- Return property_id for refresh
     SELECT p_image_id as image_id, v_property_id as property_id;
@@ -86,8 +217,95 @@ CREATE PROCEDURE delete_property_image(
     IN p_image_id INT
 )
 BEGIN
+    DECLARE v_property_id INT;
+    DECLARE v_sha256 CHAR(64);
+    DECLARE v_extension VARCHAR(8);
+    DECLARE v_remaining INT DEFAULT NULL;
+    SELECT property_id, sha256 INTO v_property_id, v_sha256
+    FROM PropertyImages
+    WHERE image_id = p_image_id;
+
     DELETE FROM PropertyImages 
     WHERE image_id = p_image_id;
+
+    -- Drop the reference; the last one removes the blob row, and the
+    -- caller removes the file once this commits (see lock_image_blob)
+    IF v_sha256 IS NOT NULL THEN
+        SELECT ref_count, extension INTO v_remaining, v_extension
+        FROM ImageBlob
+        WHERE sha256 = v_sha256
+        FOR UPDATE;
+        SET v_remaining = v_remaining - 1;
+        UPDATE ImageBlob SET ref_count = v_remaining
+        WHERE sha256 = v_sha256;
+        IF v_remaining <= 0 THEN
+            DELETE FROM ImageBlob WHERE sha256 = v_sha256;
+        END IF;
+    END IF;
+
+    -- Bump the property's version so cached fragments re-render
+    UPDATE Property SET updated_at = CURRENT_TIMESTAMP(6)
+    WHERE property_id = v_property_id;
+
+    SELECT
+        v_property_id AS property_id,
+        v_sha256 AS sha256,
+        v_extension AS extension,
+        v_remaining AS ref_count;
+END //
+
+-- Lock a blob's row, or the gap where it would be, until the caller
+-- commits. After the last reference is deleted and committed, the caller
+-- removes the file only if this returns no row; an upload of the same
+-- content waits on the lock to insert its row and so stores the file anew.
+DROP PROCEDURE IF EXISTS lock_image_blob //
+CREATE PROCEDURE lock_image_blob(
+    IN p_sha256 CHAR(64)
+)
+BEGIN
+    SELECT sha256, ref_count
+    FROM ImageBlob
+    WHERE sha256 = p_sha256
+    FOR UPDATE;
+END //
+
+-- Record what the image pipeline produced for an upload
+DROP PROCEDURE IF EXISTS set_image_derivatives //
+CREATE PROCEDURE set_image_derivatives(
+    IN p_image_id INT,
+    IN p_thumbnail_path VARCHAR(255),
+    IN p_placeholder VARCHAR(4096),
+    IN p_width INT,
+    IN p_height INT
+)
+BEGIN
+    DECLARE v_sha256 CHAR(64);
+    SELECT sha256 INTO v_sha256
+    FROM PropertyImages
+    WHERE image_id = p_image_id;
+
+    -- Every image sharing the stored file shares its derivatives
+    UPDATE PropertyImages
+    SET thumbnail_path = p_thumbnail_path,
+        placeholder = p_placeholder,
+        width = p_width,
+        height = p_height
+    WHERE image_id = p_image_id
+       OR (v_sha256 IS NOT NULL AND sha256 = v_sha256);
+
+    -- Bump the properties' versions so cached fragments re-render
+    UPDATE Property SET updated_at = CURRENT_TIMESTAMP(6)
+    WHERE property_id IN (
+        SELECT property_id FROM PropertyImages
+        WHERE image_id = p_image_id
+           OR (v_sha256 IS NOT NULL AND sha256 = v_sha256)
+    );
+
+    -- The properties whose image lists changed
+    SELECT DISTINCT property_id
+    FROM PropertyImages
+    WHERE image_id = p_image_id
+       OR (v_sha256 IS NOT NULL AND sha256 = v_sha256);
 END //
 
 CREATE PROCEDURE get_image_info(
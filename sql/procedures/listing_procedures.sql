@@ -0,0 +1,92 @@
+DELIMITER //
+
+-- Search documents: one row per property with the columns the search
+-- index tokenizes and filters on, plus the ones the listing card renders.
+-- agent_name is the most recent listing agent (what the card shows);
+-- agent_names carries every listing agent for the agent-name postings.
+-- latitude/longitude place the listing in the index's geo grid.
+
+DROP PROCEDURE IF EXISTS get_search_documents //
+CREATE PROCEDURE get_search_documents()
+BEGIN
+    SELECT
+        p.property_id,
+        p.property_address,
+        p.status,
+        p.price,
+        p.updated_at,
+        p.latitude,
+        p.longitude,
+        CASE
+            WHEN rp.property_id IS NOT NULL THEN 'Residential'
+            WHEN c.property_id IS NOT NULL THEN 'Commercial'
+        END as property_type,
+        rp.bedrooms,
+        (
+            SELECT a.agent_name
+            FROM AgentListing al
+            JOIN Agent a ON a.agent_id = al.agent_id
+            WHERE al.property_id = p.property_id
+            ORDER BY al.listing_date DESC, al.listing_id DESC
+            LIMIT 1
+        ) as agent_name,
+        (
+            SELECT GROUP_CONCAT(DISTINCT a.agent_name SEPARATOR '|')
+            FROM AgentListing al
+            JOIN Agent a ON a.agent_id = al.agent_id
+            WHERE al.property_id = p.property_id
+        ) as agent_names,
+        (
+            SELECT pi.file_path
+            FROM PropertyImages pi
+            WHERE pi.property_id = p.property_id AND pi.is_primary = 1
+            LIMIT 1
+        ) as image_url
+    FROM Property p
+    LEFT JOIN ResidentialProperty rp ON p.property_id = rp.property_id
+    LEFT JOIN CommercialProperty c ON p.property_id = c.property_id;
+END //
+
+DROP PROCEDURE IF EXISTS get_search_document //
+CREATE PROCEDURE get_search_document(IN p_property_id INT)
+BEGIN
+    SELECT
+        p.property_id,
+        p.property_address,
+        p.status,
+        p.price,
+        p.updated_at,
+        p.latitude,
+        p.longitude,
+        CASE
+            WHEN rp.property_id IS NOT NULL THEN 'Residential'
+            WHEN c.property_id IS NOT NULL THEN 'Commercial'
+        END as property_type,
+        rp.bedrooms,
+        (
+            SELECT a.agent_name
+            FROM AgentListing al
+            JOIN Agent a ON a.agent_id = al.agent_id
+            WHERE al.property_id = p.property_id
+            ORDER BY al.listing_date DESC, al.listing_id DESC
+            LIMIT 1
+        ) as agent_name,
+        (
+            SELECT GROUP_CONCAT(DISTINCT a.agent_name SEPARATOR '|')
+            FROM AgentListing al
+            JOIN Agent a ON a.agent_id = al.agent_id
+            WHERE al.property_id = p.property_id
+        ) as agent_names,
+        (
+            SELECT pi.file_path
+            FROM PropertyImages pi
+            WHERE pi.property_id = p.property_id AND pi.is_primary = 1
+            LIMIT 1
+        ) as image_url
+    FROM Property p
+    LEFT JOIN ResidentialProperty rp ON p.property_id = rp.property_id
+    LEFT JOIN CommercialProperty c ON p.property_id = c.property_id
+    WHERE p.property_id = p_property_id;
+END //
+
+DELIMITER ;
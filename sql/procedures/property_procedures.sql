@@ -27,6 +27,10 @@ BEGIN
         garage_spaces = p_garage_spaces,
         has_basement = p_has_basement,
         has_pool = p_has_pool;
+
+    -- Bump the property's version so cached fragments re-render
+    UPDATE Property SET updated_at = CURRENT_TIMESTAMP(6)
+    WHERE property_id = p_property_id;
 END //
 
 CREATE PROCEDURE update_commercial_property(
@@ -54,6 +58,10 @@ BEGIN
         num_units = p_num_units,
         parking_spaces = p_parking_spaces,
         zoning_type = p_zoning_type;
+
+    -- Bump the property's version so cached fragments re-render
+    UPDATE Property SET updated_at = CURRENT_TIMESTAMP(6)
+    WHERE property_id = p_property_id;
 END //
 
 CREATE PROCEDURE get_property_details_with_images(
@@ -317,65 +325,145 @@ BEGIN
     WHERE p.property_id = p_property_id;
 END //
 
--- Search properties
+-- Search properties.
+--
+-- One keyset page of listing cards: rows strictly after
+-- (p_after_value, p_after_id) in the requested order, at most p_limit
+-- properties. Sort keys are whitelisted and map to fixed columns, each
+-- backed by a (column, property_id) index and a (status, column,
+-- property_id) one for the status filter, so the seek walks an index
+-- from the cursor and stops after p_limit matches. Only the ids of the
+-- page are sought; card details are joined onto that page alone. Every
+-- value is bound through a user variable. p_after_id NULL means the
+-- first page. p_property_type is 'Residential' or 'Commercial'.
 
-DROP PROCEDURE IF EXISTS search_properties;
+DROP PROCEDURE IF EXISTS search_properties //
 CREATE PROCEDURE search_properties(
-    IN p_min_price DECIMAL(10, 2),
-    IN p_max_price DECIMAL(10, 2),
-    IN p_page INT,
-    IN p_page_size INT,
-    IN p_sort_by VARCHAR(50),
-    IN p_sort_direction VARCHAR(4)
+    IN p_sort VARCHAR(20),
+    IN p_desc BOOLEAN,
+    IN p_after_value VARCHAR(255),
+    IN p_after_id INT,
+    IN p_limit INT,
+    IN p_status VARCHAR(20),
+    IN p_property_type VARCHAR(20),
+    IN p_min_price DECIMAL(15, 2),
+    IN p_max_price DECIMAL(15, 2)
 )
 BEGIN
-    -- All DECLARE statements must be at the start of the BEGIN block
-    DECLARE v_offset INT;
-    DECLARE v_sort_clause VARCHAR(100);
+    DECLARE v_column VARCHAR(64);
+    DECLARE v_value VARCHAR(64);
+    DECLARE v_cmp CHAR(1) DEFAULT IF(p_desc, '<', '>');
+    DECLARE v_dir VARCHAR(4) DEFAULT IF(p_desc, 'DESC', 'ASC');
 
-    -- Calculate offset for pagination
-    SET v_offset = (p_page - 1) * p_page_size;
+    CASE p_sort
+        WHEN 'price' THEN
+            SET v_column = 'price';
+            SET v_value = 'CAST(@after_value AS DECIMAL(15, 2))';
+        WHEN 'newest' THEN
+            SET v_column = 'created_at';
+            SET v_value = 'CAST(@after_value AS DATETIME(6))';
+        WHEN 'address' THEN
+            SET v_column = 'property_address';
+            SET v_value = '@after_value';
+        ELSE
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Invalid sort key';
+    END CASE;
 
-    -- Build dynamic sort clause
-    SET v_sort_clause = CASE 
-        WHEN p_sort_by IS NULL THEN 'p.created_at DESC'
-        ELSE CONCAT(p_sort_by, ' ', COALESCE(p_sort_direction, 'ASC'))
-    END;
+    SET @after_value = p_after_value;
+    SET @after_id = p_after_id;
+    SET @status = p_status;
+    SET @min_price = p_min_price;
+    SET @max_price = p_max_price;
 
-    -- Execute the query
-    SET @query = CONCAT(
+    SET @page_sql = CONCAT(
         'SELECT p.*, ',
-        '       CASE ',
-        '           WHEN r.property_id IS NOT NULL THEN ''RESIDENTIAL'' ',
-        '           WHEN c.property_id IS NOT NULL THEN ''COMMERCIAL'' ',
-        '       END AS property_type, ',
-        '       r.bedrooms, ',
-        '       r.bathrooms, ',
-        '       r.square_feet AS residential_sqft, ',
-        '       r.has_pool, ',
-        '       r.has_basement, ',
-        '       c.sqft AS commercial_sqft, ',
-        '       c.num_units, ',
-        '       al.asking_price AS current_asking_price, ',
-        '       a.agent_name AS listing_agent, ',
-        '       pi.file_path AS primary_image ',
-        'FROM Properties p ',
-        'LEFT JOIN ResidentialProperty r ON p.property_id = r.property_id ',
-        'LEFT JOIN CommercialProperty c ON p.property_id = c.property_id ',
+        'CASE WHEN rp.property_id IS NOT NULL THEN ''Residential'' ',
+        'WHEN c.property_id IS NOT NULL THEN ''Commercial'' END AS property_type, ',
+        'al.agent_id, a.agent_name, a.agent_phone, ',
+        'rp.bedrooms, rp.bathrooms, rp.r_type, rp.square_feet, ',
+        'rp.garage_spaces, rp.has_basement, rp.has_pool, ',
+        'c.sqft, c.industry, c.c_type, c.num_units, c.parking_spaces, c.zoning_type, ',
+        'pi.file_path AS image_url, pi.image_id ',
+        'FROM (SELECT property_id FROM Property seek WHERE 1 = 1',
+        IF(p_status IS NULL, '', ' AND status = @status'),
+        IF(p_min_price IS NULL, '', ' AND price >= @min_price'),
+        IF(p_max_price IS NULL, '', ' AND price <= @max_price'),
+        CASE p_property_type
+            WHEN 'Residential' THEN ' AND EXISTS (SELECT 1 FROM ResidentialProperty r WHERE r.property_id = seek.property_id)'
+            WHEN 'Commercial' THEN ' AND EXISTS (SELECT 1 FROM CommercialProperty r WHERE r.property_id = seek.property_id)'
+            ELSE IF(p_property_type IS NULL, '', ' AND FALSE')
+        END,
+        IF(p_after_id IS NULL, '', CONCAT(
+            ' AND ', v_column, ' ', v_cmp, '= ', v_value,
+            ' AND (', v_column, ' ', v_cmp, ' ', v_value,
+            ' OR property_id ', v_cmp, ' @after_id)'
+        )),
+        ' ORDER BY ', v_column, ' ', v_dir, ', property_id ', v_dir,
+        ' LIMIT ', p_limit, ') page ',
+        'JOIN Property p ON p.property_id = page.property_id ',
         'LEFT JOIN AgentListing al ON p.property_id = al.property_id ',
-        '       AND al.expiration_date > CURDATE() ',
-        'LEFT JOIN Agents a ON al.agent_id = a.agent_id ',
-        'LEFT JOIN PropertyImages pi ON p.property_id = pi.property_id ',
-        '       AND pi.is_primary = TRUE ',
-        'WHERE (p_min_price IS NULL OR p.price >= p_min_price) ',
-        '  AND (p_max_price IS NULL OR p.price <= p_max_price) ',
-        'ORDER BY ', v_sort_clause, ' ',
-        'LIMIT ', p_page_size, ' OFFSET ', v_offset
+        'LEFT JOIN Agent a ON al.agent_id = a.agent_id ',
+        'LEFT JOIN ResidentialProperty rp ON p.property_id = rp.property_id ',
+        'LEFT JOIN CommercialProperty c ON p.property_id = c.property_id ',
+        'LEFT JOIN PropertyImages pi ON p.property_id = pi.property_id AND pi.is_primary = 1 ',
+        'ORDER BY p.', v_column, ' ', v_dir, ', p.property_id ', v_dir
     );
 
-    PREPARE stmt FROM @query;
-    EXECUTE stmt;
-    DEALLOCATE PREPARE stmt;
+    PREPARE page_stmt FROM @page_sql;
+    EXECUTE page_stmt;
+    DEALLOCATE PREPARE page_stmt;
+    SET @page_sql = NULL, @after_value = NULL, @after_id = NULL,
+        @status = NULL, @min_price = NULL, @max_price = NULL;
+END //
+
+-- Result count for search_properties: the InnoDB row estimate when
+-- unfiltered, otherwise an exact count that stops at p_cap. precision is
+-- 'estimate', 'exact' or 'at_least'.
+DROP PROCEDURE IF EXISTS search_properties_count //
+CREATE PROCEDURE search_properties_count(
+    IN p_status VARCHAR(20),
+    IN p_property_type VARCHAR(20),
+    IN p_min_price DECIMAL(15, 2),
+    IN p_max_price DECIMAL(15, 2),
+    IN p_cap INT
+)
+BEGIN
+    IF p_status IS NULL AND p_property_type IS NULL
+       AND p_min_price IS NULL AND p_max_price IS NULL THEN
+        SELECT TABLE_ROWS as total, 'estimate' as `precision`
+        FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Property';
+    ELSE
+        SELECT
+            COUNT(*) as total,
+            IF(COUNT(*) < p_cap, 'exact', 'at_least') as `precision`
+        FROM (
+            SELECT 1
+            FROM Property p
+            WHERE (p_status IS NULL OR p.status = p_status)
+              AND (p_min_price IS NULL OR p.price >= p_min_price)
+              AND (p_max_price IS NULL OR p.price <= p_max_price)
+              AND (p_property_type IS NULL
+                   OR (p_property_type = 'Residential' AND EXISTS (
+                       SELECT 1 FROM ResidentialProperty r WHERE r.property_id = p.property_id))
+                   OR (p_property_type = 'Commercial' AND EXISTS (
+                       SELECT 1 FROM CommercialProperty c WHERE c.property_id = p.property_id)))
+            LIMIT p_cap
+        ) capped;
+    END IF;
+END //
+
+-- Store a property's geocoded position (NULLs when it couldn't be placed)
+DROP PROCEDURE IF EXISTS set_property_location //
+CREATE PROCEDURE set_property_location(
+    IN p_property_id INT,
+    IN p_latitude DECIMAL(9, 6),
+    IN p_longitude DECIMAL(9, 6)
+)
+BEGIN
+    UPDATE Property
+    SET latitude = p_latitude, longitude = p_longitude
+    WHERE property_id = p_property_id;
 END //
 
 -- Update property
@@ -448,4 +536,136 @@ BEGIN
     END IF;
 END //
 
+-- Property detail page: details, agent and images in one round trip
+DROP PROCEDURE IF EXISTS get_property_detail_page;
+CREATE PROCEDURE get_property_detail_page(IN p_property_id INT)
+BEGIN
+    -- Property with agent and residential/commercial details
+    SELECT 
+        p.*,
+        a.agent_id,
+        a.agent_name,
+        a.agent_phone,
+        a.agent_email,
+        rp.bedrooms,
+        rp.bathrooms,
+        rp.r_type,
+        rp.square_feet,
+        rp.garage_spaces,
+        rp.has_basement,
+        rp.has_pool,
+        c.sqft,
+        c.industry,
+        c.c_type,
+        c.num_units,
+        c.parking_spaces,
+        c.zoning_type
+    FROM Property p
+    LEFT JOIN AgentListing al ON p.property_id = al.property_id
+    LEFT JOIN Agent a ON al.agent_id = a.agent_id
+    LEFT JOIN ResidentialProperty rp ON p.property_id = rp.property_id
+    LEFT JOIN CommercialProperty c ON p.property_id = c.property_id
+    WHERE p.property_id = p_property_id
+    LIMIT 1;
+
+    -- Images, primary first
+    SELECT 
+        image_id,
+        property_id,
+        file_path,
+        is_primary,
+        uploaded_at
+    FROM PropertyImages
+    WHERE property_id = p_property_id
+    ORDER BY is_primary DESC, uploaded_at DESC;
+END //
+
+-- Admin property edit form: property, images and select options in one round trip
+DROP PROCEDURE IF EXISTS get_property_form_page;
+CREATE PROCEDURE get_property_form_page(IN p_property_id INT)
+BEGIN
+    -- Property with its listing and type-specific details
+    SELECT 
+        p.*,
+        CASE 
+            WHEN rp.property_id IS NOT NULL THEN 'RESIDENTIAL'
+            WHEN cp.property_id IS NOT NULL THEN 'COMMERCIAL'
+        END AS property_type,
+        al.agent_id,
+        al.client_id,
+        rp.bedrooms,
+        rp.bathrooms,
+        rp.r_type,
+        rp.square_feet,
+        rp.garage_spaces,
+        rp.has_basement,
+        rp.has_pool,
+        cp.sqft,
+        cp.industry,
+        cp.c_type,
+        cp.num_units,
+        cp.parking_spaces,
+        cp.zoning_type
+    FROM Property p
+    LEFT JOIN AgentListing al ON p.property_id = al.property_id
+    LEFT JOIN ResidentialProperty rp ON p.property_id = rp.property_id
+    LEFT JOIN CommercialProperty cp ON p.property_id = cp.property_id
+    WHERE p.property_id = p_property_id
+    LIMIT 1;
+
+    -- Images, primary first
+    SELECT 
+        image_id,
+        property_id,
+        file_path,
+        is_primary,
+        uploaded_at
+    FROM PropertyImages
+    WHERE property_id = p_property_id
+    ORDER BY is_primary DESC, uploaded_at DESC;
+
+    -- Agent options
+    SELECT agent_id, agent_name, agent_phone
+    FROM Agent
+    ORDER BY agent_name ASC;
+
+    -- Client options
+    SELECT client_id, client_name
+    FROM Client
+    ORDER BY client_name ASC;
+END //
+
+-- Summary numbers for the admin properties table
+DROP PROCEDURE IF EXISTS get_property_stats //
+CREATE PROCEDURE get_property_stats()
+BEGIN
+    SELECT 
+        COUNT(*) as total_properties,
+        COALESCE(SUM(status IN ('For Sale', 'For Lease')), 0) as active_listings,
+        COALESCE(SUM(price), 0) as total_value,
+        COALESCE(AVG(price), 0) as avg_price
+    FROM Property;
+END //
+
+-- Version probes for conditional GETs. Child-row writes bump
+-- Property.updated_at; the listings version row (see schema.sql) also
+-- moves on inserts and deletes, and is one primary-key lookup.
+DROP PROCEDURE IF EXISTS get_listings_version //
+CREATE PROCEDURE get_listings_version()
+BEGIN
+    SELECT
+        version,
+        changed_at as last_modified
+    FROM ListingsVersion
+    WHERE version_id = 1;
+END //
+
+DROP PROCEDURE IF EXISTS get_property_version //
+CREATE PROCEDURE get_property_version(IN p_property_id INT)
+BEGIN
+    SELECT updated_at as last_modified
+    FROM Property
+    WHERE property_id = p_property_id;
+END //
+
 DELIMITER ;
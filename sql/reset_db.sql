@@ -15,6 +15,7 @@ SOURCE procedures/listing_procedures.sql
 SOURCE procedures/image_procedures.sql
 SOURCE procedures/transaction_procedures.sql
 SOURCE procedures/dashboard_procedures.sql
+SOURCE procedures/admin_table_procedures.sql
 
 -- Insert brokerage
 INSERT INTO Brokerage (
@@ -45,8 +45,11 @@ CREATE TABLE Agent (
     license_number VARCHAR(50) UNIQUE NOT NULL,
     license_expiration DATE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
     FOREIGN KEY (broker_id) REFERENCES Brokerage(broker_id),
-    INDEX idx_agent_name (agent_name)
+    -- (sort column, id) pairs for the admin table keyset pages
+    INDEX idx_agent_name (agent_name, agent_id),
+    INDEX idx_agent_created (created_at, agent_id)
 );
 
 -- Client Table
@@ -58,7 +61,19 @@ CREATE TABLE Client (
     mailing_address VARCHAR(255),
     client_phone VARCHAR(15),
     client_email VARCHAR(255),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    -- Normalized copies for client search: digits only, and lowercased
+    phone_digits VARCHAR(15)
+        GENERATED ALWAYS AS (REGEXP_REPLACE(client_phone, '[^0-9]', '')) STORED,
+    email_normalized VARCHAR(255)
+        GENERATED ALWAYS AS (LOWER(TRIM(client_email))) STORED,
+    INDEX idx_client_name (client_name, client_id),
+    INDEX idx_client_created (created_at, client_id),
+    INDEX idx_client_phone_digits (phone_digits),
+    INDEX idx_client_email_normalized (email_normalized),
+    -- Substring matches on names without a leading-wildcard scan
+    FULLTEXT INDEX ft_client_name (client_name) WITH PARSER ngram
 );
 
 -- Client Roles Table
@@ -83,13 +98,52 @@ CREATE TABLE Property (
     year_built INT,
     zoning VARCHAR(50),
     property_tax DECIMAL(10, 2),
+    -- Geocoded from the offline gazetteer; NULL when the address isn't in it.
+    -- Area searches use the in-process grid, not a database index.
+    latitude DECIMAL(9, 6),
+    longitude DECIMAL(9, 6),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    INDEX idx_status (status),
-    INDEX idx_price (price),
-    INDEX idx_address (property_address)
+    -- Microsecond precision: rendered fragments are cached by this version
+    updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    -- Status filter combined with the price sort in admin tables and
+    -- search_properties; the two below back its other sort keys
+    INDEX idx_status (status, price, property_id),
+    INDEX idx_status_created (status, created_at, property_id),
+    INDEX idx_status_address (status, property_address, property_id),
+    -- Keyset order for homepage pages; also serves price range filters
+    INDEX idx_price_property (price, property_id),
+    INDEX idx_created_property (created_at, property_id),
+    INDEX idx_address (property_address, property_id)
+);
+
+-- Listings version: a single row the triggers below bump on every Property
+-- insert, update and delete. Child-row writes touch Property.updated_at, so
+-- they bump it too. Version probes read this row instead of scanning
+-- Property; the cost is that Property writes queue on its row lock.
+DROP TABLE IF EXISTS ListingsVersion;
+CREATE TABLE ListingsVersion (
+    version_id TINYINT PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    changed_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)
 );
 
+INSERT INTO ListingsVersion (version_id) VALUES (1);
+
+CREATE TRIGGER property_insert_version AFTER INSERT ON Property FOR EACH ROW
+    UPDATE ListingsVersion
+    SET version = version + 1, changed_at = CURRENT_TIMESTAMP(6)
+    WHERE version_id = 1;
+
+CREATE TRIGGER property_update_version AFTER UPDATE ON Property FOR EACH ROW
+    UPDATE ListingsVersion
+    SET version = version + 1, changed_at = CURRENT_TIMESTAMP(6)
+    WHERE version_id = 1;
+
+CREATE TRIGGER property_delete_version AFTER DELETE ON Property FOR EACH ROW
+    UPDATE ListingsVersion
+    SET version = version + 1, changed_at = CURRENT_TIMESTAMP(6)
+    WHERE version_id = 1;
+
 -- Residential Property Table
 DROP TABLE IF EXISTS ResidentialProperty;
 CREATE TABLE ResidentialProperty (
@@ -138,13 +192,34 @@ CREATE TABLE AgentListing (
     INDEX idx_listing_date (listing_date)
 );
 
+-- Content-addressed image files, one row per distinct upload. Stored at
+-- media/<hash[0:2]>/<hash[2:4]>/<hash><extension>; ref_count is the number
+-- of PropertyImages rows using the file, which is removed at zero
+DROP TABLE IF EXISTS ImageBlob;
+CREATE TABLE ImageBlob (
+    sha256 CHAR(64) PRIMARY KEY,
+    extension VARCHAR(8) NOT NULL,
+    size_bytes INT NOT NULL,
+    ref_count INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 CREATE TABLE PropertyImages (
     image_id INT PRIMARY KEY AUTO_INCREMENT,
     property_id INT NOT NULL,
     file_path VARCHAR(255) NOT NULL,
+    sha256 CHAR(64),  -- NULL for images stored before ImageBlob
     is_primary BOOLEAN DEFAULT FALSE,
     uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (property_id) REFERENCES Property(property_id) ON DELETE CASCADE
+    -- Filled in by the background image pipeline once the upload is
+    -- processed; NULL until then (and for images added outside it)
+    thumbnail_path VARCHAR(255),
+    placeholder VARCHAR(4096),  -- tiny blurred preview as a data: URI
+    width INT,
+    height INT,
+    FOREIGN KEY (property_id) REFERENCES Property(property_id) ON DELETE CASCADE,
+    FOREIGN KEY (sha256) REFERENCES ImageBlob(sha256),
+    INDEX idx_sha256 (sha256)
 );
 
 -- Agent Showing Table
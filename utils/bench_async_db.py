@@ -0,0 +1,104 @@
+"""
+Benchmark concurrent procedure calls with and without the db executor.
+
+"blocking" calls execute_procedure_sync straight from the coroutine, which is
+what every route did before execute_procedure became awaitable. "async" awaits
+execute_procedure, so the round trip happens on the db executor and the event
+loop stays free. A heartbeat task records how late the loop wakes up, which is
+the latency every other request on the worker would see.
+
+Usage:
+    python utils/bench_async_db.py --requests 200 --concurrency 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import (  # noqa: E402
+    execute_procedure,
+    execute_procedure_sync,
+    pool,
+    run_in_db_executor,
+    shutdown_db_executor,
+)
+
+
+async def heartbeat(stop: asyncio.Event, lags: list, interval: float = 0.005):
+    """Record how far past its deadline the loop wakes this task up"""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def blocking_request(procedure: str):
+    conn = pool.checkout()
+    try:
+        return execute_procedure_sync(conn, procedure)
+    finally:
+        pool.checkin(conn)
+
+
+async def async_request(procedure: str):
+    conn = await run_in_db_executor(pool.checkout)
+    try:
+        return await execute_procedure(conn, procedure)
+    finally:
+        await run_in_db_executor(pool.checkin, conn)
+
+
+async def run(mode: str, procedure: str, requests: int, concurrency: int) -> dict:
+    handler = blocking_request if mode == "blocking" else async_request
+    semaphore = asyncio.Semaphore(concurrency)
+    stop = asyncio.Event()
+    lags = []
+
+    async def one():
+        async with semaphore:
+            await handler(procedure)
+
+    ticker = asyncio.create_task(heartbeat(stop, lags))
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    lags.sort()
+    return {
+        "mode": mode,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(requests / elapsed, 1),
+        "loop_lag_p50_ms": round(lags[len(lags) // 2] * 1000, 2) if lags else 0.0,
+        "loop_lag_max_ms": round(lags[-1] * 1000, 2) if lags else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--procedure", default="get_all_agent_listings_with_details")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        for mode in ("blocking", "async"):
+            result = asyncio.run(
+                run(mode, args.procedure, args.requests, args.concurrency)
+            )
+            print(
+                f"{result['mode']:>8}: {result['requests_per_s']:>8} req/s "
+                f"in {result['elapsed_s']}s, loop lag p50 "
+                f"{result['loop_lag_p50_ms']}ms max {result['loop_lag_max_ms']}ms"
+            )
+    finally:
+        shutdown_db_executor()
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark client search: the indexed search_clients procedure vs. the
+leading-wildcard LIKE scan it replaced.
+
+Seeds the configured database with synthetic clients up to --clients
+(skipped when the table already has that many), then times typeahead-style
+queries of each kind: name prefix, name substring, phone prefix and exact
+email. The legacy query ORs three LIKE '%q%' predicates, so each of its
+runs scans the whole table; it gets fewer repetitions.
+
+Usage:
+    python utils/bench_client_search.py --clients 1000000
+    python utils/bench_client_search.py --clients 1000000 --runs 50 --legacy-runs 3
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import pool  # noqa: E402
+
+FIRST = (
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael",
+    "Linda", "David", "Elizabeth", "William", "Barbara", "Richard", "Susan",
+    "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen", "Lisa",
+)
+LAST = (
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller",
+    "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez",
+    "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+)
+
+# The old search_clients body; the pattern is bound as '%query%'
+LEGACY_SQL = (
+    "SELECT client_id, client_name, client_phone, client_email "
+    "FROM Client "
+    "WHERE client_name LIKE %s OR client_phone LIKE %s OR client_email LIKE %s "
+    "ORDER BY client_name ASC LIMIT %s"
+)
+
+
+def synthetic_client(i: int, rng: random.Random) -> tuple:
+    first, last = rng.choice(FIRST), rng.choice(LAST)
+    phone = f"{rng.randint(200, 999)}-{rng.randint(200, 999)}-{rng.randint(0, 9999):04d}"
+    return (
+        f"{first} {last}",
+        f"B{i:09d}",  # SSN is unique; B-prefixed so it can't clash with real rows
+        f"{rng.randint(1, 999)} Main St, Boston, MA",
+        phone,
+        f"{first.lower()}.{last.lower()}{i}@example.com",
+    )
+
+
+def seed(conn, target: int, batch_size: int = 5000):
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM Client")
+    (existing,) = cursor.fetchone()
+    rng = random.Random(42)
+    started = time.perf_counter()
+    for start in range(existing, target, batch_size):
+        rows = [synthetic_client(i, rng) for i in range(start, min(target, start + batch_size))]
+        cursor.executemany(
+            "INSERT INTO Client (client_name, SSN, mailing_address, client_phone, client_email) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            rows,
+        )
+        conn.commit()
+    if target > existing:
+        print(f"Seeded {target - existing:,} clients in {time.perf_counter() - started:.1f} s")
+    cursor.close()
+
+
+def sample_queries(conn) -> dict:
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT client_name, client_phone, client_email FROM Client "
+        "WHERE client_id >= (SELECT MAX(client_id) FROM Client) * RAND() LIMIT 20"
+    )
+    rows = cursor.fetchall()
+    cursor.close()
+    return {
+        "name prefix": [name[:4] for name, _, _ in rows],
+        "name substring": [name.split()[-1][1:5] for name, _, _ in rows],
+        "phone prefix": [phone[:7] for _, phone, _ in rows if phone],
+        "exact email": [email for _, _, email in rows if email],
+    }
+
+
+def time_calls(call, queries: list, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        for query in queries:
+            started = time.perf_counter()
+            call(query)
+            samples.append((time.perf_counter() - started) * 1000)
+    return sorted(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=1000000)
+    parser.add_argument("--limit", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--legacy-runs", type=int, default=1)
+    args = parser.parse_args()
+
+    conn = pool.checkout()
+    try:
+        seed(conn, args.clients)
+        queries = sample_queries(conn)
+
+        def indexed(query):
+            cursor = conn.procedure_cursor()
+            cursor.callproc("search_clients", (query, args.limit))
+            for result in cursor.stored_results():
+                result.fetchall()
+            cursor.close()
+
+        def legacy(query):
+            cursor = conn.procedure_cursor()
+            pattern = f"%{query}%"
+            cursor.execute(LEGACY_SQL, (pattern, pattern, pattern, args.limit))
+            cursor.fetchall()
+            cursor.close()
+
+        print(f"{'kind':<16}{'query':<10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for kind, kind_queries in queries.items():
+            for name, call, runs in (
+                ("indexed", indexed, args.runs),
+                ("legacy", legacy, args.legacy_runs),
+            ):
+                samples = time_calls(call, kind_queries, runs)
+                p50 = samples[len(samples) // 2]
+                p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+                print(f"{kind:<16}{name:<10}{p50:>10.2f}{p95:>10.2f}{samples[-1]:>10.2f}")
+        conn.commit()
+    finally:
+        pool.checkin(conn)
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark typo-tolerant lookups: trigram-pruned NgramIndex vs. computing
+the edit distance against every word.
+
+The vocabulary is synthetic street-name-like words built from a couple
+dozen syllables, so the script runs without a database. Those words share
+far more trigrams than real street names do, which makes this a harder
+case for trigram pruning than production data. Each query is a
+vocabulary word with one or two random edits (substitutions, insertions,
+deletions or swaps of adjacent letters, the edits the app's optimal
+string alignment distance counts); the script reports latency
+percentiles and how often the original word was among the suggestions.
+
+Usage:
+    python utils/bench_fuzzy.py --words 300000 --queries 500
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rapidfuzz.distance import OSA  # noqa: E402
+from app.core.fuzzy import NgramIndex, max_edits  # noqa: E402
+
+SYLLABLES = (
+    "ash", "bay", "ber", "brook", "cher", "dale", "elm", "field", "glen",
+    "ham", "hill", "kee", "lake", "ley", "mont", "oak", "ridge", "ro", "ton",
+    "vale", "ville", "wood", "worth", "york",
+)
+
+
+def vocabulary(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    for _ in range(rng.randint(1, max(1, max_edits(word)))):
+        position = rng.randrange(len(word))
+        letter = rng.choice(string.ascii_lowercase)
+        edit = rng.choice(("substitute", "insert", "delete", "transpose"))
+        if edit == "transpose":
+            if position < len(word) - 1:
+                word = (
+                    word[:position] + word[position + 1] + word[position]
+                    + word[position + 2:]
+                )
+        elif edit == "substitute":
+            word = word[:position] + letter + word[position + 1:]
+        elif edit == "insert":
+            word = word[:position] + letter + word[position:]
+        elif len(word) > 3:
+            word = word[:position] + word[position + 1:]
+    return word
+
+
+def brute_force(words: list, query: str, limit: int) -> list:
+    k = max_edits(query)
+    matches = []
+    for word in words:
+        distance = OSA.distance(query, word, score_cutoff=k)
+        if distance <= k:
+            matches.append((distance, word))
+    return [word for _, word in sorted(matches)[:limit]]
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(name: str, samples: list, found: int, queries: int):
+    print(
+        f"{name:<12} p50 {percentile(samples, 0.5):8.3f} ms"
+        f"  p99 {percentile(samples, 0.99):8.3f} ms"
+        f"  max {max(samples):8.3f} ms"
+        f"  recall {found / queries:6.1%}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--words", type=int, default=300000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--budget-ms", type=float, default=50)
+    parser.add_argument("--brute-queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    words = vocabulary(args.words, args.seed)
+    started = time.perf_counter()
+    index = NgramIndex()
+    for word in words:
+        index.add(word)
+    print(f"{len(words):,} words indexed in {time.perf_counter() - started:.2f} s")
+
+    rng = random.Random(args.seed)
+    targets = rng.sample(words, args.queries)
+    queries = [(target, misspell(target, rng)) for target in targets]
+
+    samples, found = [], 0
+    for target, query in queries:
+        started = time.perf_counter()
+        matches = index.similar(
+            query, deadline=started + args.budget_ms / 1000
+        )
+        samples.append((time.perf_counter() - started) * 1000)
+        found += any(match.term == target for match in matches)
+    report("ngram", samples, found, len(queries))
+
+    samples, found = [], 0
+    for target, query in queries[:args.brute_queries]:
+        started = time.perf_counter()
+        matches = brute_force(words, query, 10)
+        samples.append((time.perf_counter() - started) * 1000)
+        found += target in matches
+    report("brute force", samples, found, len(samples))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark memory and latency of dict rows vs. compact Record rows.
+
+By default the rows are synthetic, shaped like the result of
+get_all_agent_listings_with_details (Property columns plus the joined
+agent, residential, commercial and image columns), so the script runs
+without a database. "dict" builds one dict per row the way a dictionary
+cursor does. "record" wraps the same tuples in a shared Record type.
+Pass --live to fetch the rows from the configured database instead.
+
+Usage:
+    python utils/bench_row_modes.py --rows 50000
+    python utils/bench_row_modes.py --live
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.rows import make_records  # noqa: E402
+
+COLUMNS = (
+    "property_id", "tax_id", "property_address", "status", "price", "lot_size",
+    "year_built", "zoning", "property_tax", "created_at", "updated_at",
+    "agent_id", "agent_name", "agent_phone", "bedrooms", "bathrooms", "r_type",
+    "square_feet", "garage_spaces", "has_basement", "has_pool", "sqft",
+    "industry", "c_type", "num_units", "parking_spaces", "zoning_type",
+    "image_url", "image_id",
+)
+
+# Attributes the homepage card reads for every listing
+CARD_FIELDS = (
+    "property_id", "image_url", "property_address", "status", "price",
+    "agent_name", "bedrooms", "bathrooms",
+)
+
+
+def synthetic_rows(count: int) -> list:
+    now = datetime.now()
+    return [
+        (
+            i, f"TAX{i:07d}", f"{i} Main St, Boston, MA", "For Sale",
+            Decimal("500000.00") + i, Decimal("5000.00"), 1990, "Residential",
+            Decimal("5000.00"), now, now, i % 50, f"Agent {i % 50}",
+            "555-111-2222", 3, Decimal("2.5"), "Single Family", Decimal("2000.00"),
+            2, 1, 0, None, None, None, None, None, None,
+            f"/static/uploads/properties/{i}/front.jpg", i,
+        )
+        for i in range(count)
+    ]
+
+
+def live_rows(procedure: str):
+    from app.core.database import pool
+
+    conn = pool.checkout()
+    try:
+        cursor = conn.procedure_cursor()
+        cursor.callproc(procedure, ())
+        result = next(iter(cursor.stored_results()))
+        rows = result.fetchall()
+        columns = tuple(result.column_names)
+        cursor.close()
+        return columns, rows
+    finally:
+        pool.checkin(conn)
+        pool.close()
+
+
+def build(mode: str, columns: tuple, rows: list) -> list:
+    if mode == "dict":
+        return [dict(zip(columns, row)) for row in rows]
+    return make_records(columns, rows)
+
+
+def measure(mode: str, columns: tuple, rows: list) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    built = build(mode, columns, rows)
+    build_s = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for row in built:
+        for field in CARD_FIELDS:
+            getattr(row, field, None) if mode == "record" else row.get(field)
+    access_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    gc.collect()
+    gc_s = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "peak_mb": peak / 1024 / 1024,
+        "build_ms": build_s * 1000,
+        "access_ms": access_s * 1000,
+        "gc_ms": gc_s * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument("--procedure", default="get_all_agent_listings_with_details")
+    args = parser.parse_args()
+
+    if args.live:
+        columns, rows = live_rows(args.procedure)
+    else:
+        columns, rows = COLUMNS, synthetic_rows(args.rows)
+
+    print(f"{len(rows)} rows x {len(columns)} columns")
+    for mode in ("dict", "record"):
+        result = measure(mode, columns, rows)
+        print(
+            f"{result['mode']:>6}: peak {result['peak_mb']:8.2f} MB, "
+            f"build {result['build_ms']:8.1f} ms, "
+            f"access {result['access_ms']:8.1f} ms, "
+            f"gc {result['gc_ms']:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Build fingerprinted, precompressed static assets.
+
+Copies each CSS, JS and image file under app/static (uploads excluded) to
+app/static/dist with a content hash in its name, writes .gz and .br
+siblings for text files, and records the logical -> built names in
+dist/manifest.json for asset_url(). Run it on every deploy; the app reads
+the manifest at startup. Builds from earlier deploys are removed with
+--clean.
+
+Usage:
+    python utils/build_assets.py
+    python utils/build_assets.py --clean
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.assets import (  # noqa: E402
+    ASSET_EXTENSIONS,
+    COMPRESSIBLE_EXTENSIONS,
+    MANIFEST_NAME,
+)
+from app.core.config import settings  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Directories under app/static that hold user content, not assets
+SKIP_DIRS = {"uploads", "property_images"}
+HASH_LENGTH = 10
+
+
+def source_files(static_dir, assets_dir):
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(
+            d for d in dirs
+            if d not in SKIP_DIRS and os.path.join(root, d) != str(assets_dir)
+        )
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in ASSET_EXTENSIONS:
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, static_dir).replace(os.sep, "/"), path
+
+
+def write_compressed(path: str, data: bytes) -> dict:
+    sizes = {}
+    with open(path + ".gz", "wb") as f:
+        # mtime=0 keeps rebuilds of unchanged files byte-identical
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    sizes["gz"] = os.path.getsize(path + ".gz")
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, quality=11))
+        sizes["br"] = os.path.getsize(path + ".br")
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--clean", action="store_true", help="remove previous builds first"
+    )
+    args = parser.parse_args()
+
+    static_dir, assets_dir = settings.STATIC_DIR, settings.ASSETS_DIR
+    if args.clean and assets_dir.exists():
+        shutil.rmtree(assets_dir)
+    if brotli is None:
+        print("brotli is not installed; writing .gz siblings only")
+
+    manifest = {}
+    for name, path in source_files(static_dir, assets_dir):
+        with open(path, "rb") as f:
+            data = f.read()
+        stem, extension = os.path.splitext(name)
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+        built = f"{stem}.{digest}{extension}"
+        target = assets_dir / built
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(data)
+        manifest[name] = built
+
+        line = f"{name:<32} -> {built}  {len(data):>8,} B"
+        if extension.lower() in COMPRESSIBLE_EXTENSIONS:
+            sizes = write_compressed(str(target), data)
+            line += "".join(f"  {kind} {size:>7,} B" for kind, size in sizes.items())
+        print(line)
+
+    with open(assets_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    print(f"Built {len(manifest)} assets into {assets_dir}")
+
+
+if __name__ == "__main__":
+    main()
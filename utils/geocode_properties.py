@@ -0,0 +1,61 @@
+"""
+Geocode every property from the offline gazetteer.
+
+Sets latitude/longitude on each Property row from its address (street
+point, else city centre, else NULL). Run it after loading data outside the
+app, e.g. after utils/reset_db.py; properties saved through the app are
+geocoded as they are written. Nothing is looked up over the network.
+
+Usage:
+    python utils/geocode_properties.py
+    python utils/geocode_properties.py --dry-run
+"""
+import argparse
+import os
+import sys
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import commit, execute_procedure_sync, pool  # noqa: E402
+from app.core.gazetteer import get_gazetteer  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    gazetteer = get_gazetteer()
+    conn = pool.checkout()
+    try:
+        properties = execute_procedure_sync(conn, "get_all_properties", use_cache=False)
+        outcomes = Counter()
+        for row in properties:
+            location = gazetteer.geocode(row["property_address"])
+            outcomes[location.precision if location else "unplaced"] += 1
+            if location is None:
+                print(f"  unplaced: {row['property_id']} {row['property_address']}")
+            if not args.dry_run:
+                execute_procedure_sync(
+                    conn,
+                    "set_property_location",
+                    (
+                        row["property_id"],
+                        location.latitude if location else None,
+                        location.longitude if location else None,
+                    ),
+                )
+        if not args.dry_run:
+            commit(conn)
+        print(
+            f"{len(properties)} properties: {outcomes['street']} by street, "
+            f"{outcomes['city']} by city, {outcomes['unplaced']} unplaced"
+        )
+    finally:
+        pool.checkin(conn)
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()